@@ -0,0 +1,377 @@
+"""
+Módulo: Controle de Admissão
+Estima o custo (em segundos de CPU) de cada requisição a partir do corpo
+bruto, antes de qualquer conversão para listas, e a recusa (413/429) ou a
+degrada (sem passos, jordan -> gauss) quando excede o limite por requisição
+ou o orçamento do cliente
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from functools import partial
+
+from edo import MAXIMO_PASSOS_RK45
+from leitura_dados import TIPO_BINARIO, TIPO_CSV
+
+# Configuração (pode ser alterada por variáveis de ambiente)
+ADMISSAO_ATIVA = os.environ.get('ADMISSAO', '1') != '0'
+# Custo máximo estimado de uma única requisição (segundos)
+CUSTO_MAXIMO = float(os.environ.get('ADMISSAO_CUSTO_MAXIMO', 60))
+# Orçamento de cada cliente (segundos), reposto a REPOSICAO segundos por segundo
+ORCAMENTO_CLIENTE = float(os.environ.get('ADMISSAO_ORCAMENTO_CLIENTE', 300))
+REPOSICAO = float(os.environ.get('ADMISSAO_REPOSICAO', 1.0))
+# Tarefas em segundo plano não ocupam a requisição: têm limite e orçamento
+# próprios, pois a fila (MAXIMO_FILA em tarefas.py) já limita a ocupação
+CUSTO_MAXIMO_TAREFA = float(os.environ.get('ADMISSAO_CUSTO_MAXIMO_TAREFA', 3600))
+ORCAMENTO_TAREFAS = float(os.environ.get('ADMISSAO_ORCAMENTO_TAREFAS', 7200))
+DEGRADAR = os.environ.get('ADMISSAO_DEGRADAR', '1') != '0'
+
+# Segundos por unidade de trabalho, medidos no interpretador de referência
+# (CPython 3.11); servem para ordenar e limitar, não para prever com precisão
+COEFICIENTES = {
+    'gauss': 6e-7,          # x n³, com o texto dos passos (formatar_sistema a cada passo)
+    'jordan': 8e-7,         # x n³, com passos
+    'lu': 5e-8,             # x n³, com passos (o texto é O(n²))
+    'sem_passos': 3e-8,     # x n³, LU compacta
+    'iteracao': 8e-8,       # x iterações x elementos não nulos
+    'regressao': 5e-6,      # x pontos
+    'selecao': 1.1e-5,      # x pontos
+    'replica': 5e-6,        # x réplicas x pontos
+    'ponto': 1e-6,          # x pontos (integração, previsão, interpolação)
+    'avaliacao': 5e-7,      # x avaliações de f x equações x trajetórias (EDOs)
+    'celula': 1e-7,         # x células da grade 2-D
+    'byte': 2e-8            # x bytes do corpo (demais rotas)
+}
+
+# Custo fixo de problemas pequenos (minas, Wheatstone, integral de expressão)
+CUSTO_FIXO = 0.01
+
+MAXIMO_ITERACOES_PADRAO = 1000
+
+# Passos padrão do RK4 em /calcular_edo
+PASSOS_RK4_PADRAO = 1000
+# Limites de passos oferecidos como degradação do RK45, do mais alto ao mais baixo
+DEGRADACOES_RK45 = (10000, 1000)
+
+TIPOS_SAIDA_BINARIA = (TIPO_BINARIO, 'application/x-npy')
+
+# Corpos lidos como fluxo (sem passar pelo JSON): só o Content-Length os limita
+TIPOS_FLUXO = (TIPO_CSV, *TIPOS_SAIDA_BINARIA)
+
+PADRAO_METODO = re.compile(rb'"metodo"\s*:\s*"([A-Za-z_]+)"')
+PADRAO_TIPO = re.compile(rb'"tipo"\s*:\s*"([A-Za-z_]+)"')
+PADRAO_SEM_PASSOS = re.compile(rb'"passos"\s*:\s*false')
+PADRAO_ZERO = re.compile(rb'(?<=[\[,])\s*-?0(?:\.0*)?(?:[eE][-+]?\d+)?\s*(?=[,\]])')
+
+
+def inteiro_no_corpo(corpo, chave, padrao):
+    """Valor inteiro de "chave": N no corpo bruto (padrao se ausente)"""
+    achado = re.search(rb'"' + chave + rb'"\s*:\s*(\d+)', corpo)
+    return int(achado.group(1)) if achado else padrao
+
+
+def texto_no_corpo(corpo, padrao_regex, padrao):
+    """Primeiro grupo do padrão no corpo bruto (padrao se ausente)"""
+    achado = padrao_regex.search(corpo)
+    return achado.group(1).decode('ascii') if achado else padrao
+
+
+def custo_direto(n, metodo, passos):
+    """Custo de um sistema n x n por método direto"""
+    if not passos:
+        return COEFICIENTES['sem_passos'] * n ** 3
+    return COEFICIENTES.get(metodo, COEFICIENTES['jordan']) * n ** 3
+
+
+def estimar_sistema(corpo, tamanho, tipo, args):
+    """/calcular_sistema: n³ conforme o método e o registro de passos"""
+    if tipo in TIPOS_SAIDA_BINARIA:
+        # Matriz aumentada binária: n(n+1) float64, sempre sem passos
+        n = math.isqrt(tamanho // 8)
+        return {'custo': custo_direto(n, 'lu', False), 'grandezas': {'n': n, 'metodo': 'lu', 'passos': False}}
+    
+    # n(n+1) números na matriz e em b: cerca de n² vírgulas
+    n = max(1, math.isqrt(corpo.count(b',')))
+    metodo = texto_no_corpo(corpo, PADRAO_METODO, 'gauss')
+    # Respostas binárias (Accept) são sempre calculadas sem passos
+    aceita = args.get('aceita', '')
+    passos = PADRAO_SEM_PASSOS.search(corpo) is None and not any(t in aceita for t in TIPOS_SAIDA_BINARIA)
+    
+    # Degradações possíveis, da mais leve à mais forte (sobrescrevem os dados)
+    opcoes = []
+    if passos and metodo == 'jordan':
+        opcoes.append(({'metodo': 'gauss'}, custo_direto(n, 'gauss', True)))
+    if passos:
+        opcoes.append(({'passos': False}, custo_direto(n, metodo, False)))
+    
+    return {
+        'custo': custo_direto(n, metodo, passos),
+        'grandezas': {'n': n, 'metodo': metodo, 'passos': passos},
+        'opcoes': opcoes
+    }
+
+
+def estimar_iterativo(corpo, tamanho, tipo, args, maximo_no_corpo=False, nao_nulos=None):
+    """
+    Jacobi/Gauss-Seidel: iterações (no pior caso, o máximo) x elementos não nulos.
+    Só as rotas de fluxo aceitam max_iteracoes; nas demais vale o padrão.
+    Sistemas de forma fixa (Wheatstone) informam nao_nulos em vez da matriz.
+    """
+    if nao_nulos is None:
+        elementos = corpo.count(b',') + 1
+        nao_nulos = max(1, elementos - len(PADRAO_ZERO.findall(corpo)))
+    iteracoes = MAXIMO_ITERACOES_PADRAO
+    if maximo_no_corpo:
+        iteracoes = inteiro_no_corpo(corpo, b'max_iteracoes', MAXIMO_ITERACOES_PADRAO)
+    return {
+        'custo': COEFICIENTES['iteracao'] * iteracoes * nao_nulos,
+        'grandezas': {'iteracoes': iteracoes, 'nao_nulos': nao_nulos}
+    }
+
+
+def pontos_no_corpo(corpo, tamanho, tipo):
+    """Número de pontos (x, y): pelo tamanho dos envios em blocos ou pelas vírgulas do JSON"""
+    if tipo == TIPO_BINARIO:
+        return tamanho // 16
+    if tipo == TIPO_CSV:
+        return tamanho // 12
+    return max(1, corpo.count(b',') // 2)
+
+
+def estimador_pontos(coeficiente):
+    """Estimador para rotas cujo custo é proporcional ao número de pontos"""
+    def estimar(corpo, tamanho, tipo, args):
+        pontos = pontos_no_corpo(corpo, tamanho, tipo)
+        # Grades regulares ({"quantidade": N}) geram os pontos no servidor
+        pontos += inteiro_no_corpo(corpo, b'quantidade', 0)
+        return {'custo': COEFICIENTES[coeficiente] * pontos, 'grandezas': {'pontos': pontos}}
+    return estimar
+
+
+def estimar_incerteza(corpo, tamanho, tipo, args):
+    """Bootstrap: réplicas x pontos"""
+    pontos = pontos_no_corpo(corpo, tamanho, tipo)
+    replicas = inteiro_no_corpo(corpo, b'replicas', 1000)
+    return {'custo': COEFICIENTES['replica'] * replicas * pontos,
+            'grandezas': {'pontos': pontos, 'replicas': replicas}}
+
+
+def estimar_edo(corpo, tamanho, tipo, args):
+    """
+    EDOs: avaliações de f x equações x trajetórias. O RK4 faz 4 avaliações
+    por passo; o RK45 é adaptativo e é cobrado no pior caso, 6 avaliações por
+    passo até max_passos, com limites menores oferecidos como degradação.
+    """
+    try:
+        dados = json.loads(corpo)
+        equacoes = dados['equacoes']
+        condicoes = dados['condicoes_iniciais']
+        metodo = dados.get('metodo', 'rk45')
+        passos = int(dados.get('passos', PASSOS_RK4_PADRAO))
+        max_passos = int(dados.get('max_passos', MAXIMO_PASSOS_RK45))
+        numero_equacoes = 1 if isinstance(equacoes, str) else max(1, len(equacoes))
+        trajetorias = len(condicoes) if condicoes and isinstance(condicoes[0], (list, tuple)) else 1
+    except (ValueError, TypeError, KeyError, AttributeError):
+        # Dados inválidos: a rota responde 400 sem calcular
+        return estimar_corpo(corpo, tamanho, tipo, args)
+    
+    por_avaliacao = COEFICIENTES['avaliacao'] * numero_equacoes * trajetorias
+    grandezas = {'metodo': metodo, 'equacoes': numero_equacoes, 'trajetorias': trajetorias}
+    
+    if metodo == 'rk4':
+        return {'custo': por_avaliacao * 4 * passos, 'grandezas': {**grandezas, 'passos': passos}}
+    
+    return {
+        'custo': por_avaliacao * 6 * max_passos,
+        'grandezas': {**grandezas, 'max_passos': max_passos},
+        'opcoes': [({'max_passos': limite}, por_avaliacao * 6 * limite)
+                   for limite in DEGRADACOES_RK45 if limite < max_passos]
+    }
+
+
+def estimar_volume(corpo, tamanho, tipo, args):
+    """Volume 2-D: células da grade (float64 no envio binário, vírgulas no JSON)"""
+    celulas = tamanho // 8 if tipo in TIPOS_SAIDA_BINARIA else corpo.count(b',') + 1
+    return {'custo': COEFICIENTES['celula'] * celulas, 'grandezas': {'celulas': celulas}}
+
+
+def estimar_fixo(corpo, tamanho, tipo, args):
+    """Problemas de tamanho fixo"""
+    return {'custo': CUSTO_FIXO, 'grandezas': {}}
+
+
+def estimar_tarefa(corpo, tamanho, tipo, args):
+    """/tarefas: conforme o tipo da tarefa, com o limite e o orçamento das tarefas"""
+    if texto_no_corpo(corpo, PADRAO_TIPO, 'sistema') == 'sistema_iterativo':
+        estimativa = estimar_iterativo(corpo, tamanho, tipo, args)
+    else:
+        estimativa = estimar_sistema(corpo, tamanho, tipo, args)
+    estimativa['limite'] = CUSTO_MAXIMO_TAREFA
+    estimativa['orcamento'] = 'tarefas'
+    return estimativa
+
+
+def estimar_lote(corpo, tamanho, tipo, args):
+    """
+    /lote: soma dos modelos de cada item, escolhidos pelo tipo (o mesmo da
+    rota /calcular_* correspondente). É o único estimador que converte o
+    JSON, pois o corpo precisa ser dividido por item.
+    """
+    try:
+        documento = json.loads(corpo)
+    except ValueError:
+        return estimar_corpo(corpo, tamanho, tipo, args)
+    itens = documento.get('itens') if isinstance(documento, dict) else documento
+    if not isinstance(itens, list):
+        return estimar_corpo(corpo, tamanho, tipo, args)
+    
+    custo = 0.0
+    por_tipo = {}
+    for item in itens:
+        tipo_item = item.get('tipo') if isinstance(item, dict) else None
+        modelo = MODELOS_CUSTO.get(ROTAS_LOTE.get(tipo_item), estimar_fixo)
+        dados = json.dumps(item.get('dados', {}) if isinstance(item, dict) else {}).encode('utf-8')
+        # Os itens respondem sempre em JSON
+        custo_item = modelo(dados, len(dados), 'application/json', {})['custo']
+        custo += custo_item
+        por_tipo[str(tipo_item)] = por_tipo.get(str(tipo_item), 0.0) + custo_item
+    
+    return {'custo': custo, 'grandezas': {'itens': len(itens), 'por_tipo': por_tipo}}
+
+
+def estimar_corpo(corpo, tamanho, tipo, args):
+    """Demais rotas: proporcional ao tamanho do corpo"""
+    return {'custo': COEFICIENTES['byte'] * tamanho, 'grandezas': {'bytes': tamanho}}
+
+
+MODELOS_CUSTO = {
+    '/calcular_sistema': estimar_sistema,
+    '/calcular_sistema_iterativo': estimar_iterativo,
+    '/calcular_sistema_iterativo/fluxo': partial(estimar_iterativo, maximo_no_corpo=True),
+    '/calcular_minas': estimar_fixo,
+    '/calcular_wheatstone': estimar_fixo,
+    # Matriz 3 x 3 das malhas, com max_iteracoes escolhido pelo cliente
+    '/calcular_wheatstone/fluxo': partial(estimar_iterativo, maximo_no_corpo=True, nao_nulos=9),
+    '/calcular_integral_funcao': estimar_fixo,
+    '/calcular_regressoes': estimador_pontos('regressao'),
+    '/calcular_selecao_modelos': estimador_pontos('selecao'),
+    '/calcular_incerteza': estimar_incerteza,
+    '/calcular_previsao': estimador_pontos('ponto'),
+    '/calcular_integracao': estimador_pontos('ponto'),
+    '/calcular_interpolacao': estimador_pontos('ponto'),
+    '/calcular_edo': estimar_edo,
+    '/calcular_volume': estimar_volume,
+    '/indice_area': estimador_pontos('ponto'),
+    '/indice_area/<identificador>/consultas': estimador_pontos('ponto'),
+    '/tarefas': estimar_tarefa,
+    '/lote': estimar_lote
+}
+
+# Tipo de item do /lote -> rota com o mesmo modelo de custo
+ROTAS_LOTE = {
+    'minas': '/calcular_minas',
+    'wheatstone': '/calcular_wheatstone',
+    'sistema': '/calcular_sistema',
+    'sistema_iterativo': '/calcular_sistema_iterativo',
+    'regressoes': '/calcular_regressoes',
+    'integracao': '/calcular_integracao',
+    'integral_funcao': '/calcular_integral_funcao',
+    'interpolacao': '/calcular_interpolacao',
+    'edo': '/calcular_edo'
+}
+
+# Capacidade de cada orçamento (segundos)
+ORCAMENTOS = {
+    'requisicoes': ORCAMENTO_CLIENTE,
+    'tarefas': ORCAMENTO_TAREFAS
+}
+
+# (orçamento, cliente) -> [saldo em segundos, instante da última atualização]
+BALDES = {}
+TRAVA_ADMISSAO = threading.Lock()
+MAXIMO_CLIENTES = 10000
+
+
+def estimar_custo(rota, corpo, tamanho, tipo, args=None):
+    """
+    Estima o custo de uma requisição sem converter os dados.
+    
+    Parâmetros:
+        rota: regra da rota (ex.: '/calcular_sistema')
+        corpo: bytes do corpo JSON (b'' para envios binários ou em blocos)
+        tamanho: tamanho do corpo em bytes
+        tipo: mimetype do corpo
+        args: dicionário com 'aceita' (cabeçalho Accept) e outros parâmetros
+    
+    Retorna:
+        {'custo': segundos, 'grandezas': {...}, 'opcoes': [(degradação, custo), ...],
+         'limite': custo máximo admitido, 'orcamento': nome do orçamento debitado}
+    """
+    modelo = MODELOS_CUSTO.get(rota, estimar_corpo)
+    estimativa = modelo(corpo, tamanho, tipo, args or {})
+    estimativa.setdefault('opcoes', [])
+    estimativa.setdefault('limite', CUSTO_MAXIMO)
+    estimativa.setdefault('orcamento', 'requisicoes')
+    return estimativa
+
+
+def consumir_orcamento(cliente, custo, orcamento='requisicoes'):
+    """
+    Debita o custo do balde do cliente no orçamento indicado.
+    
+    Retorna:
+        0 se debitado, ou os segundos até o saldo bastar
+    """
+    capacidade = ORCAMENTOS[orcamento]
+    chave = (orcamento, cliente)
+    agora = time.monotonic()
+    with TRAVA_ADMISSAO:
+        saldo, instante = BALDES.get(chave, (capacidade, agora))
+        saldo = min(capacidade, saldo + (agora - instante) * REPOSICAO)
+        
+        if saldo < custo:
+            BALDES[chave] = [saldo, agora]
+            return (custo - saldo) / REPOSICAO if REPOSICAO > 0 else math.inf
+        
+        if chave not in BALDES and len(BALDES) >= MAXIMO_CLIENTES:
+            # Descarta os baldes que já recuperaram todo o orçamento
+            cheios = [c for c, (s, t) in BALDES.items()
+                      if s + (agora - t) * REPOSICAO >= ORCAMENTOS[c[0]]]
+            for c in cheios:
+                del BALDES[c]
+        BALDES[chave] = [saldo - custo, agora]
+        return 0
+
+
+def admitir(cliente, estimativa):
+    """
+    Decide a admissão de uma requisição.
+    
+    Tenta o pedido original e depois cada degradação possível (se permitido):
+    acima do limite da estimativa (CUSTO_MAXIMO, ou CUSTO_MAXIMO_TAREFA para
+    tarefas) a resposta é 413; sem saldo no orçamento do cliente, 429 com o
+    tempo de espera.
+    
+    Retorna:
+        {'status': 200 | 413 | 429, 'custo', 'degradacao', 'espera'}
+    """
+    candidatos = [({}, estimativa['custo'])]
+    if DEGRADAR:
+        candidatos += estimativa['opcoes']
+    
+    cabem = [(degradacao, custo) for degradacao, custo in candidatos if custo <= estimativa['limite']]
+    if not cabem:
+        return {'status': 413, 'custo': estimativa['custo'], 'degradacao': None, 'espera': None}
+    
+    menor_espera = None
+    for degradacao, custo in cabem:
+        espera = consumir_orcamento(cliente, custo, estimativa['orcamento'])
+        if espera == 0:
+            return {'status': 200, 'custo': custo, 'degradacao': degradacao, 'espera': 0}
+        menor_espera = espera if menor_espera is None else min(menor_espera, espera)
+    
+    return {'status': 429, 'custo': cabem[-1][1], 'degradacao': None, 'espera': menor_espera}
@@ -3,20 +3,235 @@ Aplicação Web Flask para Cálculo Numérico
 Interface web para resolução dos quatro problemas propostos
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import is_hop_by_hop_header
+import json
 import sys
 import os
+import time
+from array import array
+from functools import wraps
+from itertools import chain
 
 # Adicionar diretório atual ao path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from metodos_diretos import resolver_problema_minas, resolver_sistema_generico
-from metodos_iterativos import resolver_ponte_wheatstone
-from minimos_quadrados import resolver_regressoes
-from integracao_numerica import resolver_integracao
+from metodos_diretos import resolver_lu, resolver_problema_minas, resolver_sistema_generico
+from metodos_iterativos import (
+    fluxo_ponte_wheatstone, fluxo_sistema_iterativo, resolver_ponte_wheatstone, resolver_sistema_iterativo
+)
+from minimos_quadrados import resolver_regressoes, resolver_selecao_modelos, resolver_regressoes_blocos
+from integracao_numerica import resolver_integracao, resolver_integracao_blocos, resolver_integral_funcao
+from leitura_dados import TIPO_BINARIO, TIPO_CSV, ler_blocos
+from indice_area import registrar_indice, consultar_areas
+from expressoes import compilar_expressao
+from integracao_2d import integrar_grade, integrar_grade_fluxo
+from matrizes_binarias import TIPOS_MATRIZ, escrever_matriz, ler_sistema_aumentado
+from interpolacao import resolver_interpolacao
+from edo import MAXIMO_PASSOS_RK45, resolver_edo
+from lei_moore import ajustar_lei_moore, resolver_previsao, validar_formato
+from reamostragem import resolver_incerteza
+from tarefas import cancelar_tarefa, consultar_tarefa, estatisticas_tarefas, submeter_tarefa
+from lote import resolver_lote, resultados_conforme_concluem, validar_lote
+from cache_resultados import chave_canonica, estatisticas_cache, limpar_cache, obter_ou_calcular
+from metricas import (
+    METRICAS_ATIVAS, acumular_fase, encerrar_fases, formatar_prometheus, incrementar, iniciar_fases,
+    instrumentar, medidas_iterativo, medidas_lu, medidas_minas, medidas_sistema, medidas_wheatstone,
+    medir_fluxo, observar
+)
+from perfil import PERFIL_ATIVO, perfil_wsgi
+from admissao import ADMISSAO_ATIVA, TIPOS_FLUXO, admitir, estimar_custo
 
 app = Flask(__name__)
 
+# Instrumentação dos resolvedores (sem efeito quando METRICAS=0)
+resolver_problema_minas = instrumentar('minas', medidas_minas)(resolver_problema_minas)
+resolver_sistema_generico = instrumentar('sistema', medidas_sistema)(resolver_sistema_generico)
+resolver_lu = instrumentar('sistema_lu', medidas_lu)(resolver_lu)
+resolver_ponte_wheatstone = instrumentar('wheatstone', medidas_wheatstone)(resolver_ponte_wheatstone)
+resolver_sistema_iterativo = instrumentar('sistema_iterativo', medidas_iterativo)(resolver_sistema_iterativo)
+resolver_regressoes = instrumentar('regressoes')(resolver_regressoes)
+resolver_regressoes_blocos = instrumentar('regressoes_blocos')(resolver_regressoes_blocos)
+resolver_selecao_modelos = instrumentar('selecao_modelos')(resolver_selecao_modelos)
+resolver_incerteza = instrumentar('incerteza')(resolver_incerteza)
+resolver_previsao = instrumentar('previsao')(resolver_previsao)
+resolver_integracao = instrumentar('integracao')(resolver_integracao)
+resolver_integracao_blocos = instrumentar('integracao_blocos')(resolver_integracao_blocos)
+resolver_integral_funcao = instrumentar('integral_funcao')(resolver_integral_funcao)
+resolver_interpolacao = instrumentar('interpolacao')(resolver_interpolacao)
+resolver_edo = instrumentar('edo')(resolver_edo)
+resolver_lote = instrumentar('lote')(resolver_lote)
+integrar_grade = instrumentar('volume')(integrar_grade)
+integrar_grade_fluxo = instrumentar('volume_fluxo')(integrar_grade_fluxo)
+
+
+class ProvedorJsonMedido(DefaultJSONProvider):
+    """Provedor JSON que soma o tempo de leitura e de formatação às fases da requisição"""
+    
+    def loads(self, s, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return super().loads(s, **kwargs)
+        finally:
+            acumular_fase('leitura', time.perf_counter() - inicio)
+    
+    def response(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            acumular_fase('formatacao', time.perf_counter() - inicio)
+
+
+def iniciar_medicao():
+    """Marca o início da requisição"""
+    g.inicio_requisicao = time.perf_counter()
+    iniciar_fases()
+
+
+def registrar_medicao(resposta):
+    """Registra latência, status e tempo das fases da requisição por rota"""
+    duracao = time.perf_counter() - g.inicio_requisicao
+    # A regra da rota (ex.: /tarefas/<identificador>) mantém poucas séries
+    rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+    
+    observar('calculo_requisicao_segundos', duracao, rota=rota)
+    incrementar('calculo_requisicoes_total', rota=rota, status=resposta.status_code)
+    for fase, segundos in encerrar_fases().items():
+        # Em fluxos o cálculo acontece depois daqui e é registrado por medir_fluxo
+        if fase == 'calculo' and resposta.is_streamed:
+            continue
+        observar('calculo_fase_segundos', segundos, rota=rota, fase=fase)
+    
+    return resposta
+
+
+if METRICAS_ATIVAS:
+    app.json = ProvedorJsonMedido(app)
+    app.before_request(iniciar_medicao)
+    app.after_request(registrar_medicao)
+
+# Com ADMISSAO_PROXY=1 o cliente é o primeiro endereço de X-Forwarded-For
+CONFIAR_PROXY = os.environ.get('ADMISSAO_PROXY', '0') != '0'
+
+
+def controlar_admissao():
+    """
+    Estima o custo da requisição a partir do corpo bruto (sem converter o JSON)
+    e a recusa com 413 (acima do limite por requisição) ou 429 (orçamento do
+    cliente esgotado), ou registra em g.degradacao os campos a sobrescrever.
+    Envios binários e em blocos sem Content-Length (chunked) são recusados com
+    411, pois o custo deles só pode ser estimado pelo tamanho.
+    """
+    if request.method != 'POST' or request.url_rule is None:
+        return None
+    
+    if request.mimetype in TIPOS_FLUXO and request.content_length is None:
+        return jsonify({
+            'sucesso': False,
+            'erro': 'Envios binários e CSV precisam do cabeçalho Content-Length'
+        }), 411
+    
+    # Envios binários e em blocos são estimados só pelo tamanho, sem ler o corpo
+    corpo = request.get_data(cache=True) if request.is_json else b''
+    tamanho = request.content_length if request.content_length is not None else len(corpo)
+    estimativa = estimar_custo(request.url_rule.rule, corpo, tamanho, request.mimetype,
+                               {'aceita': request.headers.get('Accept', '')})
+    
+    cliente = request.access_route[0] if CONFIAR_PROXY and request.access_route else request.remote_addr
+    decisao = admitir(cliente or 'desconhecido', estimativa)
+    g.custo_estimado = decisao['custo']
+    g.degradacao = decisao['degradacao'] or {}
+    
+    if decisao['status'] == 200:
+        return None
+    
+    resposta = jsonify({
+        'sucesso': False,
+        'erro': ('Custo estimado acima do limite por requisição' if decisao['status'] == 413
+                 else 'Orçamento de cálculo do cliente esgotado, tente novamente mais tarde'),
+        'custo_estimado': round(estimativa['custo'], 6),
+        'grandezas': estimativa['grandezas']
+    })
+    resposta.status_code = decisao['status']
+    if decisao['status'] == 429:
+        resposta.headers['Retry-After'] = str(max(1, int(decisao['espera'] + 0.999)))
+    return resposta
+
+
+def informar_admissao(resposta):
+    """Acrescenta o custo estimado e a degradação aplicada aos cabeçalhos"""
+    if 'custo_estimado' in g:
+        resposta.headers['X-Custo-Estimado'] = f"{g.custo_estimado:.6f}"
+    if g.get('degradacao'):
+        resposta.headers['X-Admissao-Degradada'] = json.dumps(g.degradacao, sort_keys=True)
+    return resposta
+
+
+def dados_admitidos(dados):
+    """Dados da requisição com a degradação decidida na admissão (se houver)"""
+    degradacao = g.get('degradacao')
+    return {**dados, **degradacao} if degradacao and isinstance(dados, dict) else dados
+
+
+if ADMISSAO_ATIVA:
+    app.before_request(controlar_admissao)
+    app.after_request(informar_admissao)
+
+# Perfil sob demanda (?perfil=1 ou X-Perfil: 1), só com PERFIL=1
+if PERFIL_ATIVO:
+    app.wsgi_app = perfil_wsgi(app.wsgi_app)
+
+
+# Cabeçalhos refeitos pela resposta reconstruída ou que não podem ser
+# repetidos para outro cliente; os demais (ex.: X-Trocas-Pivo) são guardados
+CABECALHOS_NAO_GUARDADOS = ('Content-Length', 'Content-Type', 'Set-Cookie')
+
+
+def resultado_em_cache(rota):
+    """
+    Guarda em cache a resposta de uma rota de cálculo, indexada pela rota e pelo
+    JSON recebido (normalizado). Requisições idênticas simultâneas esperam pelo
+    mesmo cálculo. Envios em blocos (CSV/binário) não passam pelo cache.
+    
+    Os cabeçalhos definidos pela rota são guardados junto com o corpo, exceto
+    os hop-by-hop e os de CABECALHOS_NAO_GUARDADOS.
+    """
+    @wraps(rota)
+    def rota_com_cache(*args, **kwargs):
+        dados = request.get_json(silent=True) if request.is_json else None
+        if dados is None:
+            return rota(*args, **kwargs)
+        
+        def calcular():
+            resposta = app.make_response(rota(*args, **kwargs))
+            cabecalhos = [(nome, valor) for nome, valor in resposta.headers.items()
+                          if nome not in CABECALHOS_NAO_GUARDADOS and not is_hop_by_hop_header(nome)]
+            return resposta.get_data(), resposta.status_code, resposta.mimetype, cabecalhos
+        
+        # A resposta também depende da consulta e do formato pedido (Accept)
+        try:
+            chave = chave_canonica(request.path, {
+                'dados': dados,
+                'consulta': request.args.to_dict(flat=False),
+                'aceita': request.headers.get('Accept', ''),
+                'degradacao': g.get('degradacao')
+            })
+        except (ValueError, TypeError, OverflowError, RecursionError):
+            # Dados sem chave canônica (ex.: aninhamento extremo) não passam pelo cache
+            return rota(*args, **kwargs)
+        
+        # Só respostas de sucesso HTTP são guardadas; erros são apenas compartilhados
+        corpo, status, tipo, cabecalhos = obter_ou_calcular(
+            chave,
+            calcular,
+            tamanho=lambda valor: len(valor[0]) if valor[1] == 200 else None
+        )
+        return app.response_class(corpo, status=status, mimetype=tipo, headers=cabecalhos)
+    
+    return rota_com_cache
+
 
 @app.route('/')
 def index():
@@ -49,6 +264,7 @@ def problema4():
 
 
 @app.route('/calcular_minas', methods=['POST'])
+@resultado_em_cache
 def calcular_minas():
     """Endpoint para calcular problema das minas"""
     try:
@@ -82,6 +298,7 @@ def calcular_minas():
 
 
 @app.route('/calcular_wheatstone', methods=['POST'])
+@resultado_em_cache
 def calcular_wheatstone():
     """Endpoint para calcular Ponte de Wheatstone"""
     try:
@@ -116,6 +333,7 @@ def calcular_wheatstone():
 
 
 @app.route('/calcular_sistema_iterativo', methods=['POST'])
+@resultado_em_cache
 def calcular_sistema_iterativo():
     """Endpoint para calcular sistema linear genérico com métodos iterativos"""
     try:
@@ -128,27 +346,12 @@ def calcular_sistema_iterativo():
         tol = float(data.get('tolerancia', 0.0001))
         valores_iniciais = data.get('valores_iniciais', None)
         
-        # Importar métodos
-        from metodos_iterativos import jacobi, gauss_seidel
-        from metodos_diretos import formatar_sistema
-        
         # Resolver usando método escolhido
-        if metodo == 'jacobi':
-            x, num_iter, historico = jacobi(A, b, x0=valores_iniciais, tol=tol)
-            nome_metodo = 'JACOBI'
-        else:  # gauss_seidel
-            x, num_iter, historico = gauss_seidel(A, b, x0=valores_iniciais, tol=tol)
-            nome_metodo = 'GAUSS-SEIDEL'
+        resultado = resolver_sistema_iterativo(A, b, metodo, tol, valores_iniciais)
         
         return jsonify({
             'sucesso': True,
-            'resultado': {
-                'solucao': x,
-                'num_iteracoes': num_iter,
-                'historico': '\n'.join(historico),
-                'sistema_original': formatar_sistema(A, b),
-                'metodo': nome_metodo
-            }
+            'resultado': resultado
         })
     
     except Exception as e:
@@ -158,19 +361,169 @@ def calcular_sistema_iterativo():
         }), 400
 
 
+def responder_fluxo(eventos):
+    """
+    Envia os eventos (nome, dados) de um gerador como Server-Sent Events ou,
+    com "formato": "ndjson" (ou Accept: application/x-ndjson), como NDJSON.
+    
+    O primeiro evento é calculado antes da resposta começar, de modo que dados
+    inválidos ainda recebem um erro 400; erros posteriores viram um evento 'erro'.
+    """
+    data = request.get_json(silent=True) or {}
+    ndjson = (data.get('formato') == 'ndjson' or
+              request.accept_mimetypes.best == 'application/x-ndjson')
+    
+    def formatar(evento, dados):
+        if ndjson:
+            return json.dumps({'evento': evento, **dados}) + '\n'
+        return f"event: {evento}\ndata: {json.dumps(dados)}\n\n"
+    
+    inicio = time.perf_counter()
+    primeiro = next(eventos)
+    calculo_inicial = time.perf_counter() - inicio
+    
+    def gerar():
+        try:
+            for evento, dados in chain([primeiro], eventos):
+                yield formatar(evento, dados)
+        except Exception as e:
+            yield formatar('erro', {'erro': str(e)})
+    
+    return Response(medir_fluxo(gerar(), request.url_rule.rule, calculo_inicial),
+                    mimetype='application/x-ndjson' if ndjson else 'text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/calcular_wheatstone/fluxo', methods=['POST'])
+def calcular_wheatstone_fluxo():
+    """
+    Endpoint que acompanha a Ponte de Wheatstone iteração a iteração (SSE ou NDJSON).
+    
+    Aceita os dados de /calcular_wheatstone e ainda a_cada (emitir uma iteração
+    a cada k) e max_iteracoes.
+    """
+    try:
+        data = request.get_json()
+        
+        eventos = fluxo_ponte_wheatstone(
+            float(data['E']), float(data['R1']), float(data['R2']),
+            float(data['R3']), float(data['R4']), float(data['R5']),
+            float(data.get('tolerancia', 0.0001)),
+            data.get('valores_iniciais', None),
+            data.get('metodo', 'gauss_seidel'),
+            a_cada=int(data.get('a_cada', 1)),
+            max_iter=int(data.get('max_iteracoes', 1000))
+        )
+        
+        return responder_fluxo(eventos)
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/calcular_sistema_iterativo/fluxo', methods=['POST'])
+def calcular_sistema_iterativo_fluxo():
+    """
+    Endpoint que acompanha Jacobi/Gauss-Seidel iteração a iteração (SSE ou NDJSON).
+    
+    Aceita os dados de /calcular_sistema_iterativo e ainda a_cada (emitir uma
+    iteração a cada k) e max_iteracoes.
+    """
+    try:
+        data = request.get_json()
+        
+        eventos = fluxo_sistema_iterativo(
+            data['matriz'],
+            data['vetor_b'],
+            data.get('metodo', 'gauss_seidel'),
+            float(data.get('tolerancia', 0.0001)),
+            data.get('valores_iniciais', None),
+            a_cada=int(data.get('a_cada', 1)),
+            max_iter=int(data.get('max_iteracoes', 1000))
+        )
+        
+        return responder_fluxo(eventos)
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
 @app.route('/calcular_regressoes', methods=['POST'])
+@resultado_em_cache
 def calcular_regressoes():
-    """Endpoint para calcular regressões"""
+    """
+    Endpoint para calcular regressões.
+    
+    Aceita JSON com x e y separados por vírgula ou, para conjuntos grandes,
+    o envio direto (inclusive em partes) de CSV ou float64 little-endian.
+    """
     try:
+        # Envio em blocos: os pontos vão direto para os somatórios
+        if request.mimetype in (TIPO_CSV, TIPO_BINARIO):
+            resultado = resolver_regressoes_blocos(ler_blocos(request.stream, request.mimetype))
+            
+            return jsonify({
+                'sucesso': True,
+                'resultado': resultado
+            })
+        
         data = request.get_json()
         
         # Extrair dados
         x_str = data['x_valores']
-        y_str = data['y_valores']
+        y_str = data.get('y_valores', '')
         
         # Converter strings para listas de floats
         x_dados = [float(val.strip()) for val in x_str.split(',')]
-        y_dados = [float(val.strip()) for val in y_str.split(',')]
+        
+        # y pode vir como expressão de x (ex.: "2*exp(0.3*x)"), avaliada em lote
+        if 'y_expressao' in data:
+            y_dados = compilar_expressao(data['y_expressao'])['lote'](x_dados)
+        else:
+            y_dados = [float(val.strip()) for val in y_str.split(',')]
+        
+        if len(x_dados) != len(y_dados):
+            raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+        
+        if len(x_dados) < 2:
+            raise ValueError("São necessários pelo menos 2 pontos")
+        
+        # Resolver ('nao_linear' refina a exponencial por Levenberg-Marquardt)
+        resultado = resolver_regressoes(x_dados, y_dados, data.get('ajuste', 'linearizado'))
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/calcular_selecao_modelos', methods=['POST'])
+@resultado_em_cache
+def calcular_selecao_modelos():
+    """Endpoint para ajustar todas as famílias de curvas e classificá-las por AIC"""
+    try:
+        data = request.get_json()
+        
+        # Converter strings para listas de floats
+        x_dados = [float(val.strip()) for val in data['x_valores'].split(',')]
+        
+        # y pode vir como expressão de x, avaliada em lote
+        if 'y_expressao' in data:
+            y_dados = compilar_expressao(data['y_expressao'])['lote'](x_dados)
+        else:
+            y_dados = [float(val.strip()) for val in data['y_valores'].split(',')]
         
         if len(x_dados) != len(y_dados):
             raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
@@ -179,7 +532,89 @@ def calcular_regressoes():
             raise ValueError("São necessários pelo menos 2 pontos")
         
         # Resolver
-        resultado = resolver_regressoes(x_dados, y_dados)
+        resultado = resolver_selecao_modelos(x_dados, y_dados)
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/calcular_incerteza', methods=['POST'])
+@resultado_em_cache
+def calcular_incerteza():
+    """Endpoint para bootstrap e validação cruzada das regressões"""
+    try:
+        data = request.get_json()
+        
+        # Converter strings para listas de floats
+        x_dados = [float(val.strip()) for val in data['x_valores'].split(',')]
+        y_dados = [float(val.strip()) for val in data['y_valores'].split(',')]
+        
+        if len(x_dados) != len(y_dados):
+            raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+        
+        pontos_previsao = data.get('pontos_previsao', None)
+        if pontos_previsao is not None:
+            pontos_previsao = [float(p) for p in pontos_previsao]
+        
+        # Resolver
+        resultado = resolver_incerteza(
+            x_dados, y_dados,
+            familias=data.get('modelos', None),
+            replicas=int(data.get('replicas', 1000)),
+            k=int(data.get('k', 5)),
+            semente=int(data.get('semente', 0)),
+            nivel_confianca=float(data.get('nivel_confianca', 0.95)),
+            pontos_previsao=pontos_previsao
+        )
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/calcular_previsao', methods=['POST'])
+@resultado_em_cache
+def calcular_previsao():
+    """Endpoint para previsão em lote de um modelo ajustado (ex.: Lei de Moore)"""
+    try:
+        data = request.get_json()
+        formato = data.get('formato', 'json')
+        validar_formato(formato)
+        
+        # Modelo informado diretamente ou ajustado da Lei de Moore aos dados históricos
+        if 'modelo' in data:
+            modelo = data['modelo']
+        else:
+            x_dados = [float(val.strip()) for val in data['x_valores'].split(',')]
+            y_dados = [float(val.strip()) for val in data['y_valores'].split(',')]
+            
+            if len(x_dados) != len(y_dados):
+                raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+            
+            modelo = ajustar_lei_moore(x_dados, y_dados)
+        
+        # Resolver
+        resultado = resolver_previsao(
+            modelo,
+            pontos=data.get('pontos', None),
+            grade=data.get('grade', None),
+            formato=formato
+        )
         
         return jsonify({
             'sucesso': True,
@@ -194,9 +629,24 @@ def calcular_regressoes():
 
 
 @app.route('/calcular_integracao', methods=['POST'])
+@resultado_em_cache
 def calcular_integracao():
-    """Endpoint para calcular integração numérica"""
+    """
+    Endpoint para calcular integração numérica.
+    
+    Aceita JSON com x e y separados por vírgula ou, para séries grandes,
+    o envio direto (inclusive em partes) de CSV ou float64 little-endian.
+    """
     try:
+        # Envio em blocos: os pontos vão direto para a integração incremental
+        if request.mimetype in (TIPO_CSV, TIPO_BINARIO):
+            resultado = resolver_integracao_blocos(ler_blocos(request.stream, request.mimetype))
+            
+            return jsonify({
+                'sucesso': resultado['sucesso'],
+                'resultado': resultado
+            }), (200 if resultado['sucesso'] else 400)
+        
         data = request.get_json()
         
         # Extrair dados
@@ -229,26 +679,287 @@ def calcular_integracao():
         }), 400
 
 
+@app.route('/calcular_integral_funcao', methods=['POST'])
+@resultado_em_cache
+def calcular_integral_funcao():
+    """Endpoint para integrar uma função dada como expressão (Romberg ou Gauss-Kronrod)"""
+    try:
+        data = request.get_json()
+        
+        expressao = data['expressao']
+        a = float(data['a'])
+        b = float(data['b'])
+        metodo = data.get('metodo', 'gauss_kronrod')
+        tol = float(data.get('tolerancia', 1e-10))
+        
+        # Resolver
+        resultado = resolver_integral_funcao(expressao, a, b, metodo, tol)
+        
+        return jsonify({
+            'sucesso': resultado['sucesso'],
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/calcular_volume', methods=['POST'])
+@resultado_em_cache
+def calcular_volume():
+    """
+    Endpoint para calcular o volume sob uma grade 2-D de profundidades.
+    
+    Aceita JSON com 'profundidades' (lista de linhas) ou, para grades grandes,
+    um arquivo .npy / float64 bruto no corpo (application/octet-stream ou
+    application/x-npy), com a forma e o espaçamento na query string (linhas,
+    colunas, x_passo, y_passo, ...). Grades retilíneas enviadas como arquivo
+    levam x_valores/y_valores na query string ou, com coordenadas=anexas, os
+    vetores x e y em float64 logo após a grade.
+    """
+    try:
+        if request.mimetype in TIPOS_MATRIZ:
+            args = request.args
+            forma = None
+            if 'linhas' in args and 'colunas' in args:
+                forma = (int(args['linhas']), int(args['colunas']))
+            
+            resultado = integrar_grade_fluxo(
+                request.stream,
+                forma=forma,
+                x=args.get('x_valores'),
+                y=args.get('y_valores'),
+                coordenadas_anexas=args.get('coordenadas') == 'anexas',
+                metodo=args.get('metodo', 'simpson'),
+                x_inicio=float(args.get('x_inicio', 0.0)),
+                x_passo=float(args.get('x_passo', 1.0)),
+                y_inicio=float(args.get('y_inicio', 0.0)),
+                y_passo=float(args.get('y_passo', 1.0))
+            )
+        else:
+            data = request.get_json()
+            
+            profundidades = [[float(v) for v in linha] for linha in data['profundidades']]
+            resultado = integrar_grade(
+                profundidades,
+                data.get('x_valores'),
+                data.get('y_valores'),
+                data.get('metodo', 'simpson')
+            )
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/calcular_interpolacao', methods=['POST'])
+@resultado_em_cache
+def calcular_interpolacao():
+    """Endpoint para interpolar (spline cúbica ou Newton) e reamostrar um conjunto de pontos"""
+    try:
+        data = request.get_json()
+        
+        # Converter strings para listas de floats
+        x_dados = [float(val.strip()) for val in data['x_valores'].split(',')]
+        y_dados = [float(val.strip()) for val in data['y_valores'].split(',')]
+        
+        pontos = data.get('pontos')
+        if isinstance(pontos, str):
+            pontos = [float(val.strip()) for val in pontos.split(',')]
+        
+        # Resolver
+        resultado = resolver_interpolacao(
+            x_dados, y_dados,
+            metodo=data.get('metodo', 'spline_natural'),
+            pontos=pontos,
+            grade=data.get('grade'),
+            derivada_inicio=float(data.get('derivada_inicio', 0.0)),
+            derivada_fim=float(data.get('derivada_fim', 0.0))
+        )
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/calcular_edo', methods=['POST'])
+@resultado_em_cache
+def calcular_edo():
+    """Endpoint para integrar um sistema de EDOs (RK4 ou RK45) para um lote de condições iniciais"""
+    try:
+        data = dados_admitidos(request.get_json())
+        
+        equacoes = data['equacoes']
+        if isinstance(equacoes, str):
+            equacoes = [equacoes]
+        
+        condicoes = data['condicoes_iniciais']
+        # Uma única trajetória pode ser enviada como lista simples
+        if condicoes and not isinstance(condicoes[0], (list, tuple)):
+            condicoes = [condicoes]
+        
+        # Resolver
+        resultado = resolver_edo(
+            equacoes,
+            float(data['t0']),
+            float(data['tf']),
+            condicoes,
+            metodo=data.get('metodo', 'rk45'),
+            nomes=data.get('nomes'),
+            parametros=data.get('parametros'),
+            passos=int(data.get('passos', 1000)),
+            a_cada=int(data.get('a_cada', 1)),
+            t_saida=data.get('t_saida'),
+            atol=float(data.get('atol', 1e-8)),
+            rtol=float(data.get('rtol', 1e-6)),
+            max_passos=int(data.get('max_passos', MAXIMO_PASSOS_RK45))
+        )
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/indice_area', methods=['POST'])
+def criar_indice_area():
+    """Endpoint para construir o índice de áreas acumuladas de um conjunto (x, y)"""
+    try:
+        if request.mimetype in (TIPO_CSV, TIPO_BINARIO):
+            x_dados = array('d')
+            y_dados = array('d')
+            for x_bloco, y_bloco in ler_blocos(request.stream, request.mimetype):
+                x_dados.extend(x_bloco)
+                y_dados.extend(y_bloco)
+        else:
+            data = request.get_json()
+            x_dados = [float(val.strip()) for val in data['x_valores'].split(',')]
+            y_dados = [float(val.strip()) for val in data['y_valores'].split(',')]
+        
+        if len(x_dados) != len(y_dados):
+            raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+        
+        resultado = registrar_indice(x_dados, y_dados)
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/indice_area/<identificador>/consultas', methods=['POST'])
+def consultar_indice_area(identificador):
+    """Endpoint para consultar em lote as áreas entre pares de x de um índice em cache"""
+    try:
+        data = request.get_json()
+        
+        resultado = consultar_areas(identificador, data['intervalos'], data.get('metodo', 'simpson'))
+        
+        if resultado is None:
+            return jsonify({
+                'sucesso': False,
+                'erro': f"Índice {identificador} não encontrado (envie os dados novamente)"
+            }), 404
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
 
 
 @app.route('/calcular_sistema', methods=['POST'])
+@resultado_em_cache
 def calcular_sistema():
-    """Endpoint para calcular sistema linear genérico"""
+    """
+    Endpoint para calcular sistema linear genérico.
+    
+    Além do JSON, aceita a matriz aumentada [A | b] em float64 little-endian
+    (application/octet-stream com cabeçalho de forma, ou application/x-npy).
+    Com Accept: application/octet-stream ou application/x-npy a solução volta
+    no mesmo formato binário, sempre calculada pela LU compacta (informada no
+    cabeçalho X-Metodo); ?fatores=1 acrescenta os fatores LU compactos e a
+    permutação.
+    """
     try:
-        data = request.get_json()
+        formato_saida = request.accept_mimetypes.best_match(['application/json', *TIPOS_MATRIZ])
+        saida_binaria = formato_saida in TIPOS_MATRIZ
         
-        # Extrair dados da matriz e vetor b
-        A = data['matriz']  # Lista de listas
-        b = data['vetor_b']  # Lista
-        metodo = data.get('metodo', 'gauss')
+        if request.mimetype in TIPOS_MATRIZ:
+            # Matriz aumentada binária: lida direto para arrays, sem registro de passos
+            A, b = ler_sistema_aumentado(request.get_data())
+            metodo = request.args.get('metodo', 'lu')
+            registrar_passos = False
+            fatores = request.args.get('fatores', '0') not in ('0', 'false', '')
+        else:
+            data = dados_admitidos(request.get_json())
+            
+            # Extrair dados da matriz e vetor b
+            A = data['matriz']  # Lista de listas
+            b = data['vetor_b']  # Lista
+            metodo = data.get('metodo', 'gauss')
+            registrar_passos = bool(data.get('passos', True)) and not saida_binaria
+            fatores = bool(data.get('fatores', False)) or request.args.get('fatores', '0') not in ('0', 'false', '')
+            
+            # Validar dimensões
+            n = len(b)
+            if len(A) != n or any(len(linha) != n for linha in A):
+                raise ValueError("A matriz deve ser quadrada NxN onde N é o tamanho do vetor b")
         
-        # Validar dimensões
-        n = len(b)
-        if len(A) != n or any(len(linha) != n for linha in A):
-            raise ValueError("A matriz deve ser quadrada NxN onde N é o tamanho do vetor b")
+        if saida_binaria:
+            # Sem passos os três métodos dão a mesma solução: usa-se a LU compacta
+            if metodo not in ('gauss', 'jordan', 'lu'):
+                raise ValueError(f"Método desconhecido: {metodo}")
+            resolucao = resolver_lu(A, b)
+            if resolucao is None:
+                raise ValueError("Pivô zero encontrado: a matriz é singular")
+            
+            corpo = escrever_matriz(resolucao['solucao'], formato_saida)
+            if fatores:
+                corpo += escrever_matriz(resolucao['lu'], formato_saida)
+                corpo += escrever_matriz(resolucao['permutacao'], formato_saida)
+            
+            return Response(corpo, mimetype=formato_saida,
+                            headers={'X-Trocas-Pivo': str(resolucao['trocas']),
+                                     'X-Metodo': 'lu',
+                                     'X-Metodo-Solicitado': metodo})
         
         # Resolver
-        resultado = resolver_sistema_generico(A, b, metodo)
+        resultado = resolver_sistema_generico(A, b, metodo, registrar_passos)
         
         return jsonify({
             'sucesso': resultado['sucesso'],
@@ -262,6 +973,219 @@ def calcular_sistema():
         }), 400
 
 
+@app.route('/tarefas', methods=['POST'])
+def criar_tarefa():
+    """
+    Endpoint para submeter um sistema linear como tarefa assíncrona.
+    
+    Recebe {"tipo": "sistema" | "sistema_iterativo", "dados": {...}}, com os
+    mesmos dados de /calcular_sistema e /calcular_sistema_iterativo. Problemas
+    pequenos voltam resolvidos (200); os demais recebem um id (202).
+    """
+    try:
+        data = request.get_json()
+        
+        tarefa = submeter_tarefa(data['tipo'], dados_admitidos(data['dados']))
+        
+        if tarefa is None:
+            return jsonify({
+                'sucesso': False,
+                'erro': 'Fila de tarefas cheia, tente novamente em instantes'
+            }), 503
+        
+        if tarefa['estado'] == 'erro':
+            return jsonify({
+                'sucesso': False,
+                'erro': tarefa['erro'],
+                'tarefa': tarefa
+            }), 400
+        
+        status = 200 if tarefa['estado'] == 'concluida' else 202
+        resposta = jsonify({
+            'sucesso': True,
+            'tarefa': tarefa
+        })
+        resposta.status_code = status
+        if status == 202:
+            resposta.headers['Location'] = f"/tarefas/{tarefa['id']}"
+        return resposta
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/tarefas', methods=['GET'])
+def listar_tarefas():
+    """Endpoint com a ocupação da fila de tarefas"""
+    return jsonify({
+        'sucesso': True,
+        'resultado': estatisticas_tarefas()
+    })
+
+
+@app.route('/tarefas/<identificador>', methods=['GET'])
+def obter_tarefa(identificador):
+    """Endpoint para consultar uma tarefa (?esperar=segundos espera pela conclusão, até 30 s)"""
+    try:
+        esperar = min(float(request.args.get('esperar', 0)), 30.0)
+        tarefa = consultar_tarefa(identificador, esperar)
+        
+        if tarefa is None:
+            return jsonify({
+                'sucesso': False,
+                'erro': f"Tarefa {identificador} não encontrada (ou expirada)"
+            }), 404
+        
+        return jsonify({
+            'sucesso': True,
+            'tarefa': tarefa
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/tarefas/<identificador>/eventos', methods=['GET'])
+def eventos_tarefa(identificador):
+    """Endpoint que acompanha uma tarefa por Server-Sent Events até ela terminar"""
+    if consultar_tarefa(identificador) is None:
+        return jsonify({
+            'sucesso': False,
+            'erro': f"Tarefa {identificador} não encontrada (ou expirada)"
+        }), 404
+    
+    def gerar():
+        ultimo_estado = None
+        while True:
+            tarefa = consultar_tarefa(identificador, esperar=1.0)
+            if tarefa is None:
+                yield "event: erro\ndata: {\"erro\": \"Tarefa expirada\"}\n\n"
+                return
+            if tarefa['estado'] != ultimo_estado:
+                ultimo_estado = tarefa['estado']
+                yield f"event: estado\ndata: {json.dumps(tarefa)}\n\n"
+            else:
+                # Comentário SSE para manter a conexão viva
+                yield ": aguardando\n\n"
+            if tarefa['estado'] in ('concluida', 'erro', 'cancelada'):
+                return
+    
+    return Response(gerar(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/tarefas/<identificador>', methods=['DELETE'])
+def remover_tarefa(identificador):
+    """Endpoint para cancelar uma tarefa"""
+    tarefa = cancelar_tarefa(identificador)
+    
+    if tarefa is None:
+        return jsonify({
+            'sucesso': False,
+            'erro': f"Tarefa {identificador} não encontrada (ou expirada)"
+        }), 404
+    
+    # O processo do pool não é interrompido: a tarefa em execução continua
+    if tarefa['estado'] == 'executando':
+        return jsonify({
+            'sucesso': False,
+            'erro': f"Tarefa {identificador} já está em execução e não pode ser cancelada",
+            'tarefa': tarefa
+        }), 409
+    
+    return jsonify({
+        'sucesso': True,
+        'tarefa': tarefa
+    })
+
+
+@app.route('/lote', methods=['POST'])
+def calcular_lote():
+    """
+    Endpoint para resolver muitos problemas em uma requisição.
+    
+    Recebe {"itens": [{"tipo": "minas" | "wheatstone" | ..., "dados": {...}}, ...]}
+    (ou a lista diretamente). Responde com os resultados na ordem dos itens;
+    com "fluxo": true (ou ?fluxo=1) envia NDJSON, uma linha por item assim
+    que ele termina, seguida de uma linha de resumo.
+    """
+    try:
+        data = request.get_json()
+        
+        if isinstance(data, dict):
+            itens = data.get('itens')
+            paralelo = data.get('paralelo', None)
+            fluxo = bool(data.get('fluxo', False))
+        else:
+            itens = data
+            paralelo = None
+            fluxo = False
+        fluxo = fluxo or request.args.get('fluxo', '0') not in ('0', 'false', '')
+        
+        validar_lote(itens)
+        
+        if fluxo:
+            def gerar():
+                erros = 0
+                for resposta in resultados_conforme_concluem(itens, paralelo):
+                    erros += not resposta['sucesso']
+                    yield json.dumps(resposta) + '\n'
+                yield json.dumps({'fim': True, 'total': len(itens), 'erros': erros}) + '\n'
+            
+            return Response(medir_fluxo(gerar(), request.url_rule.rule),
+                            mimetype='application/x-ndjson', headers={'Cache-Control': 'no-cache'})
+        
+        # Resolver
+        resultado = resolver_lote(itens, paralelo)
+        
+        return jsonify({
+            'sucesso': True,
+            'resultado': resultado
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'erro': str(e)
+        }), 400
+
+
+@app.route('/metrics', methods=['GET'])
+def metricas_prometheus():
+    """Endpoint com as métricas no formato de texto do Prometheus (exige METRICAS=1)"""
+    if not METRICAS_ATIVAS:
+        return jsonify({
+            'sucesso': False,
+            'erro': 'Métricas desativadas (defina a variável de ambiente METRICAS=1)'
+        }), 404
+    
+    return Response(formatar_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/cache', methods=['GET'])
+def estatisticas_do_cache():
+    """Endpoint com os contadores de acertos/faltas e a ocupação do cache de resultados"""
+    return jsonify({
+        'sucesso': True,
+        'resultado': estatisticas_cache()
+    })
+
+
+@app.route('/cache', methods=['DELETE'])
+def limpar_cache_resultados():
+    """Endpoint para esvaziar o cache de resultados"""
+    limpar_cache()
+    return jsonify({
+        'sucesso': True,
+        'resultado': estatisticas_cache()
+    })
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("SISTEMA DE CÁLCULO NUMÉRICO")
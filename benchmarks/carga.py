@@ -0,0 +1,479 @@
+"""
+Teste de Carga da Aplicação
+Sobe a aplicação em um servidor local (gunicorn ou o servidor do Werkzeug,
+com o número de processos escolhido) e a exercita com clientes concorrentes
+em uma mistura de cenários realistas: os problemas padrão da interface,
+sistemas médios e regressões grandes. O relatório em JSON traz vazão,
+percentis de latência e taxas de erro, no total, por cenário e por rota.
+Como os corpos se repetem, o servidor local sobe sem o cache de resultados e
+sem o controle de admissão (AMBIENTE_PADRAO), para medir o cálculo e não
+acertos do cache; --ambiente sobrescreve.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/carga.py --duracao 30 --concorrencia 8 --processos 2
+    python benchmarks/carga.py --mistura padrao=1 --requisicoes 2000 --saida carga.json
+    python benchmarks/carga.py --ambiente CACHE_RESULTADOS=1 --ambiente ADMISSAO=1
+    python benchmarks/carga.py --url http://localhost:5000 --duracao 10
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+from resolvedores import ambiente, gerar_matriz, gerar_pontos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dados padrão dos formulários da interface (templates/problema*.html)
+PADRAO_MINAS = {
+    'd1': 4800, 'd2': 5800, 'd3': 5700,
+    'mina1_areia': 55, 'mina1_fino': 30, 'mina1_grosso': 15,
+    'mina2_areia': 25, 'mina2_fino': 45, 'mina2_grosso': 30,
+    'mina3_areia': 25, 'mina3_fino': 20, 'mina3_grosso': 55,
+    'metodo': 'gauss'
+}
+PADRAO_WHEATSTONE = {'E': 30, 'R1': 20, 'R2': 120, 'R3': 120, 'R4': 120, 'R5': 120,
+                     'tolerancia': 0.0001, 'metodo': 'gauss_seidel'}
+PADRAO_REGRESSOES = {'x_valores': '0, 1.5, 2.6, 4.2, 6, 8.2, 10, 11.4', 'y_valores': '18, 13, 11, 9, 6, 4, 2, 1'}
+PADRAO_INTEGRACAO = {'x_valores': '0, 2, 4, 6, 8, 10, 12, 14, 16, 18, 20',
+                     'y_valores': '0.0, 1.8, 2.0, 4.0, 4.0, 6.0, 4.0, 3.6, 3.4, 2.8, 0.0',
+                     'metodo': 'automatico'}
+
+MISTURA_PADRAO = 'padrao=0.7,sistemas_medios=0.2,regressoes_grandes=0.1'
+
+STATUS_REJEICAO = (413, 429, 503)
+
+# Variáveis do servidor local, sobrescritas por --ambiente
+AMBIENTE_PADRAO = {'CACHE_RESULTADOS': '0', 'ADMISSAO': '0'}
+
+# Sistemas médios: ordens sorteadas neste intervalo
+ORDEM_MEDIA = (30, 80)
+# Regressões grandes: quantidades de pontos sorteadas neste intervalo
+PONTOS_GRANDES = (20000, 100000)
+
+
+# ==================== CENÁRIOS ====================
+
+def texto_valores(valores):
+    """Lista de números como o texto separado por vírgulas dos formulários"""
+    return ','.join(f"{valor:.6g}" for valor in valores)
+
+
+def cenario_padrao(aleatorio, variantes):
+    """Os quatro problemas da interface com os valores padrão (sempre os mesmos corpos)"""
+    return [
+        ('/calcular_minas', PADRAO_MINAS),
+        ('/calcular_wheatstone', PADRAO_WHEATSTONE),
+        ('/calcular_regressoes', PADRAO_REGRESSOES),
+        ('/calcular_integracao', PADRAO_INTEGRACAO),
+    ]
+
+
+def cenario_sistemas_medios(aleatorio, variantes):
+    """Sistemas de ordem média por métodos diretos (com passos) e iterativos"""
+    pedidos = []
+    for variante in range(variantes):
+        n = aleatorio.randint(*ORDEM_MEDIA)
+        A, b = gerar_matriz(aleatorio.choice(('dominante', 'spd', 'banda')), n, variante)
+        if variante % 2 == 0:
+            pedidos.append(('/calcular_sistema', {
+                'matriz': A, 'vetor_b': b, 'metodo': aleatorio.choice(('gauss', 'jordan', 'lu'))
+            }))
+        else:
+            pedidos.append(('/calcular_sistema_iterativo', {
+                'matriz': A, 'vetor_b': b, 'metodo': aleatorio.choice(('jacobi', 'gauss_seidel'))
+            }))
+    return pedidos
+
+
+def cenario_regressoes_grandes(aleatorio, variantes):
+    """Regressões e integrações com dezenas de milhares de pontos"""
+    pedidos = []
+    for variante in range(variantes):
+        x, y = gerar_pontos(aleatorio.randint(*PONTOS_GRANDES), variante)
+        rota = '/calcular_regressoes' if variante % 2 == 0 else '/calcular_integracao'
+        pedidos.append((rota, {'x_valores': texto_valores(x), 'y_valores': texto_valores(y)}))
+    return pedidos
+
+
+CENARIOS = {
+    'padrao': cenario_padrao,
+    'sistemas_medios': cenario_sistemas_medios,
+    'regressoes_grandes': cenario_regressoes_grandes
+}
+
+
+def ler_mistura(texto):
+    """'padrao=0.7,sistemas_medios=0.3' -> {'padrao': 0.7, 'sistemas_medios': 0.3}"""
+    mistura = {}
+    for parte in texto.split(','):
+        nome, _, peso = parte.partition('=')
+        nome = nome.strip()
+        if nome not in CENARIOS:
+            raise ValueError(f"Cenário desconhecido: {nome} (disponíveis: {', '.join(CENARIOS)})")
+        mistura[nome] = float(peso or 1)
+    if sum(mistura.values()) <= 0:
+        raise ValueError("A mistura precisa de ao menos um peso positivo")
+    return mistura
+
+
+def preparar_pedidos(mistura, variantes, semente):
+    """
+    Monta de antemão os corpos de cada cenário (a geração não entra na medição).
+    
+    Retorna:
+        {cenário: [(rota, corpo em bytes), ...]}
+    """
+    aleatorio = random.Random(semente)
+    return {
+        nome: [(rota, json.dumps(dados).encode('utf-8'))
+               for rota, dados in CENARIOS[nome](aleatorio, variantes)]
+        for nome in mistura
+    }
+
+
+# ==================== SERVIDOR ====================
+
+def porta_livre():
+    """Porta TCP livre em 127.0.0.1"""
+    with socket.socket() as conexao:
+        conexao.bind(('127.0.0.1', 0))
+        return conexao.getsockname()[1]
+
+
+def servir_werkzeug(porta, processos):
+    """Servidor do Werkzeug (executado no processo filho quando não há gunicorn)"""
+    sys.path.insert(0, RAIZ)
+    from werkzeug.serving import run_simple
+    from app import app
+    
+    # Um processo: threads; vários: um processo por requisição (fork)
+    run_simple('127.0.0.1', porta, app, threaded=processos == 1, processes=processos)
+
+
+def iniciar_servidor(servidor, processos, threads, ambiente_extra):
+    """
+    Sobe a aplicação em uma porta livre.
+    
+    Parâmetros:
+        servidor: 'gunicorn', 'werkzeug' ou 'auto' (gunicorn se instalado)
+        processos: processos de trabalho
+        threads: threads por processo (só gunicorn)
+        ambiente_extra: variáveis de ambiente da aplicação
+    
+    Retorna:
+        (processo, url base, nome do servidor)
+    """
+    if servidor == 'auto':
+        try:
+            import gunicorn  # noqa: F401
+            servidor = 'gunicorn'
+        except ImportError:
+            servidor = 'werkzeug'
+    
+    porta = porta_livre()
+    variaveis = dict(os.environ, **ambiente_extra)
+    
+    if servidor == 'gunicorn':
+        comando = [sys.executable, '-m', 'gunicorn', '--workers', str(processos), '--threads', str(threads),
+                   '--bind', f'127.0.0.1:{porta}', '--log-level', 'warning', 'app:app']
+    else:
+        comando = [sys.executable, os.path.abspath(__file__), '--servir', str(porta), '--processos', str(processos)]
+    
+    processo = subprocess.Popen(comando, cwd=RAIZ, env=variaveis,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{porta}'
+    aguardar_servidor(url, processo)
+    return processo, url, servidor
+
+
+def aguardar_servidor(url, processo=None, limite=30.0):
+    """Espera a página inicial responder (ou o processo terminar)"""
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if processo is not None and processo.poll() is not None:
+            raise RuntimeError(f"O servidor terminou ao iniciar (código {processo.returncode})")
+        try:
+            with urllib.request.urlopen(url + '/', timeout=2) as resposta:
+                if resposta.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"O servidor não respondeu em {limite:.0f} s")
+
+
+def encerrar_servidor(processo):
+    """Termina o servidor local"""
+    processo.terminate()
+    try:
+        processo.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+        processo.wait()
+
+
+# ==================== CLIENTES ====================
+
+def cliente(url, pedidos, mistura, semente, parar, restantes, amostras, tempo_limite):
+    """
+    Laço de um cliente: sorteia um cenário pela mistura e um de seus corpos,
+    envia e registra (cenário, rota, status, latência, instante final) em
+    amostras. Reaproveita a conexão (keep-alive) e reabre após falhas.
+    """
+    aleatorio = random.Random(semente)
+    nomes = list(mistura)
+    pesos = [mistura[nome] for nome in nomes]
+    endereco = urlsplit(url)
+    conexao = None
+    
+    while not parar.is_set():
+        if restantes is not None:
+            with restantes['trava']:
+                if restantes['valor'] <= 0:
+                    break
+                restantes['valor'] -= 1
+        
+        cenario = aleatorio.choices(nomes, pesos)[0]
+        rota, corpo = aleatorio.choice(pedidos[cenario])
+        
+        inicio = time.perf_counter()
+        try:
+            if conexao is None:
+                conexao = http.client.HTTPConnection(endereco.hostname, endereco.port, timeout=tempo_limite)
+            conexao.request('POST', rota, body=corpo, headers={'Content-Type': 'application/json'})
+            resposta = conexao.getresponse()
+            resposta.read()
+            status = resposta.status
+            if resposta.will_close:
+                conexao.close()
+                conexao = None
+        except (OSError, http.client.HTTPException):
+            status = 0
+            if conexao is not None:
+                conexao.close()
+            conexao = None
+        fim = time.perf_counter()
+        
+        amostras.append((cenario, rota, status, fim - inicio, fim))
+    
+    if conexao is not None:
+        conexao.close()
+
+
+def rodada(url, pedidos, mistura, concorrencia, duracao=None, requisicoes=None, semente=0, tempo_limite=120.0):
+    """
+    Executa os clientes por `duracao` segundos ou até `requisicoes` respostas.
+    
+    Retorna:
+        (amostras, segundos decorridos)
+    """
+    parar = threading.Event()
+    amostras = []
+    restantes = {'valor': requisicoes, 'trava': threading.Lock()} if requisicoes is not None else None
+    
+    clientes = [
+        threading.Thread(target=cliente, daemon=True,
+                         args=(url, pedidos, mistura, semente * 1000 + i, parar, restantes, amostras, tempo_limite))
+        for i in range(concorrencia)
+    ]
+    
+    inicio = time.perf_counter()
+    for thread in clientes:
+        thread.start()
+    if restantes is None:
+        time.sleep(duracao)
+        parar.set()
+    for thread in clientes:
+        thread.join()
+    
+    return amostras, time.perf_counter() - inicio
+
+
+def percentil(ordenados, fracao):
+    """Percentil pelo posto mais próximo em uma lista já ordenada"""
+    if not ordenados:
+        return None
+    indice = max(0, min(len(ordenados) - 1, math.ceil(fracao * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def resumir(amostras, duracao):
+    """Vazão, latências (s) e contagem por status de um conjunto de amostras"""
+    latencias = sorted(amostra[3] for amostra in amostras)
+    status = {}
+    for amostra in amostras:
+        status[str(amostra[2])] = status.get(str(amostra[2]), 0) + 1
+    
+    total = len(amostras)
+    # Recusas do controle de admissão e da fila de tarefas contam à parte dos erros
+    rejeitadas = sum(1 for amostra in amostras if amostra[2] in STATUS_REJEICAO)
+    erros = sum(1 for amostra in amostras if amostra[2] == 0 or amostra[2] >= 400) - rejeitadas
+    
+    return {
+        'requisicoes': total,
+        'vazao': round(total / duracao, 3) if duracao > 0 else None,
+        'latencia': {
+            'media': sum(latencias) / total if total else None,
+            'p50': percentil(latencias, 0.50),
+            'p90': percentil(latencias, 0.90),
+            'p99': percentil(latencias, 0.99),
+            'maxima': latencias[-1] if latencias else None
+        },
+        'erros': erros,
+        'taxa_erros': round(erros / total, 6) if total else None,
+        'rejeitadas': rejeitadas,
+        'taxa_rejeicao': round(rejeitadas / total, 6) if total else None,
+        'status': status
+    }
+
+
+def executar_carga(url, pedidos, mistura, concorrencia, duracao=None, requisicoes=None,
+                   aquecimento=0.0, semente=0, tempo_limite=120.0):
+    """
+    Dispara os clientes concorrentes e resume o resultado.
+    
+    Parâmetros:
+        url: endereço base da aplicação
+        pedidos: corpos preparados por cenário (preparar_pedidos)
+        mistura: pesos dos cenários
+        concorrencia: número de clientes simultâneos
+        duracao: segundos de medição (se requisicoes não for dado)
+        requisicoes: total de requisições medidas
+        aquecimento: segundos de carga antes da medição, descartados
+        semente: semente dos sorteios
+        tempo_limite: tempo máximo de espera de cada resposta (s)
+    
+    Retorna:
+        dicionário com o resumo total, por cenário e por rota
+    """
+    if aquecimento > 0:
+        rodada(url, pedidos, mistura, concorrencia, duracao=aquecimento,
+               semente=semente + 1, tempo_limite=tempo_limite)
+    
+    amostras, decorrido = rodada(url, pedidos, mistura, concorrencia, duracao, requisicoes,
+                                 semente, tempo_limite)
+    
+    relatorio = resumir(amostras, decorrido)
+    relatorio['duracao'] = round(decorrido, 3)
+    relatorio['por_cenario'] = {
+        nome: resumir([a for a in amostras if a[0] == nome], decorrido) for nome in mistura
+    }
+    relatorio['por_rota'] = {
+        rota: resumir([a for a in amostras if a[1] == rota], decorrido)
+        for rota in sorted({amostra[1] for amostra in amostras})
+    }
+    return relatorio
+
+
+def ler_ambiente(valores):
+    """['CHAVE=VALOR', ...] -> {'CHAVE': 'VALOR'}"""
+    ambiente_extra = {}
+    for valor in valores or ():
+        chave, separador, conteudo = valor.partition('=')
+        if not separador:
+            raise argparse.ArgumentTypeError(f"Esperado CHAVE=VALOR: {valor}")
+        ambiente_extra[chave] = conteudo
+    return ambiente_extra
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Teste de carga das rotas /calcular_*")
+    parser.add_argument('--url', help="aplicação já em execução (não sobe servidor local)")
+    parser.add_argument('--servidor', choices=('auto', 'gunicorn', 'werkzeug'), default='auto')
+    parser.add_argument('--processos', type=int, default=2, help="processos do servidor (padrão: 2)")
+    parser.add_argument('--threads', type=int, default=1, help="threads por processo no gunicorn (padrão: 1)")
+    parser.add_argument('--ambiente', action='append', metavar='CHAVE=VALOR',
+                        help="variável de ambiente da aplicação (repetível; padrão: CACHE_RESULTADOS=0 ADMISSAO=0)")
+    parser.add_argument('--concorrencia', type=int, default=8, help="clientes simultâneos (padrão: 8)")
+    parser.add_argument('--duracao', type=float, default=30.0, help="segundos de medição (padrão: 30)")
+    parser.add_argument('--requisicoes', type=int, help="total de requisições (em vez de --duracao)")
+    parser.add_argument('--aquecimento', type=float, default=2.0, help="segundos descartados (padrão: 2)")
+    parser.add_argument('--mistura', default=MISTURA_PADRAO, help=f"pesos dos cenários (padrão: {MISTURA_PADRAO})")
+    parser.add_argument('--variantes', type=int, default=8, help="corpos distintos por cenário (padrão: 8)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--tempo-limite', type=float, default=120.0, help="espera máxima por resposta (s)")
+    parser.add_argument('--saida', help="arquivo JSON do relatório (padrão: saída padrão)")
+    parser.add_argument('--servir', type=int, help=argparse.SUPPRESS)
+    opcoes = parser.parse_args(argumentos)
+    
+    if opcoes.servir is not None:
+        servir_werkzeug(opcoes.servir, opcoes.processos)
+        return 0
+    
+    try:
+        mistura = ler_mistura(opcoes.mistura)
+        ambiente_extra = {**AMBIENTE_PADRAO, **ler_ambiente(opcoes.ambiente)}
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+    
+    print("Preparando os corpos das requisições...", file=sys.stderr)
+    pedidos = preparar_pedidos(mistura, opcoes.variantes, opcoes.semente)
+    
+    processo = None
+    servidor = 'externo'
+    url = opcoes.url
+    if url is None:
+        processo, url, servidor = iniciar_servidor(opcoes.servidor, opcoes.processos, opcoes.threads,
+                                                   ambiente_extra)
+    else:
+        aguardar_servidor(url)
+    
+    try:
+        print(f"Carga em {url} ({servidor}): {opcoes.concorrencia} clientes", file=sys.stderr)
+        relatorio = executar_carga(
+            url, pedidos, mistura, opcoes.concorrencia,
+            duracao=None if opcoes.requisicoes else opcoes.duracao,
+            requisicoes=opcoes.requisicoes,
+            aquecimento=opcoes.aquecimento,
+            semente=opcoes.semente,
+            tempo_limite=opcoes.tempo_limite
+        )
+    finally:
+        if processo is not None:
+            encerrar_servidor(processo)
+    
+    documento = {
+        'ambiente': ambiente(),
+        'configuracao': {
+            'url': url,
+            'servidor': servidor,
+            'processos': opcoes.processos if processo else None,
+            'threads': opcoes.threads if servidor == 'gunicorn' else None,
+            # Com --url valem as variáveis do servidor externo, desconhecidas aqui
+            'variaveis': ambiente_extra if processo else None,
+            'concorrencia': opcoes.concorrencia,
+            'mistura': mistura,
+            'variantes': opcoes.variantes,
+            'aquecimento': opcoes.aquecimento,
+            'semente': opcoes.semente
+        },
+        'resultado': relatorio
+    }
+    
+    texto = json.dumps(documento, indent=2, ensure_ascii=False)
+    if opcoes.saida:
+        with open(opcoes.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+    
+    latencia = relatorio['latencia']
+    if latencia['p50'] is not None:
+        print(f"{relatorio['requisicoes']} requisições, {relatorio['vazao']} req/s, "
+              f"p50 {latencia['p50'] * 1000:.1f} ms, p99 {latencia['p99'] * 1000:.1f} ms, "
+              f"erros {relatorio['taxa_erros']:.2%}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
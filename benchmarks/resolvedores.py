@@ -0,0 +1,421 @@
+"""
+Benchmark dos Resolvedores
+Mede os métodos diretos, iterativos, as regressões e a integração numérica
+em grades de tamanho, com o registro de passos (rastreamento) ligado e
+desligado, sobre dados sintéticos com semente fixa. Grava os tempos em JSON
+e os compara com uma linha de base, acusando lentidões acima de um limiar.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/resolvedores.py --saida resultados.json
+    python benchmarks/resolvedores.py --perfil completo --custo-maximo 120
+    python benchmarks/resolvedores.py --linha-base benchmarks/linha_base.json --limiar 1.3
+    python benchmarks/resolvedores.py --rotinas gauss_seidel,jacobi --tamanhos 50,200
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admissao import COEFICIENTES, custo_direto
+from metodos_diretos import (
+    fatorar_lu, gauss_elimination, gauss_jordan_elimination, lu_factorization, substituir_lu
+)
+from metodos_iterativos import gauss_seidel, iteracoes_gauss_seidel, iteracoes_jacobi, jacobi
+from minimos_quadrados import (
+    regressao_exponencial, regressao_linear, regressao_parabolica, resolver_regressoes_blocos
+)
+from integracao_numerica import (
+    area_newton_cotes, area_simpson13_repetido, area_simpson_nao_uniforme, area_trapezio, area_trapezio_rapida
+)
+
+PERFIS = {
+    'rapido': {'tamanhos': [3, 10, 30, 100], 'pontos': [10, 100, 1000, 10000, 100000]},
+    'completo': {'tamanhos': [3, 10, 30, 100, 300, 1000, 2000],
+                 'pontos': [10, 100, 1000, 10000, 100000, 1000000, 10000000]}
+}
+
+MATRIZES = ('dominante', 'spd', 'banda')
+
+# Semi-largura das matrizes em banda (2*LARGURA_BANDA + 1 diagonais)
+LARGURA_BANDA = 3
+
+# Iterações supostas para estimar o custo dos métodos iterativos
+ITERACOES_ESTIMADAS = 50
+
+# Repetições: ao menos REPETICOES_MINIMAS e TEMPO_MINIMO segundos somados,
+# parando em REPETICOES_MAXIMAS ou TEMPO_MAXIMO segundos
+REPETICOES_MINIMAS = 3
+REPETICOES_MAXIMAS = 50
+TEMPO_MINIMO = 0.2
+TEMPO_MAXIMO = 10.0
+
+
+# ==================== DADOS SINTÉTICOS ====================
+
+def gerar_matriz(tipo, n, semente):
+    """
+    Matriz n x n de diagonal estritamente dominante (as três convergem em
+    Jacobi e Gauss-Seidel) e o vetor b da solução exata x = (1, ..., 1).
+    
+    Parâmetros:
+        tipo: 'dominante' (densa, não simétrica), 'spd' (simétrica com diagonal
+            positiva dominante, logo definida positiva) ou 'banda'
+        n: ordem
+        semente: semente do gerador
+    
+    Retorna:
+        (A, b)
+    """
+    aleatorio = random.Random(f"{tipo}-{n}-{semente}")
+    A = [[0.0] * n for _ in range(n)]
+    
+    for i in range(n):
+        if tipo == 'dominante':
+            colunas = range(n)
+        elif tipo == 'spd':
+            colunas = range(i + 1, n)
+        elif tipo == 'banda':
+            colunas = range(max(0, i - LARGURA_BANDA), min(n, i + LARGURA_BANDA + 1))
+        else:
+            raise ValueError(f"Tipo de matriz desconhecido: {tipo}")
+        
+        linha = A[i]
+        for j in colunas:
+            if j != i:
+                linha[j] = aleatorio.uniform(-1.0, 1.0)
+                if tipo == 'spd':
+                    A[j][i] = linha[j]
+    
+    for i in range(n):
+        linha = A[i]
+        linha[i] = sum(abs(valor) for valor in linha) + 1.0
+    
+    b = [sum(linha) for linha in A]
+    return A, b
+
+
+def gerar_pontos(quantidade, semente):
+    """
+    Pontos de y = 2e^(0.3x) com ruído multiplicativo de 5%, x uniforme em [1, 10].
+    
+    São quantidade + 1 pontos (quantidade intervalos, par nas grades usadas,
+    como exige o Simpson 1/3 repetido).
+    """
+    aleatorio = random.Random(f"pontos-{quantidade}-{semente}")
+    passo = 9.0 / quantidade
+    x = [1.0 + i * passo for i in range(quantidade + 1)]
+    y = [2.0 * 2.718281828459045 ** (0.3 * xi) * (1.0 + 0.05 * aleatorio.gauss(0.0, 1.0)) for xi in x]
+    return x, y
+
+
+# ==================== ROTINAS ====================
+
+def lu_sem_passos(A, b):
+    """Caminho sem passos de resolver_sistema_generico: LU compacta"""
+    lu = [list(linha) for linha in A]
+    fatoracao = fatorar_lu(lu)
+    if fatoracao is None:
+        return None
+    return list(substituir_lu(lu, fatoracao[0], b))
+
+
+def consumir_iteracoes(gerador):
+    """Percorre um gerador de iterações e devolve a última solução"""
+    retrato = None
+    for retrato in gerador:
+        pass
+    return retrato['solucao']
+
+
+def rotinas_diretas():
+    """(nome, rastreamento, função(A, b) -> solução, custo(n, nao_nulos))"""
+    rotinas = []
+    for nome, funcao, metodo in (('gauss_elimination', gauss_elimination, 'gauss'),
+                                 ('gauss_jordan_elimination', gauss_jordan_elimination, 'jordan'),
+                                 ('lu_factorization', lu_factorization, 'lu')):
+        rotinas.append((nome, True, lambda A, b, f=funcao: f(A, b)[0],
+                        lambda n, nnz, m=metodo: custo_direto(n, m, True)))
+        # Sem passos os três métodos usam a mesma LU compacta (como na aplicação)
+        rotinas.append((nome, False, lu_sem_passos,
+                        lambda n, nnz, m=metodo: custo_direto(n, m, False)))
+    return rotinas
+
+
+def rotinas_iterativas():
+    """(nome, rastreamento, função(A, b) -> solução, custo(n, nao_nulos))"""
+    def custo_sem(n, nnz):
+        return COEFICIENTES['iteracao'] * ITERACOES_ESTIMADAS * nnz
+    
+    def custo_com(n, nnz):
+        # Mais a formatação de n valores por iteração no histórico
+        return custo_sem(n, nnz) + 1e-6 * ITERACOES_ESTIMADAS * n
+    
+    return [
+        ('jacobi', True, lambda A, b: jacobi(A, b)[0], custo_com),
+        ('jacobi', False, lambda A, b: consumir_iteracoes(iteracoes_jacobi(A, b)), custo_sem),
+        ('gauss_seidel', True, lambda A, b: gauss_seidel(A, b)[0], custo_com),
+        ('gauss_seidel', False, lambda A, b: consumir_iteracoes(iteracoes_gauss_seidel(A, b)), custo_sem),
+    ]
+
+
+def rotinas_pontos():
+    """(nome, rastreamento, função(x, y) -> valor de verificação, segundos por ponto)"""
+    por_ponto = COEFICIENTES['ponto']
+    com_logaritmo = COEFICIENTES['regressao']
+    return [
+        ('regressao_linear', True, lambda x, y: regressao_linear(x, y)[1], por_ponto),
+        ('regressao_parabolica', True, lambda x, y: regressao_parabolica(x, y)[2], por_ponto),
+        ('regressao_exponencial', True, lambda x, y: regressao_exponencial(x, y)[1], com_logaritmo),
+        # Sem os detalhes por ponto, as três regressões saem juntas dos momentos centrados
+        ('regressoes_blocos', False,
+         lambda x, y: resolver_regressoes_blocos([(x, y)])['exponencial']['b'],
+         com_logaritmo),
+        # Com passos, uma linha de texto por intervalo
+        ('area_trapezio', True, lambda x, y: area_trapezio(x, y)['area'], 10 * por_ponto),
+        ('area_simpson13_repetido', True, lambda x, y: area_simpson13_repetido(x, y)['area'], 10 * por_ponto),
+        ('area_trapezio', False, lambda x, y: area_trapezio_rapida(x, y)['area'], por_ponto),
+        ('area_simpson_nao_uniforme', False, lambda x, y: area_simpson_nao_uniforme(x, y)['area'], por_ponto),
+        ('area_newton_cotes', False, lambda x, y: area_newton_cotes(x, y)['area'], por_ponto),
+    ]
+
+
+# ==================== MEDIÇÃO ====================
+
+def cronometrar(funcao, *args):
+    """
+    Executa funcao(*args) repetidas vezes.
+    
+    Retorna:
+        (tempos em segundos, resultado da última execução)
+    """
+    tempos = []
+    while True:
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+        total = sum(tempos)
+        if (len(tempos) >= REPETICOES_MAXIMAS or total >= TEMPO_MAXIMO
+                or (len(tempos) >= REPETICOES_MINIMAS and total >= TEMPO_MINIMO)):
+            return tempos, resultado
+
+
+def identificar(rotina, dados, tamanho, rastreamento):
+    """Identificador estável de um caso (chave da comparação com a linha de base)"""
+    return f"{rotina}/{dados}/{tamanho}/{'com_passos' if rastreamento else 'sem_passos'}"
+
+
+def registro_caso(rotina, dados, tamanho, rastreamento, custo):
+    """Registro inicial de um caso, antes da medição"""
+    return {
+        'id': identificar(rotina, dados, tamanho, rastreamento),
+        'rotina': rotina,
+        'dados': dados,
+        'tamanho': tamanho,
+        'rastreamento': rastreamento,
+        'custo_estimado': round(custo, 6)
+    }
+
+
+def medir(caso, funcao, *args):
+    """Cronometra e completa o registro do caso com os tempos"""
+    tempos, resultado = cronometrar(funcao, *args)
+    caso.update({
+        'repeticoes': len(tempos),
+        'segundos_min': min(tempos),
+        'segundos_mediana': statistics.median(tempos)
+    })
+    return resultado
+
+
+def executar(tamanhos, pontos, matrizes, rotinas=None, semente=0, custo_maximo=30.0, registrar=print):
+    """
+    Executa todos os casos da grade.
+    
+    Parâmetros:
+        tamanhos: ordens n dos sistemas
+        pontos: quantidades de pontos das regressões e integrações
+        matrizes: tipos de matriz (MATRIZES)
+        rotinas: nomes a medir (None para todas)
+        semente: semente dos dados sintéticos
+        custo_maximo: casos com custo estimado acima disto (segundos por
+            execução) são pulados e registrados como tal
+        registrar: função chamada com uma linha de progresso por caso
+    
+    Retorna:
+        lista de casos
+    """
+    casos = []
+    
+    def incluir(nome):
+        return rotinas is None or nome in rotinas
+    
+    sistemas = [r for r in rotinas_diretas() + rotinas_iterativas() if incluir(r[0])]
+    for tipo in matrizes if sistemas else ():
+        for n in tamanhos:
+            nnz = n * n if tipo != 'banda' else n * (2 * LARGURA_BANDA + 1)
+            A = b = None
+            for nome, rastreamento, funcao, custo in sistemas:
+                caso = registro_caso(nome, tipo, n, rastreamento, custo(n, nnz))
+                casos.append(caso)
+                if caso['custo_estimado'] > custo_maximo:
+                    caso['pulado'] = 'custo estimado acima do máximo'
+                    registrar(f"{caso['id']}: pulado (~{caso['custo_estimado']:.0f} s)")
+                    continue
+                
+                if A is None:
+                    A, b = gerar_matriz(tipo, n, semente)
+                solucao = medir(caso, funcao, A, b)
+                caso['erro_maximo'] = max(abs(valor - 1.0) for valor in solucao) if solucao else None
+                registrar(f"{caso['id']}: {caso['segundos_min']:.6f} s")
+    
+    series = [r for r in rotinas_pontos() if incluir(r[0])]
+    for quantidade in pontos if series else ():
+        x = y = None
+        for nome, rastreamento, funcao, por_ponto in series:
+            caso = registro_caso(nome, 'exponencial_ruidosa', quantidade, rastreamento, por_ponto * quantidade)
+            casos.append(caso)
+            if caso['custo_estimado'] > custo_maximo:
+                caso['pulado'] = 'custo estimado acima do máximo'
+                registrar(f"{caso['id']}: pulado (~{caso['custo_estimado']:.0f} s)")
+                continue
+            
+            if x is None:
+                x, y = gerar_pontos(quantidade, semente)
+            try:
+                caso['verificacao'] = medir(caso, funcao, x, y)
+            except ValueError as e:
+                # Ex.: Newton-Cotes exige uma partição que a quantidade não admite
+                caso['pulado'] = str(e)
+                registrar(f"{caso['id']}: pulado ({e})")
+                continue
+            registrar(f"{caso['id']}: {caso['segundos_min']:.6f} s")
+    
+    return casos
+
+
+def ambiente():
+    """Descrição da máquina e do interpretador (tempos só se comparam no mesmo ambiente)"""
+    return {
+        'python': platform.python_version(),
+        'implementacao': platform.python_implementation(),
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    }
+
+
+def comparar(casos, linha_base, limiar=1.25, minimo=0.001):
+    """
+    Compara os tempos mínimos com os da linha de base.
+    
+    Parâmetros:
+        casos: casos medidos
+        linha_base: documento gravado por uma execução anterior
+        limiar: razão atual/base acima da qual o caso é uma lentidão
+        minimo: casos com tempo base abaixo disto (segundos) são ignorados,
+            pois o ruído domina
+    
+    Retorna:
+        dicionário com 'lentidoes', 'melhorias', 'comparados' e 'ausentes'
+    """
+    base = {caso['id']: caso for caso in linha_base['casos'] if 'segundos_min' in caso}
+    lentidoes = []
+    melhorias = []
+    comparados = 0
+    ausentes = []
+    
+    for caso in casos:
+        if 'segundos_min' not in caso:
+            continue
+        referencia = base.get(caso['id'])
+        if referencia is None:
+            ausentes.append(caso['id'])
+            continue
+        if referencia['segundos_min'] < minimo:
+            continue
+        
+        comparados += 1
+        razao = caso['segundos_min'] / referencia['segundos_min']
+        registro = {'id': caso['id'], 'base': referencia['segundos_min'],
+                    'atual': caso['segundos_min'], 'razao': round(razao, 3)}
+        if razao > limiar:
+            lentidoes.append(registro)
+        elif razao < 1 / limiar:
+            melhorias.append(registro)
+    
+    return {'limiar': limiar, 'comparados': comparados, 'lentidoes': lentidoes,
+            'melhorias': melhorias, 'ausentes': ausentes}
+
+
+def lista_inteiros(texto):
+    """'10,1e5' -> [10, 100000]"""
+    return [int(float(valor)) for valor in texto.split(',') if valor.strip()]
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos resolvedores numéricos")
+    parser.add_argument('--perfil', choices=sorted(PERFIS), default='rapido',
+                        help="grade de tamanhos (padrão: rapido)")
+    parser.add_argument('--tamanhos', type=lista_inteiros, help="ordens n, ex.: 3,100,2000")
+    parser.add_argument('--pontos', type=lista_inteiros, help="quantidades de pontos, ex.: 10,1e5,1e7")
+    parser.add_argument('--matrizes', default=','.join(MATRIZES), help="tipos de matriz")
+    parser.add_argument('--rotinas', help="nomes das rotinas (padrão: todas)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--custo-maximo', type=float, default=30.0,
+                        help="pula casos com custo estimado acima disto, em segundos (padrão: 30)")
+    parser.add_argument('--saida', help="arquivo JSON com os resultados (padrão: saída padrão)")
+    parser.add_argument('--linha-base', help="JSON de uma execução anterior para comparação")
+    parser.add_argument('--limiar', type=float, default=1.25,
+                        help="razão atual/base que conta como lentidão (padrão: 1.25)")
+    parser.add_argument('--minimo', type=float, default=0.001,
+                        help="ignora na comparação casos com tempo base abaixo disto (padrão: 0.001 s)")
+    opcoes = parser.parse_args(argumentos)
+    
+    matrizes = [m for m in opcoes.matrizes.split(',') if m]
+    for tipo in matrizes:
+        if tipo not in MATRIZES:
+            parser.error(f"Tipo de matriz desconhecido: {tipo}")
+    
+    casos = executar(
+        opcoes.tamanhos or PERFIS[opcoes.perfil]['tamanhos'],
+        opcoes.pontos or PERFIS[opcoes.perfil]['pontos'],
+        matrizes,
+        rotinas=set(opcoes.rotinas.split(',')) if opcoes.rotinas else None,
+        semente=opcoes.semente,
+        custo_maximo=opcoes.custo_maximo,
+        registrar=lambda linha: print(linha, file=sys.stderr)
+    )
+    
+    documento = {'ambiente': ambiente(), 'perfil': opcoes.perfil, 'semente': opcoes.semente, 'casos': casos}
+    
+    if opcoes.linha_base:
+        with open(opcoes.linha_base, encoding='utf-8') as arquivo:
+            documento['comparacao'] = comparar(casos, json.load(arquivo), opcoes.limiar, opcoes.minimo)
+    
+    texto = json.dumps(documento, indent=2, ensure_ascii=False)
+    if opcoes.saida:
+        with open(opcoes.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+    
+    comparacao = documento.get('comparacao')
+    if comparacao:
+        for registro in comparacao['lentidoes']:
+            print(f"LENTIDÃO {registro['id']}: {registro['base']:.6f} s -> {registro['atual']:.6f} s "
+                  f"({registro['razao']}x)", file=sys.stderr)
+        return 1 if comparacao['lentidoes'] else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
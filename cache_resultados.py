@@ -0,0 +1,160 @@
+"""
+Módulo: Cache de Resultados
+Cache LRU com validade (TTL) indexado pelo hash canônico dos dados da
+requisição, com agrupamento de requisições idênticas simultâneas: enquanto
+um cálculo está em andamento, as cópias esperam pelo mesmo resultado
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Configuração (pode ser alterada por variáveis de ambiente)
+CACHE_ATIVO = os.environ.get('CACHE_RESULTADOS', '1') != '0'
+MAXIMO_ENTRADAS = int(os.environ.get('CACHE_MAXIMO_ENTRADAS', 256))
+MAXIMO_BYTES = int(os.environ.get('CACHE_MAXIMO_BYTES', 64 * 1024 * 1024))
+VALIDADE_SEGUNDOS = float(os.environ.get('CACHE_VALIDADE', 300))
+
+# Respostas maiores que isto não são guardadas (ocupariam o cache sozinhas)
+MAXIMO_BYTES_ENTRADA = MAXIMO_BYTES // 8
+
+# chave -> (expira_em, tamanho, valor)
+ENTRADAS = OrderedDict()
+# chave -> {'evento', 'valor', 'erro'} dos cálculos em andamento
+EM_ANDAMENTO = {}
+TRAVA_CACHE = threading.Lock()
+
+CONTADORES = {
+    'acertos': 0,
+    'faltas': 0,
+    'agrupadas': 0,
+    'expiradas': 0,
+    'removidas': 0
+}
+ESTADO = {'bytes': 0}
+
+
+def normalizar(valor):
+    """
+    Forma canônica dos dados de uma requisição.
+    
+    Só a estrutura é normalizada (tuplas viram listas, chaves viram texto);
+    números e textos ficam exatamente como chegaram. Converter inteiros em
+    float juntaria inteiros distintos acima de 2**53 (e estouraria com
+    inteiros enormes), e aparar ou reinterpretar textos juntaria envios que
+    as rotas tratam de forma diferente (" jordan" e "jordan").
+    """
+    if isinstance(valor, (bool, int, float, str)) or valor is None:
+        return valor
+    if isinstance(valor, (list, tuple)):
+        return [normalizar(item) for item in valor]
+    if isinstance(valor, dict):
+        return {str(chave): normalizar(item) for chave, item in valor.items()}
+    return repr(valor)
+
+
+def chave_canonica(rota, dados):
+    """Hash SHA-256 da rota e dos dados normalizados (JSON com chaves ordenadas)"""
+    texto = json.dumps([rota, normalizar(dados)], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def remover_excedentes():
+    """Remove as entradas menos usadas até respeitar os limites (chamada com a trava)"""
+    while ENTRADAS and (len(ENTRADAS) > MAXIMO_ENTRADAS or ESTADO['bytes'] > MAXIMO_BYTES):
+        _, (_, tamanho, _) = ENTRADAS.popitem(last=False)
+        ESTADO['bytes'] -= tamanho
+        CONTADORES['removidas'] += 1
+
+
+def obter_ou_calcular(chave, calcular, tamanho=None):
+    """
+    Devolve o resultado em cache para a chave ou o calcula.
+    
+    Se outra requisição com a mesma chave já estiver calculando, espera por
+    ela em vez de repetir o cálculo (o erro, se houver, também é repassado).
+    
+    Parâmetros:
+        chave: chave canônica (ver chave_canonica)
+        calcular: função sem argumentos que produz o resultado
+        tamanho: função valor -> bytes ocupados, ou None se o valor não deve ser guardado
+    
+    Retorna:
+        o resultado
+    """
+    if not CACHE_ATIVO:
+        return calcular()
+    
+    agora = time.monotonic()
+    with TRAVA_CACHE:
+        entrada = ENTRADAS.get(chave)
+        if entrada is not None:
+            if entrada[0] > agora:
+                ENTRADAS.move_to_end(chave)
+                CONTADORES['acertos'] += 1
+                return entrada[2]
+            del ENTRADAS[chave]
+            ESTADO['bytes'] -= entrada[1]
+            CONTADORES['expiradas'] += 1
+        
+        pendente = EM_ANDAMENTO.get(chave)
+        responsavel = pendente is None
+        if responsavel:
+            pendente = {'evento': threading.Event(), 'valor': None, 'erro': None}
+            EM_ANDAMENTO[chave] = pendente
+            CONTADORES['faltas'] += 1
+        else:
+            CONTADORES['agrupadas'] += 1
+    
+    if not responsavel:
+        pendente['evento'].wait()
+        if pendente['erro'] is not None:
+            raise pendente['erro']
+        return pendente['valor']
+    
+    try:
+        valor = calcular()
+        pendente['valor'] = valor
+    except BaseException as e:
+        pendente['erro'] = e
+        raise
+    finally:
+        with TRAVA_CACHE:
+            del EM_ANDAMENTO[chave]
+            if pendente['erro'] is None:
+                bytes_valor = tamanho(pendente['valor']) if tamanho else 0
+                if bytes_valor is not None and bytes_valor <= MAXIMO_BYTES_ENTRADA:
+                    ENTRADAS[chave] = (time.monotonic() + VALIDADE_SEGUNDOS, bytes_valor, pendente['valor'])
+                    ESTADO['bytes'] += bytes_valor
+                    remover_excedentes()
+        pendente['evento'].set()
+    
+    return valor
+
+
+def limpar_cache():
+    """Esvazia o cache (os contadores são mantidos)"""
+    with TRAVA_CACHE:
+        ENTRADAS.clear()
+        ESTADO['bytes'] = 0
+
+
+def estatisticas_cache():
+    """Contadores de acertos/faltas e ocupação atual do cache"""
+    with TRAVA_CACHE:
+        consultas = CONTADORES['acertos'] + CONTADORES['faltas'] + CONTADORES['agrupadas']
+        return {
+            'ativo': CACHE_ATIVO,
+            **CONTADORES,
+            'taxa_acerto': ((CONTADORES['acertos'] + CONTADORES['agrupadas']) / consultas
+                            if consultas else None),
+            'entradas': len(ENTRADAS),
+            'bytes': ESTADO['bytes'],
+            'em_andamento': len(EM_ANDAMENTO),
+            'maximo_entradas': MAXIMO_ENTRADAS,
+            'maximo_bytes': MAXIMO_BYTES,
+            'validade_segundos': VALIDADE_SEGUNDOS
+        }
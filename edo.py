@@ -0,0 +1,406 @@
+"""
+Módulo: Equações Diferenciais Ordinárias
+Integração de sistemas y' = f(t, y) por Runge-Kutta de 4ª ordem (passo fixo)
+e Dormand-Prince RK45 (passo adaptativo, com saída densa), resolvendo um lote
+de condições iniciais independentes em uma única chamada
+"""
+
+from array import array
+from itertools import repeat
+from operator import add, mul
+
+from expressoes import compilar_expressao
+
+# Limites para uma única chamada
+MAXIMO_TRAJETORIAS = 100000
+MAXIMO_PASSOS = 1000000
+# Limite padrão de passos (aceitos + rejeitados) do RK45
+MAXIMO_PASSOS_RK45 = 100000
+MAXIMO_VALORES_SAIDA = 5000000
+
+# Tabela de Butcher do Dormand-Prince 5(4): nós, coeficientes a[i][j] e pesos
+# da solução de 5ª ordem (a última linha de a, que também dá k7 = f(t+h, y_novo))
+NOS_DOPRI = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+COEFICIENTES_DOPRI = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+
+# Diferença entre as soluções de 5ª e 4ª ordem (estimativa do erro local)
+ERRO_DOPRI = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+# Coeficientes da saída densa de 4ª ordem (Hairer, Nørsett e Wanner)
+DENSA_DOPRI = (
+    -12715105075 / 11282082432, 0.0, 87487479700 / 32700410799,
+    -10690763975 / 1880347072, 701980252875 / 199316789632,
+    -1453857185 / 822651844, 69997945 / 29380423
+)
+
+# Controle do passo: fator de segurança e limites de redução/aumento por passo
+SEGURANCA = 0.9
+FATOR_MINIMO = 0.2
+FATOR_MAXIMO = 10.0
+
+
+def combinacao(y, h, coeficientes, estagios):
+    """
+    Calcula y + h * Σ a_j * k_j para todas as componentes e trajetórias.
+    
+    Cada termo é uma passagem map() sobre o lote inteiro, de modo que o laço
+    sobre as trajetórias roda dentro do interpretador em C.
+    
+    Parâmetros:
+        y: lista de componentes (arrays com um valor por trajetória)
+        h: passo
+        coeficientes: a_j de cada estágio (zeros são pulados)
+        estagios: lista de k_j (mesmo formato de y)
+    
+    Retorna:
+        lista de componentes (arrays float64)
+    """
+    resultado = []
+    for c in range(len(y)):
+        acumulado = y[c]
+        for a, k in zip(coeficientes, estagios):
+            if a:
+                acumulado = map(add, acumulado, map(mul, repeat(h * a), k[c]))
+        resultado.append(array('d', acumulado))
+    return resultado
+
+
+def sistema_expressoes(equacoes, nomes=None, parametros=None, quantidade=1):
+    """
+    Monta a função f(t, y) de um sistema a partir de expressões em texto.
+    
+    Parâmetros:
+        equacoes: lista de expressões, uma por componente (ex.: ["(E - y0)/(R*C)"])
+        nomes: nomes das componentes (padrão: y0, y1, ...)
+        parametros: dicionário {nome: valor} ou {nome: [um valor por trajetória]}
+        quantidade: número de trajetórias do lote
+    
+    Retorna:
+        função f(t, componentes) -> lista de componentes das derivadas
+    """
+    nomes = tuple(nomes or (f"y{i}" for i in range(len(equacoes))))
+    if len(nomes) != len(equacoes):
+        raise ValueError("O número de nomes deve ser igual ao número de equações")
+    
+    parametros = parametros or {}
+    colunas_parametros = []
+    for nome, valor in parametros.items():
+        if isinstance(valor, (list, tuple)):
+            if len(valor) != quantidade:
+                raise ValueError(f"Parâmetro {nome}: esperados {quantidade} valores (um por trajetória)")
+            colunas_parametros.append(array('d', valor))
+        else:
+            colunas_parametros.append(array('d', [float(valor)]) * quantidade)
+    
+    variaveis = ('t',) + nomes + tuple(parametros)
+    if len(set(variaveis)) != len(variaveis):
+        raise ValueError("Nomes de componentes e parâmetros devem ser distintos (e diferentes de t)")
+    
+    funcoes = [compilar_expressao(texto, variaveis)['lote'] for texto in equacoes]
+    
+    def derivadas(t, componentes):
+        tempos = [t] * quantidade
+        return [lote(tempos, *componentes, *colunas_parametros) for lote in funcoes]
+    
+    return derivadas
+
+
+def preparar_estados(estados_iniciais):
+    """
+    Converte a lista de condições iniciais (uma lista por trajetória) para o
+    formato interno: uma array float64 por componente, com um valor por trajetória.
+    """
+    quantidade = len(estados_iniciais)
+    if quantidade < 1:
+        raise ValueError("Informe pelo menos uma condição inicial")
+    if quantidade > MAXIMO_TRAJETORIAS:
+        raise ValueError(f"Máximo de {MAXIMO_TRAJETORIAS} trajetórias por chamada")
+    
+    dimensao = len(estados_iniciais[0])
+    for i, estado in enumerate(estados_iniciais):
+        if len(estado) != dimensao:
+            raise ValueError(f"Condição inicial {i}: esperadas {dimensao} componentes")
+    
+    return [array('d', (float(estado[c]) for estado in estados_iniciais)) for c in range(dimensao)]
+
+
+def organizar_saida(tempos, instantaneos):
+    """
+    Reorganiza as saídas (um instantâneo de componentes por tempo) em uma
+    lista por trajetória: trajetorias[j][k] = [y_0, y_1, ...] no tempo k.
+    """
+    quantidade = len(instantaneos[0][0])
+    return {
+        't': list(tempos),
+        'trajetorias': [
+            [[componente[j] for componente in instantaneo] for instantaneo in instantaneos]
+            for j in range(quantidade)
+        ]
+    }
+
+
+def verificar_saida(numero_saidas, quantidade, dimensao):
+    """Limita o volume de valores devolvidos (saídas x trajetórias x componentes)"""
+    total = numero_saidas * quantidade * dimensao
+    if total > MAXIMO_VALORES_SAIDA:
+        raise ValueError(f"Saída muito grande ({total} valores, máximo {MAXIMO_VALORES_SAIDA}); "
+                         "reduza o número de saídas ou de trajetórias")
+
+
+def integrar_rk4(sistema, t0, tf, estados_iniciais, passos, a_cada=1):
+    """
+    Runge-Kutta clássico de 4ª ordem com passo fixo h = (tf - t0) / passos.
+    
+    Todas as trajetórias avançam juntas: cada estágio avalia f uma vez para o
+    lote inteiro.
+    
+    Parâmetros:
+        sistema: função f(t, componentes) (ver sistema_expressoes)
+        t0, tf: intervalo de integração
+        estados_iniciais: lista de condições iniciais (uma lista por trajetória)
+        passos: número de passos
+        a_cada: guarda a solução a cada a_cada passos (o último passo sempre é guardado)
+    
+    Retorna:
+        dicionário com tempos, trajetórias e número de avaliações de f
+    """
+    if passos < 1 or passos > MAXIMO_PASSOS:
+        raise ValueError(f"O número de passos deve estar entre 1 e {MAXIMO_PASSOS}")
+    if a_cada < 1:
+        raise ValueError("a_cada deve ser pelo menos 1")
+    
+    y = preparar_estados(estados_iniciais)
+    verificar_saida(passos // a_cada + 2, len(y[0]), len(y))
+    
+    h = (tf - t0) / passos
+    tempos = [t0]
+    instantaneos = [y]
+    
+    for passo in range(1, passos + 1):
+        t = t0 + (passo - 1) * h
+        k1 = sistema(t, y)
+        k2 = sistema(t + h / 2, combinacao(y, h, (1 / 2,), [k1]))
+        k3 = sistema(t + h / 2, combinacao(y, h, (0.0, 1 / 2), [k1, k2]))
+        k4 = sistema(t + h, combinacao(y, h, (0.0, 0.0, 1.0), [k1, k2, k3]))
+        y = combinacao(y, h, (1 / 6, 1 / 3, 1 / 3, 1 / 6), [k1, k2, k3, k4])
+        
+        if passo % a_cada == 0 or passo == passos:
+            tempos.append(t0 + passo * h)
+            instantaneos.append(y)
+    
+    resultado = organizar_saida(tempos, instantaneos)
+    resultado.update({
+        'metodo': 'rk4',
+        'passo': h,
+        'passos': passos,
+        'avaliacoes': 4 * passos,
+        'numero_trajetorias': len(y[0])
+    })
+    return resultado
+
+
+def norma_erro(y, y_novo, erro, atol, rtol):
+    """
+    Maior norma RMS do erro local entre as trajetórias:
+        max_j sqrt(média_c (erro[c][j] / (atol + rtol * max(|y|, |y_novo|)))²)
+    """
+    dimensao = len(y)
+    quantidade = len(y[0])
+    somas = [0.0] * quantidade
+    
+    for c in range(dimensao):
+        somas = list(map(
+            lambda s, e, a, b: s + (e / (atol + rtol * max(abs(a), abs(b)))) ** 2,
+            somas, erro[c], y[c], y_novo[c]))
+    
+    return (max(somas) / dimensao) ** 0.5
+
+
+def passo_inicial(y, f0, sentido, atol, rtol):
+    """Estimativa do primeiro passo (parte inicial do algoritmo de Hairer)"""
+    dimensao = len(y)
+    escala = [[atol + rtol * abs(v) for v in y[c]] for c in range(dimensao)]
+    d0 = max(max(abs(v) / s for v, s in zip(y[c], escala[c])) for c in range(dimensao))
+    d1 = max(max(abs(v) / s for v, s in zip(f0[c], escala[c])) for c in range(dimensao))
+    
+    if d0 < 1e-5 or d1 < 1e-5:
+        return 1e-6 * sentido
+    return 0.01 * d0 / d1 * sentido
+
+
+def coeficientes_densos(y, y_novo, h, estagios):
+    """
+    Coeficientes do polinômio de saída densa de um passo, por componente:
+        r1 = y,  r2 = y_novo - y,  r3 = h*k1 - r2,  r4 = r2 - h*k7 - r3,
+        r5 = h * Σ d_i * k_i
+    """
+    densa = []
+    for c in range(len(y)):
+        r2 = array('d', map(lambda a, b: b - a, y[c], y_novo[c]))
+        r3 = array('d', map(lambda k, d: h * k - d, estagios[0][c], r2))
+        r4 = array('d', map(lambda d, k, b: d - h * k - b, r2, estagios[6][c], r3))
+        r5 = combinacao([[0.0] * len(y[c])], h, DENSA_DOPRI, [[k[c]] for k in estagios])[0]
+        densa.append((y[c], r2, r3, r4, r5))
+    return densa
+
+
+def avaliar_densa(densa, theta):
+    """
+    Avalia a saída densa na fração theta do passo:
+        y(theta) = r1 + theta*(r2 + (1-theta)*(r3 + theta*(r4 + (1-theta)*r5)))
+    """
+    resto = 1 - theta
+    return [
+        array('d', map(
+            lambda a, b, c, d, e: a + theta * (b + resto * (c + theta * (d + resto * e))),
+            r1, r2, r3, r4, r5))
+        for r1, r2, r3, r4, r5 in densa
+    ]
+
+
+def integrar_rk45(sistema, t0, tf, estados_iniciais, t_saida=None, atol=1e-8, rtol=1e-6,
+                  max_passos=MAXIMO_PASSOS_RK45):
+    """
+    Dormand-Prince RK45 com passo adaptativo e saída densa.
+    
+    O lote compartilha o passo: o erro usado no controle é o da trajetória
+    mais exigente, de modo que cada estágio continua sendo uma única avaliação
+    vetorial de f. Os valores nos tempos de saída vêm do polinômio de saída
+    densa de 4ª ordem de cada passo, sem forçar o passo a cair nesses tempos.
+    
+    Parâmetros:
+        sistema: função f(t, componentes) (ver sistema_expressoes)
+        t0, tf: intervalo de integração
+        estados_iniciais: lista de condições iniciais (uma lista por trajetória)
+        t_saida: tempos onde a solução é devolvida (padrão: 101 tempos igualmente espaçados)
+        atol, rtol: tolerâncias absoluta e relativa
+        max_passos: limite de passos (aceitos + rejeitados)
+    
+    Retorna:
+        dicionário com tempos, trajetórias e estatísticas dos passos
+    """
+    if tf == t0:
+        raise ValueError("O intervalo de integração é vazio (t0 = tf)")
+    if atol <= 0 or rtol < 0:
+        raise ValueError("As tolerâncias devem ser positivas")
+    if max_passos < 1 or max_passos > MAXIMO_PASSOS:
+        raise ValueError(f"max_passos deve estar entre 1 e {MAXIMO_PASSOS}")
+    
+    y = preparar_estados(estados_iniciais)
+    dimensao = len(y)
+    sentido = 1.0 if tf > t0 else -1.0
+    
+    if t_saida is None:
+        t_saida = [t0 + (tf - t0) * i / 100 for i in range(101)]
+    t_saida = sorted((float(t) for t in t_saida), key=lambda t: sentido * t)
+    for t in t_saida:
+        if sentido * (t - t0) < 0 or sentido * (t - tf) > 0:
+            raise ValueError(f"Tempo de saída {t} fora do intervalo [{t0}, {tf}]")
+    verificar_saida(len(t_saida), len(y[0]), dimensao)
+    
+    t = t0
+    k1 = sistema(t, y)
+    h = passo_inicial(y, k1, sentido, atol, rtol)
+    avaliacoes = 1
+    aceitos = 0
+    rejeitados = 0
+    
+    instantaneos = []
+    proxima = 0
+    while proxima < len(t_saida) and t_saida[proxima] == t0:
+        instantaneos.append(y)
+        proxima += 1
+    
+    while sentido * (tf - t) > 0:
+        if aceitos + rejeitados >= max_passos:
+            raise ValueError(f"Limite de {max_passos} passos atingido antes de t = {tf} (t = {t})")
+        
+        if sentido * (t + h - tf) > 0:
+            h = tf - t
+        
+        estagios = [k1]
+        for i in range(1, 7):
+            intermediario = combinacao(y, h, COEFICIENTES_DOPRI[i], estagios)
+            estagios.append(sistema(t + NOS_DOPRI[i] * h, intermediario))
+        y_novo = intermediario
+        avaliacoes += 6
+        
+        erro = combinacao([[0.0] * len(y[0])] * dimensao, h, ERRO_DOPRI, estagios)
+        norma = norma_erro(y, y_novo, erro, atol, rtol)
+        
+        if norma <= 1.0:
+            t_novo = t + h
+            
+            # Saída densa para os tempos de saída dentro de (t, t_novo]
+            if proxima < len(t_saida) and sentido * (t_saida[proxima] - t_novo) <= 0:
+                densa = coeficientes_densos(y, y_novo, h, estagios)
+                while proxima < len(t_saida) and sentido * (t_saida[proxima] - t_novo) <= 0:
+                    instantaneos.append(avaliar_densa(densa, (t_saida[proxima] - t) / h))
+                    proxima += 1
+            
+            t = t_novo
+            y = y_novo
+            k1 = estagios[6]
+            aceitos += 1
+        else:
+            rejeitados += 1
+        
+        fator = FATOR_MAXIMO if norma == 0 else SEGURANCA * norma ** -0.2
+        h *= min(FATOR_MAXIMO, max(FATOR_MINIMO, fator))
+    
+    resultado = organizar_saida(t_saida, instantaneos)
+    resultado.update({
+        'metodo': 'rk45',
+        'passos_aceitos': aceitos,
+        'passos_rejeitados': rejeitados,
+        'avaliacoes': avaliacoes,
+        'numero_trajetorias': len(y[0])
+    })
+    return resultado
+
+
+def resolver_edo(equacoes, t0, tf, condicoes_iniciais, metodo='rk45', nomes=None,
+                 parametros=None, passos=1000, a_cada=1, t_saida=None,
+                 atol=1e-8, rtol=1e-6, max_passos=MAXIMO_PASSOS_RK45):
+    """
+    Resolve um sistema de EDOs dado por expressões para um lote de condições iniciais.
+    
+    Parâmetros:
+        equacoes: lista de expressões de y' (variáveis: t, nomes das componentes e parâmetros)
+        t0, tf: intervalo de integração
+        condicoes_iniciais: lista de condições iniciais (uma lista por trajetória)
+        metodo: 'rk4' (passo fixo) ou 'rk45' (adaptativo)
+        nomes: nomes das componentes (padrão: y0, y1, ...)
+        parametros: dicionário de parâmetros (valor único ou um valor por trajetória)
+        passos, a_cada: configuração do RK4
+        t_saida, atol, rtol, max_passos: configuração do RK45
+    
+    Retorna:
+        dicionário com tempos, trajetórias e estatísticas
+    """
+    if not equacoes:
+        raise ValueError("Informe pelo menos uma equação")
+    for i, estado in enumerate(condicoes_iniciais):
+        if len(estado) != len(equacoes):
+            raise ValueError(f"Condição inicial {i}: esperadas {len(equacoes)} componentes")
+    
+    sistema = sistema_expressoes(equacoes, nomes, parametros, len(condicoes_iniciais))
+    
+    if metodo == 'rk4':
+        resultado = integrar_rk4(sistema, t0, tf, condicoes_iniciais, passos, a_cada)
+    elif metodo == 'rk45':
+        resultado = integrar_rk45(sistema, t0, tf, condicoes_iniciais, t_saida, atol, rtol, max_passos)
+    else:
+        raise ValueError(f"Método desconhecido: {metodo}")
+    
+    resultado['equacoes'] = list(equacoes)
+    resultado['nomes'] = list(nomes or (f"y{i}" for i in range(len(equacoes))))
+    return resultado
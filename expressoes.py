@@ -0,0 +1,255 @@
+"""
+Módulo: Expressões Matemáticas
+Compila expressões enviadas pelo usuário (ex.: "sin(x)*exp(-x/3)") em funções
+Python reutilizáveis, sem usar eval: o texto é convertido em AST, cada nó é
+validado contra uma lista de operadores e funções permitidos e transformado
+em uma closure
+"""
+
+import ast
+import math
+import operator
+from functools import lru_cache
+from itertools import repeat
+
+# Limites de tamanho para rejeitar expressões abusivas antes de compilar
+MAXIMO_CARACTERES = 2000
+MAXIMO_NOS = 500
+
+FUNCOES = {
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'exp': math.exp, 'log': math.log, 'ln': math.log, 'log10': math.log10,
+    'sqrt': math.sqrt, 'abs': abs, 'floor': math.floor, 'ceil': math.ceil,
+    'atan2': math.atan2, 'pow': math.pow, 'min': min, 'max': max,
+}
+
+CONSTANTES = {
+    'pi': math.pi,
+    'e': math.e,
+}
+
+OPERADORES_BINARIOS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    # math.pow em vez de ** para que base negativa com expoente fracionário
+    # gere erro de domínio em vez de um número complexo
+    ast.Pow: math.pow,
+    ast.Mod: operator.mod,
+    # "x^2" é aceito como potência, como nas calculadoras
+    ast.BitXor: math.pow,
+}
+
+OPERADORES_UNARIOS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def validar_arvore(arvore, variaveis):
+    """
+    Percorre a AST e rejeita qualquer nó fora da lista permitida.
+    
+    Levanta ValueError com a descrição do primeiro problema encontrado.
+    """
+    nos = list(ast.walk(arvore))
+    if len(nos) > MAXIMO_NOS:
+        raise ValueError(f"Expressão muito grande (máximo de {MAXIMO_NOS} nós)")
+    
+    # Nomes usados como função em uma chamada (validados junto com a chamada)
+    nomes_chamados = {id(no.func) for no in nos if isinstance(no, ast.Call)}
+    
+    for no in nos:
+        if isinstance(no, (ast.Expression, ast.Load)):
+            continue
+        if isinstance(no, ast.BinOp):
+            if type(no.op) not in OPERADORES_BINARIOS:
+                raise ValueError(f"Operador não permitido: {type(no.op).__name__}")
+        elif isinstance(no, ast.UnaryOp):
+            if type(no.op) not in OPERADORES_UNARIOS:
+                raise ValueError(f"Operador não permitido: {type(no.op).__name__}")
+        elif isinstance(no, tuple(OPERADORES_BINARIOS) + tuple(OPERADORES_UNARIOS)):
+            continue
+        elif isinstance(no, ast.Call):
+            if not isinstance(no.func, ast.Name) or no.func.id not in FUNCOES:
+                raise ValueError("Função não permitida")
+            if no.keywords:
+                raise ValueError(f"Argumentos nomeados não são permitidos em {no.func.id}()")
+        elif isinstance(no, ast.Name):
+            if id(no) in nomes_chamados:
+                continue
+            if no.id not in variaveis and no.id not in CONSTANTES:
+                raise ValueError(f"Nome desconhecido: {no.id}")
+        elif isinstance(no, ast.Constant):
+            if isinstance(no.value, bool) or not isinstance(no.value, (int, float)):
+                raise ValueError(f"Constante não permitida: {no.value!r}")
+        else:
+            raise ValueError(f"Construção não permitida: {type(no).__name__}")
+
+
+def compilar_escalar(no, posicoes):
+    """
+    Transforma um nó validado em uma closure que recebe a tupla de valores das variáveis.
+    
+    Subárvores sem variáveis são avaliadas uma única vez, na compilação.
+    
+    Retorna:
+        (closure, constante) - constante é o valor quando a subárvore não depende de variáveis
+    """
+    if isinstance(no, ast.Constant):
+        valor = float(no.value)
+        return (lambda v: valor), valor
+    
+    if isinstance(no, ast.Name):
+        if no.id in posicoes:
+            i = posicoes[no.id]
+            return (lambda v: v[i]), None
+        valor = CONSTANTES[no.id]
+        return (lambda v: valor), valor
+    
+    if isinstance(no, ast.UnaryOp):
+        op = OPERADORES_UNARIOS[type(no.op)]
+        filho, constante = compilar_escalar(no.operand, posicoes)
+        if constante is not None:
+            valor = op(constante)
+            return (lambda v: valor), valor
+        return (lambda v: op(filho(v))), None
+    
+    if isinstance(no, ast.BinOp):
+        op = OPERADORES_BINARIOS[type(no.op)]
+        esquerda, const_esq = compilar_escalar(no.left, posicoes)
+        direita, const_dir = compilar_escalar(no.right, posicoes)
+        if const_esq is not None and const_dir is not None:
+            valor = op(const_esq, const_dir)
+            return (lambda v: valor), valor
+        if const_dir is not None:
+            return (lambda v: op(esquerda(v), const_dir)), None
+        if const_esq is not None:
+            return (lambda v: op(const_esq, direita(v))), None
+        return (lambda v: op(esquerda(v), direita(v))), None
+    
+    # ast.Call (única construção restante após a validação)
+    funcao = FUNCOES[no.func.id]
+    argumentos = [compilar_escalar(arg, posicoes) for arg in no.args]
+    if all(constante is not None for _, constante in argumentos):
+        valor = funcao(*[constante for _, constante in argumentos])
+        return (lambda v: valor), valor
+    if len(argumentos) == 1:
+        arg = argumentos[0][0]
+        return (lambda v: funcao(arg(v))), None
+    fechamentos = [arg for arg, _ in argumentos]
+    return (lambda v: funcao(*[arg(v) for arg in fechamentos])), None
+
+
+def compilar_lote(no, posicoes):
+    """
+    Transforma um nó validado em uma closure vetorial: recebe a tupla de listas
+    de valores das variáveis e devolve a lista de resultados.
+    
+    As operações usam map() sobre listas inteiras, de modo que o laço por
+    ponto roda dentro do interpretador em C.
+    
+    Retorna:
+        (closure, constante)
+    """
+    if isinstance(no, ast.Constant):
+        valor = float(no.value)
+        return (lambda v: [valor] * len(v[0])), valor
+    
+    if isinstance(no, ast.Name):
+        if no.id in posicoes:
+            i = posicoes[no.id]
+            return (lambda v: v[i]), None
+        valor = CONSTANTES[no.id]
+        return (lambda v: [valor] * len(v[0])), valor
+    
+    if isinstance(no, ast.UnaryOp):
+        op = OPERADORES_UNARIOS[type(no.op)]
+        filho, constante = compilar_lote(no.operand, posicoes)
+        if constante is not None:
+            valor = op(constante)
+            return (lambda v: [valor] * len(v[0])), valor
+        return (lambda v: list(map(op, filho(v)))), None
+    
+    if isinstance(no, ast.BinOp):
+        op = OPERADORES_BINARIOS[type(no.op)]
+        esquerda, const_esq = compilar_lote(no.left, posicoes)
+        direita, const_dir = compilar_lote(no.right, posicoes)
+        if const_esq is not None and const_dir is not None:
+            valor = op(const_esq, const_dir)
+            return (lambda v: [valor] * len(v[0])), valor
+        if const_dir is not None:
+            return (lambda v: list(map(op, esquerda(v), repeat(const_dir)))), None
+        if const_esq is not None:
+            return (lambda v: list(map(op, repeat(const_esq), direita(v)))), None
+        return (lambda v: list(map(op, esquerda(v), direita(v)))), None
+    
+    funcao = FUNCOES[no.func.id]
+    argumentos = [compilar_lote(arg, posicoes) for arg in no.args]
+    if all(constante is not None for _, constante in argumentos):
+        valor = funcao(*[constante for _, constante in argumentos])
+        return (lambda v: [valor] * len(v[0])), valor
+    fechamentos = [arg for arg, _ in argumentos]
+    return (lambda v: list(map(funcao, *[arg(v) for arg in fechamentos]))), None
+
+
+@lru_cache(maxsize=256)
+def compilar_expressao(texto, variaveis=('x',)):
+    """
+    Compila uma expressão em funções reutilizáveis (resultado guardado em cache pelo texto).
+    
+    Parâmetros:
+        texto: expressão, ex.: "sin(x)*exp(-x/3)" ou "x^2 + 1"
+        variaveis: tupla com os nomes das variáveis, na ordem dos argumentos
+    
+    Retorna:
+        dicionário com:
+            'funcao': f(*valores) -> float (um ponto)
+            'lote': f(*listas) -> lista (muitos pontos de uma vez)
+            'texto', 'variaveis'
+    """
+    if not isinstance(texto, str) or not texto.strip():
+        raise ValueError("Expressão vazia")
+    if len(texto) > MAXIMO_CARACTERES:
+        raise ValueError(f"Expressão muito longa (máximo de {MAXIMO_CARACTERES} caracteres)")
+    
+    for nome in variaveis:
+        if nome in CONSTANTES or nome in FUNCOES:
+            raise ValueError(f"Nome de variável reservado: {nome}")
+    
+    try:
+        arvore = ast.parse(texto.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Expressão inválida: {e.msg}")
+    
+    validar_arvore(arvore, variaveis)
+    
+    posicoes = {nome: i for i, nome in enumerate(variaveis)}
+    try:
+        escalar, _ = compilar_escalar(arvore.body, posicoes)
+        vetorial, _ = compilar_lote(arvore.body, posicoes)
+    except (ArithmeticError, ValueError) as e:
+        raise ValueError(f"Erro ao avaliar parte constante da expressão: {e}")
+    
+    if len(variaveis) == 1:
+        def funcao(x):
+            return escalar((x,))
+        
+        def lote(valores):
+            return vetorial((list(valores),))
+    else:
+        def funcao(*valores):
+            return escalar(valores)
+        
+        def lote(*listas):
+            return vetorial(tuple(list(valores) for valores in listas))
+    
+    return {
+        'texto': texto,
+        'variaveis': variaveis,
+        'funcao': funcao,
+        'lote': lote
+    }
@@ -0,0 +1,202 @@
+"""
+Módulo: Índice de Áreas Acumuladas
+Integral acumulada (prefixos do Trapézio e do Simpson 1/3) construída uma
+única vez a partir de (x, y), para responder a área entre quaisquer dois
+valores de x em O(log n)
+"""
+
+import hashlib
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+# Número máximo de índices mantidos em memória (os menos usados saem primeiro)
+MAXIMO_INDICES = 32
+
+# Número máximo de intervalos por consulta em lote
+MAXIMO_CONSULTAS = 100000
+
+INDICES = OrderedDict()
+TRAVA_INDICES = threading.Lock()
+
+
+def identificador_dados(x, y):
+    """Identificador do conjunto de dados: hash do conteúdo de x e y em float64"""
+    resumo = hashlib.sha256()
+    for valores in (x, y):
+        dados = array('d', valores)
+        if sys.byteorder == 'big':
+            dados.byteswap()
+        resumo.update(dados.tobytes())
+    return resumo.hexdigest()[:16]
+
+
+def integral_parabola(x0, x1, x2, f0, f1, f2, t):
+    """
+    Integral, de x0 até t, da parábola que passa por (x0, f0), (x1, f1), (x2, f2).
+    
+    Usa a forma de Newton P(s) = f0 + d1*(s - x0) + d2*(s - x0)*(s - x1),
+    cuja integral é f0*τ + d1*τ²/2 + d2*(τ³/3 - h0*τ²/2), com τ = t - x0.
+    """
+    h0 = x1 - x0
+    h1 = x2 - x1
+    d1 = (f1 - f0) / h0
+    d2 = ((f2 - f1) / h1 - d1) / (h0 + h1)
+    tau = t - x0
+    return f0 * tau + d1 * tau * tau / 2 + d2 * (tau ** 3 / 3 - h0 * tau * tau / 2)
+
+
+def construir_indice(x, y):
+    """
+    Constrói as integrais acumuladas do Trapézio e do Simpson 1/3.
+    
+    O prefixo do Trapézio é guardado em todos os nós; o do Simpson, nos nós
+    pares (fim de cada par de intervalos). Se o número de intervalos for
+    ímpar, o último intervalo usa a parábola pelos três últimos pontos.
+    
+    Parâmetros:
+        x: sequência de posições estritamente crescentes
+        y: sequência de valores da função
+    
+    Retorna:
+        dicionário com os arrays do índice
+    """
+    x = array('d', x)
+    y = array('d', y)
+    n = len(x) - 1
+    
+    if len(x) != len(y):
+        raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+    if n < 2:
+        raise ValueError("São necessários pelo menos 3 pontos")
+    
+    trapezio = array('d', [0.0]) * (n + 1)
+    acumulado = 0.0
+    for i in range(n):
+        h = x[i + 1] - x[i]
+        if h <= 0:
+            raise ValueError(f"x deve ser estritamente crescente (x[{i}] = {x[i]}, x[{i+1}] = {x[i+1]})")
+        acumulado += h * (y[i] + y[i + 1]) / 2
+        trapezio[i + 1] = acumulado
+    
+    simpson = array('d', [0.0]) * (n // 2 + 1)
+    acumulado = 0.0
+    for j in range(n // 2):
+        i = 2 * j
+        acumulado += integral_parabola(x[i], x[i + 1], x[i + 2], y[i], y[i + 1], y[i + 2], x[i + 2])
+        simpson[j + 1] = acumulado
+    
+    return {
+        'x': x,
+        'y': y,
+        'trapezio': trapezio,
+        'simpson': simpson,
+        'numero_intervalos': n
+    }
+
+
+def integral_ate(indice, t, metodo):
+    """
+    Integral acumulada de x[0] até t: prefixo no nó anterior a t (busca binária)
+    mais a correção do pedaço final.
+    """
+    x, y = indice['x'], indice['y']
+    n = indice['numero_intervalos']
+    
+    if not x[0] <= t <= x[n]:
+        raise ValueError(f"x = {t} fora do intervalo dos dados [{x[0]}, {x[n]}]")
+    
+    k = min(bisect_right(x, t) - 1, n - 1)
+    
+    if metodo == 'trapezio':
+        tau = t - x[k]
+        y_t = y[k] + (y[k + 1] - y[k]) * tau / (x[k + 1] - x[k])
+        return indice['trapezio'][k] + tau * (y[k] + y_t) / 2
+    
+    if metodo != 'simpson':
+        raise ValueError(f"Método desconhecido: {metodo}")
+    
+    j = k // 2
+    i = 2 * j
+    if i + 2 <= n:
+        return indice['simpson'][j] + integral_parabola(
+            x[i], x[i + 1], x[i + 2], y[i], y[i + 1], y[i + 2], t)
+    
+    # Último intervalo (número ímpar de intervalos): parábola pelos três últimos pontos
+    parcial = (integral_parabola(x[n - 2], x[n - 1], x[n], y[n - 2], y[n - 1], y[n], t)
+               - integral_parabola(x[n - 2], x[n - 1], x[n], y[n - 2], y[n - 1], y[n], x[n - 1]))
+    return indice['simpson'][j] + parcial
+
+
+def area_entre(indice, a, b, metodo='simpson'):
+    """Área entre x = a e x = b (negativa se b < a)"""
+    return integral_ate(indice, b, metodo) - integral_ate(indice, a, metodo)
+
+
+def registrar_indice(x, y):
+    """
+    Constrói (ou reaproveita) o índice de um conjunto de dados e o guarda em cache.
+    
+    Retorna:
+        resumo do índice com o identificador para consultas futuras
+    """
+    identificador = identificador_dados(x, y)
+    
+    with TRAVA_INDICES:
+        indice = INDICES.get(identificador)
+        if indice is not None:
+            INDICES.move_to_end(identificador)
+    
+    if indice is None:
+        indice = construir_indice(x, y)
+        with TRAVA_INDICES:
+            INDICES[identificador] = indice
+            INDICES.move_to_end(identificador)
+            while len(INDICES) > MAXIMO_INDICES:
+                INDICES.popitem(last=False)
+    
+    n = indice['numero_intervalos']
+    return {
+        'id': identificador,
+        'numero_pontos': n + 1,
+        'x_min': indice['x'][0],
+        'x_max': indice['x'][n],
+        'area_total_trapezio': indice['trapezio'][n],
+        'area_total_simpson': area_entre(indice, indice['x'][0], indice['x'][n], 'simpson')
+    }
+
+
+def consultar_areas(identificador, intervalos, metodo='simpson'):
+    """
+    Responde um lote de consultas de área sobre um índice em cache.
+    
+    Parâmetros:
+        identificador: id devolvido por registrar_indice
+        intervalos: lista de pares [a, b]
+        metodo: 'simpson' ou 'trapezio'
+    
+    Retorna:
+        dicionário com as áreas na mesma ordem dos intervalos
+        (None se o identificador não estiver em cache)
+    """
+    with TRAVA_INDICES:
+        indice = INDICES.get(identificador)
+        if indice is not None:
+            INDICES.move_to_end(identificador)
+    
+    if indice is None:
+        return None
+    
+    if len(intervalos) > MAXIMO_CONSULTAS:
+        raise ValueError(f"Máximo de {MAXIMO_CONSULTAS} intervalos por consulta")
+    
+    areas = [area_entre(indice, float(a), float(b), metodo) for a, b in intervalos]
+    
+    return {
+        'id': identificador,
+        'metodo': metodo,
+        'areas': areas,
+        'numero_consultas': len(areas)
+    }
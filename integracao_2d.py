@@ -0,0 +1,360 @@
+"""
+Módulo: Integração em Grades 2-D
+Volume sob uma grade de profundidades z[i][j] (linhas em y, colunas em x) pelo
+produto tensorial das regras 1-D (Trapézio, Simpson 1/3 generalizado ou
+Newton-Cotes), lendo a grade de um arquivo mapeado em memória bloco a bloco
+"""
+
+import ast
+import math
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from operator import mul
+
+from integracao_numerica import TOLERANCIA_UNIFORME, pesos_newton_cotes
+from leitura_dados import TAMANHO_LEITURA
+
+# Linhas da grade processadas por bloco (as páginas do bloco são liberadas em seguida)
+LINHAS_POR_BLOCO = 256
+
+# Assinatura e tipo aceito dos arquivos .npy
+ASSINATURA_NPY = b'\x93NUMPY'
+TIPOS_NPY = ('<f8', '<d')
+
+METODOS_2D = ('trapezio', 'simpson', 'newton_cotes')
+
+
+def coordenadas_grade(coordenadas=None, inicio=0.0, passo=1.0, quantidade=None):
+    """
+    Coordenadas de um eixo: lista explícita (grade retilínea) ou início + passo (grade regular).
+    
+    A lista explícita pode vir como sequência de números ou como texto separado
+    por vírgulas, como nas demais rotas.
+    
+    Retorna:
+        array float64 com as coordenadas
+    """
+    if isinstance(coordenadas, str):
+        coordenadas = [float(val.strip()) for val in coordenadas.split(',')]
+    if coordenadas is not None:
+        eixo = array('d', coordenadas)
+        if quantidade is not None and len(eixo) != quantidade:
+            raise ValueError(f"Esperadas {quantidade} coordenadas, recebidas {len(eixo)}")
+        return eixo
+    
+    if quantidade is None:
+        raise ValueError("Informe as coordenadas ou a quantidade de pontos do eixo")
+    if passo <= 0:
+        raise ValueError("O passo da grade deve ser positivo")
+    return array('d', (inicio + i * passo for i in range(quantidade)))
+
+
+def pesos_trapezio(coordenadas):
+    """Pesos do Trapézio repetido para coordenadas crescentes (qualquer espaçamento)"""
+    n = len(coordenadas) - 1
+    pesos = array('d', bytes(8 * (n + 1)))
+    
+    for i in range(n):
+        h = coordenadas[i + 1] - coordenadas[i]
+        if h <= 0:
+            raise ValueError(f"Coordenadas devem ser estritamente crescentes (posição {i})")
+        pesos[i] += h / 2
+        pesos[i + 1] += h / 2
+    
+    return pesos
+
+
+def pesos_simpson(coordenadas):
+    """
+    Pesos do Simpson 1/3 generalizado (mesma regra de area_simpson_nao_uniforme).
+    
+    Em cada par de intervalos (h0, h1):
+        w0 += (h0+h1)/6 * (2 - h1/h0)
+        w1 += (h0+h1)/6 * (h0+h1)²/(h0*h1)
+        w2 += (h0+h1)/6 * (2 - h0/h1)
+    Com número ímpar de intervalos, o último usa a parábola pelos três últimos pontos.
+    """
+    n = len(coordenadas) - 1
+    if n == 1:
+        return pesos_trapezio(coordenadas)
+    
+    pesos = array('d', bytes(8 * (n + 1)))
+    for i in range(n):
+        if coordenadas[i + 1] <= coordenadas[i]:
+            raise ValueError(f"Coordenadas devem ser estritamente crescentes (posição {i})")
+    
+    for i in range(0, n - 1, 2):
+        h0 = coordenadas[i + 1] - coordenadas[i]
+        h1 = coordenadas[i + 2] - coordenadas[i + 1]
+        hs = h0 + h1
+        pesos[i] += hs / 6 * (2 - h1 / h0)
+        pesos[i + 1] += hs / 6 * hs * hs / (h0 * h1)
+        pesos[i + 2] += hs / 6 * (2 - h0 / h1)
+    
+    if n % 2 == 1:
+        h0 = coordenadas[n - 1] - coordenadas[n - 2]
+        h1 = coordenadas[n] - coordenadas[n - 1]
+        pesos[n] += (2 * h1 * h1 + 3 * h0 * h1) / (6 * (h0 + h1))
+        pesos[n - 1] += (h1 * h1 + 3 * h0 * h1) / (6 * h0)
+        pesos[n - 2] -= h1 ** 3 / (6 * h0 * (h0 + h1))
+    
+    return pesos
+
+
+def pesos_eixo(coordenadas, metodo):
+    """
+    Vetor de pesos 1-D de um eixo para o método escolhido.
+    
+    'newton_cotes' exige espaçamento uniforme; os demais aceitam grades retilíneas.
+    """
+    n = len(coordenadas) - 1
+    if n < 1:
+        raise ValueError("Cada eixo precisa de pelo menos 2 pontos")
+    
+    if metodo == 'trapezio':
+        return pesos_trapezio(coordenadas)
+    if metodo == 'simpson':
+        return pesos_simpson(coordenadas)
+    if metodo != 'newton_cotes':
+        raise ValueError(f"Método desconhecido: {metodo}")
+    
+    h = (coordenadas[n] - coordenadas[0]) / n
+    if h <= 0:
+        raise ValueError("Coordenadas devem ser estritamente crescentes")
+    for i in range(n):
+        if abs(coordenadas[i + 1] - coordenadas[i] - h) > TOLERANCIA_UNIFORME * h:
+            raise ValueError("Newton-Cotes requer espaçamento uniforme nos dois eixos")
+    pesos, _ = pesos_newton_cotes(n, h)
+    return pesos
+
+
+def integrar_linhas(linhas, pesos_x, pesos_y):
+    """
+    Volume Σ_i wy[i] * Σ_j wx[j] * z[i][j] a partir de um iterável de linhas.
+    
+    Cada linha é reduzida a um único valor (produto escalar com os pesos de x)
+    assim que é lida, de modo que nenhuma linha precisa permanecer em memória.
+    
+    Retorna:
+        (volume, numero_linhas)
+    """
+    colunas = len(pesos_x)
+    parciais = []
+    numero_linhas = 0
+    
+    for linha, peso in zip(linhas, pesos_y):
+        if len(linha) != colunas:
+            raise ValueError(f"Linha {numero_linhas}: esperadas {colunas} colunas, recebidas {len(linha)}")
+        parciais.append(peso * math.fsum(map(mul, pesos_x, linha)))
+        numero_linhas += 1
+    
+    if numero_linhas != len(pesos_y):
+        raise ValueError(f"Esperadas {len(pesos_y)} linhas, recebidas {numero_linhas}")
+    
+    return math.fsum(parciais), numero_linhas
+
+
+def ler_cabecalho_npy(mapa):
+    """
+    Lê o cabeçalho de um arquivo .npy (versões 1, 2 e 3).
+    
+    Retorna:
+        (deslocamento dos dados, (linhas, colunas))
+    """
+    versao = mapa[6]
+    if versao == 1:
+        tamanho = int.from_bytes(mapa[8:10], 'little')
+        inicio = 10
+    elif versao in (2, 3):
+        tamanho = int.from_bytes(mapa[8:12], 'little')
+        inicio = 12
+    else:
+        raise ValueError(f"Versão de .npy não suportada: {versao}")
+    
+    try:
+        cabecalho = ast.literal_eval(bytes(mapa[inicio:inicio + tamanho]).decode('latin1'))
+    except (ValueError, SyntaxError):
+        raise ValueError("Cabeçalho .npy inválido")
+    
+    if cabecalho.get('descr') not in TIPOS_NPY:
+        raise ValueError(f"Tipo de dado não suportado: {cabecalho.get('descr')} (esperado float64 little-endian)")
+    if cabecalho.get('fortran_order'):
+        raise ValueError("Arrays em ordem Fortran não são suportados")
+    forma = tuple(cabecalho.get('shape', ()))
+    if len(forma) != 2:
+        raise ValueError(f"Esperada uma grade 2-D, recebida forma {forma}")
+    
+    return inicio + tamanho, forma
+
+
+def linhas_mapeadas(mapa, deslocamento, linhas, colunas, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Gera as linhas de uma grade float64 mapeada em memória, bloco a bloco.
+    
+    Cada bloco é visto diretamente no mapa (memoryview, sem cópia); depois de
+    consumido, suas páginas são devolvidas ao sistema quando possível, para que
+    a memória residente não cresça com o tamanho do arquivo.
+    """
+    bytes_linha = 8 * colunas
+    pagina = mmap.PAGESIZE
+    liberar = hasattr(mapa, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+    
+    for primeira in range(0, linhas, linhas_por_bloco):
+        quantidade = min(linhas_por_bloco, linhas - primeira)
+        inicio = deslocamento + primeira * bytes_linha
+        fim = inicio + quantidade * bytes_linha
+        
+        visao = memoryview(mapa)[inicio:fim]
+        try:
+            if sys.byteorder == 'big':
+                bloco = array('d', bytes(visao))
+                bloco.byteswap()
+            else:
+                bloco = visao.cast('d')
+            for i in range(quantidade):
+                yield bloco[i * colunas:(i + 1) * colunas]
+            del bloco
+        finally:
+            visao.release()
+        
+        if liberar:
+            alinhado = inicio - inicio % pagina
+            mapa.madvise(mmap.MADV_DONTNEED, alinhado, fim - alinhado)
+
+
+def vetor_mapeado(mapa, inicio, quantidade):
+    """Cópia de um vetor float64 little-endian guardado no mapa a partir de inicio"""
+    vetor = array('d', bytes(mapa[inicio:inicio + 8 * quantidade]))
+    if sys.byteorder == 'big':
+        vetor.byteswap()
+    return vetor
+
+
+def integrar_grade(profundidades, x=None, y=None, metodo='simpson'):
+    """
+    Integra uma grade de profundidades em memória (lista de linhas).
+    
+    Parâmetros:
+        profundidades: lista de linhas; profundidades[i][j] é o valor em (x[j], y[i])
+        x: coordenadas das colunas (padrão: 0, 1, 2, ...)
+        y: coordenadas das linhas (padrão: 0, 1, 2, ...)
+        metodo: 'trapezio', 'simpson' ou 'newton_cotes'
+    
+    Retorna:
+        dicionário com volume e dimensões da grade
+    """
+    linhas = len(profundidades)
+    if linhas < 2:
+        raise ValueError("A grade precisa de pelo menos 2 linhas")
+    colunas = len(profundidades[0])
+    
+    x = coordenadas_grade(x, quantidade=colunas)
+    y = coordenadas_grade(y, quantidade=linhas)
+    
+    volume, _ = integrar_linhas(profundidades, pesos_eixo(x, metodo), pesos_eixo(y, metodo))
+    
+    return {
+        'volume': volume,
+        'metodo': metodo,
+        'linhas': linhas,
+        'colunas': colunas,
+        'area_base': (x[-1] - x[0]) * (y[-1] - y[0])
+    }
+
+
+def integrar_arquivo_aberto(arquivo, forma=None, x=None, y=None, metodo='simpson',
+                            x_inicio=0.0, x_passo=1.0, y_inicio=0.0, y_passo=1.0,
+                            coordenadas_anexas=False, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Integra uma grade guardada em um arquivo já aberto (modo binário), via mmap.
+    
+    O arquivo pode ser .npy (float64 little-endian, ordem C) ou float64
+    little-endian bruto, caso em que a forma (linhas, colunas) deve ser informada.
+    Com coordenadas_anexas, a grade é seguida pelas coordenadas x (colunas) e y
+    (linhas) em float64 little-endian, para grades retilíneas grandes demais
+    para listas.
+    
+    Parâmetros:
+        arquivo: arquivo aberto com fileno()
+        forma: (linhas, colunas), obrigatória para arquivo bruto
+        x, y: coordenadas explícitas (grade retilínea); se omitidas, usa início + passo
+        coordenadas_anexas: se True, lê x e y do final do arquivo, após a grade
+        metodo: 'trapezio', 'simpson' ou 'newton_cotes'
+        linhas_por_bloco: linhas lidas por bloco
+    
+    Retorna:
+        dicionário com volume e dimensões da grade
+    """
+    tamanho_arquivo = os.fstat(arquivo.fileno()).st_size
+    if tamanho_arquivo == 0:
+        raise ValueError("Arquivo vazio")
+    
+    with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        if mapa[:6] == ASSINATURA_NPY:
+            deslocamento, forma_arquivo = ler_cabecalho_npy(mapa)
+            if forma is not None and tuple(forma) != forma_arquivo:
+                raise ValueError(f"Forma informada {tuple(forma)} difere da do arquivo {forma_arquivo}")
+            forma = forma_arquivo
+        else:
+            if forma is None:
+                raise ValueError("Informe a forma (linhas, colunas) do arquivo bruto")
+            deslocamento = 0
+        
+        linhas, colunas = int(forma[0]), int(forma[1])
+        if linhas < 2 or colunas < 2:
+            raise ValueError("A grade precisa de pelo menos 2 linhas e 2 colunas")
+        fim_grade = deslocamento + 8 * linhas * colunas
+        esperado = fim_grade + (8 * (colunas + linhas) if coordenadas_anexas else 0)
+        if tamanho_arquivo != esperado:
+            raise ValueError(f"Tamanho do arquivo ({tamanho_arquivo} bytes) não corresponde "
+                             f"à forma {linhas}x{colunas} ({esperado} bytes)")
+        
+        if coordenadas_anexas:
+            if x is not None or y is not None:
+                raise ValueError("Informe as coordenadas anexas ao arquivo ou explícitas, não ambas")
+            x = vetor_mapeado(mapa, fim_grade, colunas)
+            y = vetor_mapeado(mapa, fim_grade + 8 * colunas, linhas)
+        
+        x = coordenadas_grade(x, x_inicio, x_passo, colunas)
+        y = coordenadas_grade(y, y_inicio, y_passo, linhas)
+        
+        volume, _ = integrar_linhas(
+            linhas_mapeadas(mapa, deslocamento, linhas, colunas, linhas_por_bloco),
+            pesos_eixo(x, metodo), pesos_eixo(y, metodo))
+    
+    return {
+        'volume': volume,
+        'metodo': metodo,
+        'linhas': linhas,
+        'colunas': colunas,
+        'area_base': (x[-1] - x[0]) * (y[-1] - y[0])
+    }
+
+
+def integrar_grade_arquivo(caminho, **opcoes):
+    """
+    Integra uma grade .npy ou float64 bruta a partir do caminho do arquivo,
+    sem carregá-la inteira na memória (opções como em integrar_arquivo_aberto).
+    """
+    with open(caminho, 'rb') as arquivo:
+        return integrar_arquivo_aberto(arquivo, **opcoes)
+
+
+def integrar_grade_fluxo(fluxo, **opcoes):
+    """
+    Integra uma grade recebida como fluxo de bytes (ex.: corpo de uma requisição).
+    
+    O fluxo é copiado em blocos para um arquivo temporário, que é então mapeado
+    em memória; a grade nunca é montada inteira em listas Python.
+    """
+    with tempfile.TemporaryFile() as arquivo:
+        while True:
+            dados = fluxo.read(TAMANHO_LEITURA)
+            if not dados:
+                break
+            arquivo.write(dados)
+        arquivo.flush()
+        return integrar_arquivo_aberto(arquivo, **opcoes)
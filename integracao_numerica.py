@@ -3,6 +3,78 @@ Módulo: Integração Numérica
 Implementa métodos de integração numérica: Trapézio e Simpson 1/3 Repetido
 """
 
+import heapq
+import math
+from array import array
+from itertools import islice
+from operator import mul
+
+from expressoes import compilar_expressao
+from leitura_dados import TIPO_BINARIO, TIPO_CSV, ler_blocos_csv, ler_blocos_mapeados
+
+# Acima deste número de pontos, resolver_integracao usa os núcleos rápidos
+# (sem o passo a passo ponto a ponto)
+LIMITE_DETALHES = 2000
+
+# Regras fechadas de Newton-Cotes por número de intervalos do painel:
+# (nome, fator, coeficientes) com área = fator * h * Σ coeficiente_i * y_i
+REGRAS_NEWTON_COTES = {
+    1: ('trapezio', 1 / 2, (1, 1)),
+    2: ('simpson13', 1 / 3, (1, 4, 1)),
+    3: ('simpson38', 3 / 8, (1, 3, 3, 1)),
+    4: ('boole', 2 / 45, (7, 32, 12, 32, 7)),
+}
+
+# Tolerância relativa para considerar o espaçamento uniforme
+TOLERANCIA_UNIFORME = 1e-9
+
+# Regra de Gauss-Kronrod G7/K15 em [-1, 1] (tabelas do QUADPACK).
+# Nós positivos de Kronrod; os de índice ímpar (e o zero) são os nós de Gauss.
+NOS_KRONROD_POSITIVOS = [
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.000000000000000000000000000000000,
+]
+PESOS_KRONROD_POSITIVOS = [
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+]
+PESOS_GAUSS_POSITIVOS = [
+    0.129484966168869693270611432679082,
+    0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975,
+    0.417959183673469387755102040816327,
+]
+
+
+def tabela_gauss_kronrod():
+    """Monta, uma única vez, os 15 nós com os pesos de Kronrod e de Gauss (0 fora do G7)"""
+    nos = []
+    pesos_k = []
+    pesos_g = []
+    for i, (no, peso) in enumerate(zip(NOS_KRONROD_POSITIVOS, PESOS_KRONROD_POSITIVOS)):
+        peso_g = PESOS_GAUSS_POSITIVOS[i // 2] if i % 2 == 1 or no == 0.0 else 0.0
+        sinais = (1.0,) if no == 0.0 else (-1.0, 1.0)
+        for sinal in sinais:
+            nos.append(sinal * no)
+            pesos_k.append(peso)
+            pesos_g.append(peso_g)
+    return tuple(nos), tuple(pesos_k), tuple(pesos_g)
+
+
+NOS_GK15, PESOS_K15, PESOS_G7 = tabela_gauss_kronrod()
+
 def area_trapezio(x, y):
     """
     Calcula a área sob a curva usando o método do Trapézio.
@@ -52,11 +124,10 @@ def area_trapezio(x, y):
     # Fórmula do Trapézio: A = (h/2) * (y0 + 2*y1 + 2*y2 + ... + 2*y(n-1) + yn)
     detalhes.append(f"\nFórmula: A = (h/2) * (y[0] + 2*Σy[i] + y[n])")
     
-    soma_interior = sum(y[1:-1])
     area = 0
     
     for i in range(n):
-        h_i = x[i + 1] - x[i]
+        h_i = h_values[i]
         area_trap = (h_i / 2) * (y[i] + y[i + 1])
         area += area_trap
         detalhes.append(f"  Trapézio {i}: ({h_i}/2) * ({y[i]} + {y[i+1]}) = {area_trap}")
@@ -125,7 +196,7 @@ def area_simpson13_repetido(x, y):
         detalhes.append(f"\nEspaçamento uniforme: h = {h}")
     else:
         detalhes.append(f"\nEspaçamento não-uniforme detectado")
-        detalhes.append("Usaremos trapézios para cada intervalo individual")
+        detalhes.append("Usaremos Simpson 1/3 generalizado (h0 ≠ h1 em cada par de intervalos)")
         h = None
     
     detalhes.append(f"\nPontos de integração:")
@@ -150,6 +221,9 @@ def area_simpson13_repetido(x, y):
     if h is not None:
         area = (h / 3) * (y[0] + 4 * odd_sum + 2 * even_sum + y[-1])
         detalhes.append(f"\nA = ({h}/3) * ({y[0]} + 4*{odd_sum} + 2*{even_sum} + {y[-1]})")
+    else:
+        area = area_simpson_nao_uniforme(x, y)['area']
+        detalhes.append("\nFórmula por par: A = (h0+h1)/6 * ((2 - h1/h0)*y0 + (h0+h1)²/(h0*h1)*y1 + (2 - h0/h1)*y2)")
     
     detalhes.append(f"\n{'='*50}")
     detalhes.append(f"ÁREA TOTAL (Simpson 1/3) = {area}")
@@ -163,10 +237,132 @@ def area_simpson13_repetido(x, y):
     }
 
 
-def area_simpson_com_trapezio(x, y):
+def area_trapezio_rapida(x, y):
+    """
+    Núcleo do Trapézio para muitos pontos: uma passagem, sem montar detalhes.
+    
+    Usa soma compensada (Neumaier) para que o erro de arredondamento não
+    cresça com o número de intervalos.
+    
+    Parâmetros:
+        x: sequência de posições (lista ou array)
+        y: sequência de valores da função
+    
+    Retorna:
+        dicionário com área e número de intervalos
+    """
+    n = len(x) - 1
+    if n < 1:
+        raise ValueError("São necessários pelo menos 2 pontos")
+    
+    soma = 0.0
+    compensacao = 0.0
+    pontos = zip(x, y)
+    x0, f0 = next(pontos)
+    
+    for x1, f1 in pontos:
+        termo = (x1 - x0) * (f0 + f1)
+        t = soma + termo
+        if abs(soma) >= abs(termo):
+            compensacao += (soma - t) + termo
+        else:
+            compensacao += (termo - t) + soma
+        soma = t
+        x0, f0 = x1, f1
+    
+    return {
+        'area': (soma + compensacao) / 2,
+        'numero_intervalos': n
+    }
+
+
+def area_parabola_ultimo_intervalo(x0, x1, x2, y0, y1, y2):
+    """
+    Área do intervalo [x1, x2] sob a parábola que passa pelos três pontos,
+    usada para fechar o Simpson quando o número de intervalos é ímpar:
+        A = α*y2 + β*y1 - η*y0, com h0 = x1 - x0 e h1 = x2 - x1
+    """
+    h0 = x1 - x0
+    h1 = x2 - x1
+    alfa = (2 * h1 * h1 + 3 * h0 * h1) / (6 * (h0 + h1))
+    beta = (h1 * h1 + 3 * h0 * h1) / (6 * h0)
+    eta = h1 ** 3 / (6 * h0 * (h0 + h1))
+    return alfa * y2 + beta * y1 - eta * y0
+
+
+def area_simpson_nao_uniforme(x, y):
+    """
+    Núcleo do Simpson 1/3 generalizado para espaçamento não-uniforme.
+    
+    Percorre os pontos uma única vez, em pares de intervalos (h0, h1):
+        A_par = (h0+h1)/6 * ((2 - h1/h0)*y0 + (h0+h1)²/(h0*h1)*y1 + (2 - h0/h1)*y2)
+    que se reduz a (h/3)*(y0 + 4y1 + y2) quando h0 = h1. Se o número de
+    intervalos for ímpar, o último intervalo usa a parábola pelos três
+    últimos pontos (mesma ordem do Simpson, ao contrário do trapézio).
+    A soma é compensada (Neumaier) e nenhum texto é montado por ponto.
+    
+    Parâmetros:
+        x: sequência de posições crescentes (lista ou array)
+        y: sequência de valores da função
+    
+    Retorna:
+        dicionário com área, número de intervalos e modo
+    """
+    n = len(x) - 1
+    if n < 1:
+        raise ValueError("São necessários pelo menos 2 pontos")
+    
+    if n == 1:
+        return {
+            'area': (x[1] - x[0]) * (y[0] + y[1]) / 2,
+            'numero_intervalos': n,
+            'modo': 'trapezio'
+        }
+    
+    soma = 0.0
+    compensacao = 0.0
+    pontos = zip(x, y)
+    x0, f0 = next(pontos)
+    pares = islice(pontos, 2 * (n // 2))
+    
+    try:
+        for (x1, f1), (x2, f2) in zip(pares, pares):
+            h0 = x1 - x0
+            h1 = x2 - x1
+            hs = h0 + h1
+            termo = hs / 6 * ((2 - h1 / h0) * f0 + hs * hs / (h0 * h1) * f1 + (2 - h0 / h1) * f2)
+            t = soma + termo
+            if abs(soma) >= abs(termo):
+                compensacao += (soma - t) + termo
+            else:
+                compensacao += (termo - t) + soma
+            soma = t
+            x0, f0 = x2, f2
+        
+        area = soma + compensacao
+        modo = 'simpson_generalizado'
+        
+        if n % 2 == 1:
+            # Último intervalo pela parábola que passa pelos três últimos pontos
+            area += area_parabola_ultimo_intervalo(x[-3], x[-2], x[-1], y[-3], y[-2], y[-1])
+            modo = 'simpson_generalizado_ultimo_intervalo'
+    except ZeroDivisionError:
+        raise ValueError("Pontos com x repetido: os espaçamentos devem ser não nulos")
+    
+    return {
+        'area': area,
+        'numero_intervalos': n,
+        'modo': modo
+    }
+
+
+def area_simpson_hibrido(x, y):
     """
     Calcula área usando Simpson 1/3 para os primeiros n-1 intervalos (se n ímpar)
-    e trapézio para o último intervalo. Se n é par, usa só Simpson 1/3.
+    e, no último intervalo, a parábola pelos três últimos pontos (a mesma regra
+    de area_simpson_nao_uniforme e da integração em blocos, de modo que o
+    resultado não muda de regra conforme o número de pontos). Se n é par, usa
+    só Simpson 1/3; com um único intervalo, o trapézio.
     
     Parâmetros:
         x: lista de posições (distâncias)
@@ -184,9 +380,20 @@ def area_simpson_com_trapezio(x, y):
         raise ValueError("São necessários pelo menos 2 pontos")
     
     detalhes = []
-    detalhes.append("=== MÉTODO DE SIMPSON 1/3 + TRAPÉZIO (HÍBRIDO) ===\n")
+    detalhes.append("=== MÉTODO DE SIMPSON 1/3 HÍBRIDO ===\n")
     detalhes.append(f"Número de intervalos (n): {n}")
     
+    if n == 1:
+        area = (x[1] - x[0]) * (y[0] + y[1]) / 2
+        detalhes.append("\nApenas um intervalo: aplicando o Trapézio")
+        detalhes.append(f"A = ({x[1]} - {x[0]})/2 * ({y[0]} + {y[1]}) = {area}")
+        return {
+            'area': area,
+            'detalhes': '\n'.join(detalhes),
+            'numero_intervalos': n,
+            'modo': 'trapezio'
+        }
+    
     if n % 2 == 0:
         detalhes.append(f"\nNúmero de intervalos é PAR ({n})")
         detalhes.append("Aplicando Simpson 1/3 Repetido em todo o domínio")
@@ -198,13 +405,13 @@ def area_simpson_com_trapezio(x, y):
             'area': result['area'],
             'detalhes': '\n'.join(detalhes) + "\n" + result['detalhes'],
             'numero_intervalos': n,
-            'modo': 'simpson_completo'
+            'modo': 'simpson_generalizado'
         }
     
     else:
         detalhes.append(f"\nNúmero de intervalos é ÍMPAR ({n})")
         detalhes.append("Aplicando Simpson 1/3 nos primeiros (n-1) intervalos")
-        detalhes.append("Aplicando Trapézio no último intervalo")
+        detalhes.append("Aplicando a parábola pelos três últimos pontos no último intervalo")
         
         # Simpson nos primeiros n-1 pontos
         result_simpson = area_simpson13_repetido(x[:-1], y[:-1])
@@ -213,30 +420,550 @@ def area_simpson_com_trapezio(x, y):
         detalhes.append(f"\n--- Parte 1: Simpson 1/3 (primeiros {n-1} intervalos) ---")
         detalhes.append(result_simpson['detalhes'])
         
-        # Trapézio no último intervalo
-        h_last = x[-1] - x[-2]
-        area_trap_last = (h_last / 2) * (y[-2] + y[-1])
+        # Parábola pelos três últimos pontos, integrada só no último intervalo
+        h0 = x[-2] - x[-3]
+        h1 = x[-1] - x[-2]
+        area_ultimo = area_parabola_ultimo_intervalo(x[-3], x[-2], x[-1], y[-3], y[-2], y[-1])
         
-        detalhes.append(f"\n--- Parte 2: Trapézio (último intervalo) ---")
-        detalhes.append(f"h = {x[-1]} - {x[-2]} = {h_last}")
-        detalhes.append(f"A_trapézio = ({h_last}/2) * ({y[-2]} + {y[-1]}) = {area_trap_last}")
+        detalhes.append(f"\n--- Parte 2: Parábola (último intervalo) ---")
+        detalhes.append(f"h0 = {x[-2]} - {x[-3]} = {h0}, h1 = {x[-1]} - {x[-2]} = {h1}")
+        detalhes.append("A = α*y[n] + β*y[n-1] - η*y[n-2], com α = (2h1² + 3h0h1)/(6(h0+h1)), "
+                        "β = (h1² + 3h0h1)/(6h0), η = h1³/(6h0(h0+h1))")
+        detalhes.append(f"A_último = {area_ultimo}")
         
-        area_total = area_simpson + area_trap_last
+        area_total = area_simpson + area_ultimo
         
         detalhes.append(f"\n{'='*50}")
         detalhes.append(f"ÁREA PARTE 1 (Simpson) = {area_simpson}")
-        detalhes.append(f"ÁREA PARTE 2 (Trapézio) = {area_trap_last}")
-        detalhes.append(f"ÁREA TOTAL = {area_simpson} + {area_trap_last} = {area_total}")
+        detalhes.append(f"ÁREA PARTE 2 (Parábola) = {area_ultimo}")
+        detalhes.append(f"ÁREA TOTAL = {area_simpson} + {area_ultimo} = {area_total}")
         detalhes.append(f"{'='*50}")
         
         return {
             'area': area_total,
             'detalhes': '\n'.join(detalhes),
             'numero_intervalos': n,
-            'modo': 'simpson_trapezio'
+            'modo': 'simpson_generalizado_ultimo_intervalo'
         }
 
 
+def particao_newton_cotes(n):
+    """
+    Divide n intervalos em painéis de Boole (4), Simpson 3/8 (3) e Simpson 1/3 (2)
+    de modo que todos tenham a maior ordem possível.
+        
+        n = 4k      -> k Boole
+        n = 4k + 1  -> (k-1) Boole + Simpson 3/8 + Simpson 1/3
+        n = 4k + 2  -> k Boole + Simpson 1/3
+        n = 4k + 3  -> k Boole + Simpson 3/8
+        n = 1       -> Trapézio (única opção)
+    
+    Retorna:
+        lista com o número de intervalos de cada painel, da esquerda para a direita
+    """
+    if n < 1:
+        raise ValueError("São necessários pelo menos 2 pontos")
+    if n == 1:
+        return [1]
+    
+    k, resto = divmod(n, 4)
+    if resto == 0:
+        return [4] * k
+    if resto == 1:
+        return [4] * (k - 1) + [3, 2]
+    if resto == 2:
+        return [4] * k + [2]
+    return [4] * k + [3]
+
+
+def pesos_newton_cotes(n, h):
+    """
+    Monta o vetor de pesos (n+1 valores) da partição de Newton-Cotes em uma grade
+    uniforme de passo h. Nos pontos de junção entre painéis os pesos se somam.
+    
+    Retorna:
+        (pesos, paineis): array float64 de pesos e lista de painéis usados
+    """
+    paineis = particao_newton_cotes(n)
+    pesos = array('d', bytes(8 * (n + 1)))
+    
+    inicio = 0
+    for tamanho in paineis:
+        _, fator, coeficientes = REGRAS_NEWTON_COTES[tamanho]
+        for j, c in enumerate(coeficientes):
+            pesos[inicio + j] += fator * h * c
+        inicio += tamanho
+    
+    return pesos, paineis
+
+
+def area_newton_cotes(x, y):
+    """
+    Integra dados em grade uniforme combinando Boole, Simpson 3/8 e Simpson 1/3.
+    
+    Qualquer número de intervalos é coberto sem recorrer ao trapézio (exceto n = 1):
+    a partição é escolhida por particao_newton_cotes, os pesos são montados uma vez
+    e a área é um único produto escalar pesos·y (cada ponto é lido uma vez).
+    
+    Parâmetros:
+        x: sequência de posições igualmente espaçadas
+        y: sequência de valores da função
+    
+    Retorna:
+        dicionário com área, número de intervalos, painéis e detalhes
+    """
+    n = len(x) - 1
+    if n < 1:
+        raise ValueError("São necessários pelo menos 2 pontos")
+    if len(y) != n + 1:
+        raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+    
+    h = (x[n] - x[0]) / n
+    if h <= 0:
+        raise ValueError("x deve ser estritamente crescente")
+    
+    limite = TOLERANCIA_UNIFORME * h
+    for i in range(n):
+        if abs(x[i + 1] - x[i] - h) > limite:
+            raise ValueError(
+                f"Newton-Cotes requer espaçamento uniforme (x[{i}] = {x[i]}, x[{i+1}] = {x[i+1]})")
+    
+    pesos, paineis = pesos_newton_cotes(n, h)
+    area = math.fsum(map(mul, pesos, y))
+    
+    contagem = {REGRAS_NEWTON_COTES[t][0]: paineis.count(t) for t in sorted(set(paineis), reverse=True)}
+    descricao = ', '.join(f"{quantidade} x {nome}" for nome, quantidade in contagem.items())
+    
+    return {
+        'area': area,
+        'numero_intervalos': n,
+        'paineis': contagem,
+        'modo': 'newton_cotes',
+        'detalhes': f"Newton-Cotes com h = {h} em {n} intervalos: {descricao}"
+    }
+
+
+def integrar_romberg(f, a, b, tol=1e-10, max_niveis=20, min_niveis=3):
+    """
+    Integra uma função f no intervalo [a, b] pelo método de Romberg.
+    
+    O nível k é o Trapézio com 2^k intervalos. Ao passar de um nível para o
+    seguinte, apenas os novos pontos médios são avaliados:
+        T(k) = T(k-1)/2 + h_k * Σ f(pontos médios novos)
+    e a extrapolação de Richardson R(k, j) = R(k, j-1) + (R(k, j-1) - R(k-1, j-1))/(4^j - 1)
+    é feita guardando apenas a linha anterior da tabela.
+    
+    Parâmetros:
+        f: função de uma variável
+        a, b: limites de integração
+        tol: tolerância para |R(k, k) - R(k-1, k-1)|
+        max_niveis: número máximo de refinamentos
+        min_niveis: número mínimo de refinamentos antes de aceitar a convergência
+    
+    Retorna:
+        dicionário com área, erro estimado, número de avaliações de f e detalhes
+    """
+    if max_niveis < 1:
+        raise ValueError("São necessários pelo menos 1 nível de refinamento")
+    
+    detalhes = []
+    detalhes.append("=== INTEGRAÇÃO DE ROMBERG ===\n")
+    detalhes.append(f"Intervalo: [{a}, {b}]")
+    detalhes.append(f"Tolerância: {tol}\n")
+    
+    h = b - a
+    linha_anterior = [h * (f(a) + f(b)) / 2]
+    avaliacoes = 2
+    detalhes.append(f"Nível 0 (1 intervalo): T = {linha_anterior[0]:.12f}")
+    
+    erro = float('inf')
+    convergiu = False
+    nivel = 0
+    
+    for nivel in range(1, max_niveis + 1):
+        # Novos pontos médios do nível: a + (2i - 1)*h/2
+        novos = 1 << (nivel - 1)
+        h /= 2
+        soma_medios = 0.0
+        for i in range(novos):
+            soma_medios += f(a + (2 * i + 1) * h)
+        avaliacoes += novos
+        
+        linha = [linha_anterior[0] / 2 + h * soma_medios]
+        fator = 1
+        for j in range(1, nivel + 1):
+            fator *= 4
+            linha.append(linha[j - 1] + (linha[j - 1] - linha_anterior[j - 1]) / (fator - 1))
+        
+        erro = abs(linha[nivel] - linha_anterior[nivel - 1])
+        detalhes.append(f"Nível {nivel} ({2 * novos} intervalos): T = {linha[0]:.12f}, "
+                        f"R = {linha[nivel]:.12f}, erro estimado = {erro:.3e}")
+        linha_anterior = linha
+        
+        if nivel >= min_niveis and erro <= tol * max(1.0, abs(linha[nivel])):
+            convergiu = True
+            break
+    
+    area = linha_anterior[-1]
+    
+    detalhes.append("")
+    if convergiu:
+        detalhes.append(f"Convergência atingida no nível {nivel}")
+    else:
+        detalhes.append(f"AVISO: Número máximo de níveis ({max_niveis}) atingido!")
+    detalhes.append(f"Avaliações da função: {avaliacoes}")
+    detalhes.append(f"\n{'='*50}")
+    detalhes.append(f"ÁREA TOTAL (Romberg) = {area}")
+    detalhes.append(f"{'='*50}")
+    
+    return {
+        'area': area,
+        'erro_estimado': erro,
+        'avaliacoes': avaliacoes,
+        'niveis': nivel,
+        'convergiu': convergiu,
+        'detalhes': '\n'.join(detalhes)
+    }
+
+
+def gauss_kronrod_15(f, a, b):
+    """
+    Aplica a regra G7/K15 em [a, b] com as tabelas pré-calculadas.
+    
+    Os 15 valores de f servem às duas regras; a diferença entre elas é a
+    estimativa do erro de K15.
+    
+    Retorna:
+        (integral K15, estimativa de erro)
+    """
+    centro = (a + b) / 2
+    raio = (b - a) / 2
+    valores = [f(centro + raio * no) for no in NOS_GK15]
+    
+    kronrod = 0.0
+    gauss = 0.0
+    for valor, peso_k, peso_g in zip(valores, PESOS_K15, PESOS_G7):
+        kronrod += peso_k * valor
+        gauss += peso_g * valor
+    
+    kronrod *= raio
+    gauss *= raio
+    return kronrod, abs(kronrod - gauss)
+
+
+def integrar_gauss_kronrod(f, a, b, tol=1e-10, max_subintervalos=2000):
+    """
+    Integra f em [a, b] por Gauss-Kronrod G7/K15 adaptativo.
+    
+    Os subintervalos ficam em uma fila de prioridade (heap) ordenada pelo
+    erro estimado; a cada passo o de maior erro é dividido ao meio. Os nós
+    nunca incluem os extremos, o que permite integrandos com singularidade
+    integrável nas pontas (ex.: 1/√x em [0, 1]).
+    
+    Parâmetros:
+        f: função de uma variável
+        a, b: limites de integração
+        tol: tolerância (absoluta, ou relativa à área quando esta for maior que 1)
+        max_subintervalos: número máximo de subintervalos
+    
+    Retorna:
+        dicionário com área, erro estimado, número de avaliações de f e detalhes
+    """
+    detalhes = []
+    detalhes.append("=== GAUSS-KRONROD G7/K15 ADAPTATIVO ===\n")
+    detalhes.append(f"Intervalo: [{a}, {b}]")
+    detalhes.append(f"Tolerância: {tol}\n")
+    
+    area, erro = gauss_kronrod_15(f, a, b)
+    avaliacoes = len(NOS_GK15)
+    
+    # Heap de máximo pelo erro: (-erro, a, b, área)
+    fila = [(-erro, a, b, area)]
+    area_total = area
+    erro_total = erro
+    convergiu = erro_total <= tol * max(1.0, abs(area_total))
+    
+    while not convergiu and len(fila) < max_subintervalos:
+        erro_pai, a_i, b_i, area_pai = heapq.heappop(fila)
+        meio = (a_i + b_i) / 2
+        
+        area_esq, erro_esq = gauss_kronrod_15(f, a_i, meio)
+        area_dir, erro_dir = gauss_kronrod_15(f, meio, b_i)
+        avaliacoes += 2 * len(NOS_GK15)
+        
+        heapq.heappush(fila, (-erro_esq, a_i, meio, area_esq))
+        heapq.heappush(fila, (-erro_dir, meio, b_i, area_dir))
+        
+        area_total += area_esq + area_dir - area_pai
+        erro_total += erro_esq + erro_dir + erro_pai
+        convergiu = erro_total <= tol * max(1.0, abs(area_total))
+    
+    # Soma final exata das contribuições (evita o acúmulo das atualizações)
+    area_total = math.fsum(item[3] for item in fila)
+    erro_total = math.fsum(-item[0] for item in fila)
+    
+    if not math.isfinite(area_total):
+        raise ValueError("A integral não converge (valor não finito)")
+    
+    detalhes.append(f"Subintervalos: {len(fila)}")
+    maiores = heapq.nsmallest(5, fila)
+    detalhes.append("Subintervalos com maior erro estimado:")
+    for erro_i, a_i, b_i, area_i in maiores:
+        detalhes.append(f"  [{a_i:.6g}, {b_i:.6g}]: área = {area_i:.12f}, erro = {-erro_i:.3e}")
+    detalhes.append("")
+    if convergiu:
+        detalhes.append("Convergência atingida")
+    else:
+        detalhes.append(f"AVISO: Número máximo de subintervalos ({max_subintervalos}) atingido!")
+    detalhes.append(f"Avaliações da função: {avaliacoes}")
+    detalhes.append(f"\n{'='*50}")
+    detalhes.append(f"ÁREA TOTAL (Gauss-Kronrod) = {area_total}")
+    detalhes.append(f"{'='*50}")
+    
+    return {
+        'area': area_total,
+        'erro_estimado': erro_total,
+        'avaliacoes': avaliacoes,
+        'subintervalos': len(fila),
+        'convergiu': convergiu,
+        'detalhes': '\n'.join(detalhes)
+    }
+
+
+def resolver_integral_funcao(expressao, a, b, metodo='gauss_kronrod', tol=1e-10):
+    """
+    Integra uma função dada como texto (ex.: "sin(x)*exp(-x/3)") em [a, b].
+    
+    A expressão é compilada uma única vez (e guardada em cache) pelo módulo expressoes.
+    
+    Parâmetros:
+        expressao: texto da função de x
+        a, b: limites de integração
+        metodo: 'romberg' ou 'gauss_kronrod'
+        tol: tolerância
+    
+    Retorna:
+        dicionário com o resultado do método escolhido
+    """
+    f = compilar_expressao(expressao)['funcao']
+    
+    if metodo == 'romberg':
+        resultado = integrar_romberg(f, a, b, tol)
+    elif metodo == 'gauss_kronrod':
+        resultado = integrar_gauss_kronrod(f, a, b, tol)
+    else:
+        return {
+            'sucesso': False,
+            'erro': f'Método desconhecido: {metodo}'
+        }
+    
+    resultado['sucesso'] = True
+    resultado['metodo'] = metodo
+    resultado['expressao'] = expressao
+    return resultado
+
+
+def novo_estado_integracao():
+    """Cria o estado vazio da integração incremental (em blocos)"""
+    return {
+        'numero_pontos': 0,
+        'area_trapezio': 0.0,
+        'area_simpson': 0.0,
+        # Compensações da soma de Neumaier (erro de arredondamento acumulado)
+        'compensacao_trapezio': 0.0,
+        'compensacao_simpson': 0.0,
+        # Último ponto recebido (para o trapézio do próximo intervalo)
+        'x_ant': None,
+        'y_ant': None,
+        # Par de Simpson em aberto: início (x0, y0) e ponto do meio (x1, y1)
+        'x0': None,
+        'y0': None,
+        'x1': None,
+        'y1': None,
+        'pontos_par': 0,
+        # Ponto do meio do último par fechado (antepenúltimo ponto quando
+        # sobra um intervalo sem par, para a parábola final)
+        'x_meio': None,
+        'y_meio': None
+    }
+
+
+def acumular_integracao(estado, x, y):
+    """
+    Acrescenta um bloco de pontos à integração incremental.
+    
+    O trapézio soma cada intervalo assim que ele se fecha. O Simpson 1/3 agrupa
+    os intervalos em pares a partir do primeiro ponto; o par em aberto no fim
+    do bloco fica guardado no estado e é completado pelo bloco seguinte, de modo
+    que o resultado não depende de como os dados foram divididos. Em cada par
+    é usada a fórmula de Simpson para intervalos desiguais (h0 ≠ h1), que se
+    reduz à fórmula usual quando h0 = h1. As duas somas são compensadas
+    (Neumaier), para que séries com centenas de milhões de pontos não percam
+    precisão por arredondamento.
+    
+    Parâmetros:
+        estado: dicionário criado por novo_estado_integracao() (modificado no lugar)
+        x: sequência de posições do bloco
+        y: sequência de valores da função do bloco
+    
+    Retorna:
+        o próprio estado
+    """
+    if len(x) != len(y):
+        raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+    
+    area_trap = estado['area_trapezio']
+    area_simp = estado['area_simpson']
+    comp_trap = estado['compensacao_trapezio']
+    comp_simp = estado['compensacao_simpson']
+    x_ant, y_ant = estado['x_ant'], estado['y_ant']
+    x0, y0, x1, y1 = estado['x0'], estado['y0'], estado['x1'], estado['y1']
+    pontos_par = estado['pontos_par']
+    x_meio, y_meio = estado['x_meio'], estado['y_meio']
+    
+    for xi, yi in zip(x, y):
+        if x_ant is not None:
+            if xi == x_ant:
+                raise ValueError(f"Pontos repetidos em x = {xi}")
+            termo = (xi - x_ant) * (y_ant + yi) / 2
+            t = area_trap + termo
+            if abs(area_trap) >= abs(termo):
+                comp_trap += (area_trap - t) + termo
+            else:
+                comp_trap += (termo - t) + area_trap
+            area_trap = t
+        x_ant, y_ant = xi, yi
+        
+        if pontos_par == 0:
+            x0, y0 = xi, yi
+            pontos_par = 1
+        elif pontos_par == 1:
+            x1, y1 = xi, yi
+            pontos_par = 2
+        else:
+            h0 = x1 - x0
+            h1 = xi - x1
+            termo = (h0 + h1) / 6 * (
+                (2 - h1 / h0) * y0
+                + (h0 + h1) ** 2 / (h0 * h1) * y1
+                + (2 - h0 / h1) * yi
+            )
+            t = area_simp + termo
+            if abs(area_simp) >= abs(termo):
+                comp_simp += (area_simp - t) + termo
+            else:
+                comp_simp += (termo - t) + area_simp
+            area_simp = t
+            x_meio, y_meio = x1, y1
+            x0, y0 = xi, yi
+            pontos_par = 1
+    
+    estado['numero_pontos'] += len(x)
+    estado['area_trapezio'] = area_trap
+    estado['area_simpson'] = area_simp
+    estado['compensacao_trapezio'] = comp_trap
+    estado['compensacao_simpson'] = comp_simp
+    estado['x_ant'], estado['y_ant'] = x_ant, y_ant
+    estado['x0'], estado['y0'], estado['x1'], estado['y1'] = x0, y0, x1, y1
+    estado['pontos_par'] = pontos_par
+    estado['x_meio'], estado['y_meio'] = x_meio, y_meio
+    
+    return estado
+
+
+def finalizar_integracao(estado):
+    """
+    Conclui a integração incremental.
+    
+    Como em area_simpson_hibrido e area_simpson_nao_uniforme, se o número de
+    intervalos for ímpar o último intervalo (que ficou sem par) é integrado
+    pela parábola que passa pelos três últimos pontos (com um único
+    intervalo, pelo trapézio).
+    
+    Retorna:
+        dicionário no formato de resolver_integracao (sem os detalhes por ponto)
+    """
+    numero_pontos = estado['numero_pontos']
+    if numero_pontos < 2:
+        return {
+            'sucesso': False,
+            'erro': 'São necessários pelo menos 2 pontos'
+        }
+    
+    n = numero_pontos - 1
+    area_simpson = estado['area_simpson'] + estado['compensacao_simpson']
+    
+    if n == 1:
+        area_simpson += (estado['x1'] - estado['x0']) * (estado['y0'] + estado['y1']) / 2
+        modo = 'trapezio'
+    elif estado['pontos_par'] == 2:
+        area_simpson += area_parabola_ultimo_intervalo(
+            estado['x_meio'], estado['x0'], estado['x1'],
+            estado['y_meio'], estado['y0'], estado['y1']
+        )
+        modo = 'simpson_generalizado_ultimo_intervalo'
+    else:
+        modo = 'simpson_generalizado'
+    
+    return {
+        'sucesso': True,
+        'resultados': {
+            'trapezio': {
+                'area': estado['area_trapezio'] + estado['compensacao_trapezio'],
+                'numero_intervalos': n
+            },
+            'simpson': {
+                'area': area_simpson,
+                'numero_intervalos': n,
+                'modo': modo
+            }
+        },
+        'numero_pontos': numero_pontos
+    }
+
+
+def resolver_integracao_blocos(blocos):
+    """
+    Integra dados recebidos em blocos (x, y) sem manter a série em memória.
+    
+    Parâmetros:
+        blocos: iterável de tuplas (x, y) com os pontos em ordem
+    
+    Retorna:
+        dicionário com as áreas pelo trapézio e pelo Simpson (híbrido)
+    """
+    estado = novo_estado_integracao()
+    for x, y in blocos:
+        acumular_integracao(estado, x, y)
+    return finalizar_integracao(estado)
+
+
+def integrar_arquivo(caminho, tipo=TIPO_BINARIO):
+    """
+    Integra uma série guardada em arquivo sem carregá-la na memória.
+    
+    Parâmetros:
+        caminho: caminho do arquivo
+        tipo: 'application/octet-stream' (pares x, y em float64 little-endian,
+              lidos por mmap) ou 'text/csv' (uma linha x,y por ponto)
+    
+    Retorna:
+        dicionário no formato de resolver_integracao_blocos
+    """
+    if tipo == TIPO_BINARIO:
+        return resolver_integracao_blocos(ler_blocos_mapeados(caminho))
+    if tipo == TIPO_CSV:
+        with open(caminho, 'rb') as arquivo:
+            return resolver_integracao_blocos(ler_blocos_csv(arquivo))
+    raise ValueError(f"Tipo de arquivo não suportado: {tipo}")
+
+
+def resumo_pontos(x, y):
+    """Descrição curta de uma série grande (no lugar de repetir todos os pontos)"""
+    return (f"Pontos: {len(x)} amostras, x de {x[0]} a {x[-1]}, "
+            f"y de {min(y)} a {max(y)}")
+
+
 def resolver_integracao(x, y, metodo='trapezio'):
     """
     Resolve o problema de integração numérica usando o método escolhido.
@@ -267,6 +994,30 @@ def resolver_integracao(x, y, metodo='trapezio'):
     
     resultados = {}
     
+    if len(x) > LIMITE_DETALHES:
+        # Muitos pontos: núcleos de uma passagem, sem o passo a passo
+        resultado_trap = area_trapezio_rapida(x, y)
+        resultado_trap['detalhes'] = f"Trapézio com soma compensada em {resultado_trap['numero_intervalos']} intervalos"
+        resultado_simpson = area_simpson_nao_uniforme(x, y)
+        resultado_simpson['detalhes'] = f"Simpson 1/3 generalizado com soma compensada em {resultado_simpson['numero_intervalos']} intervalos"
+        resultados = {
+            'trapezio': resultado_trap,
+            'simpson': resultado_simpson
+        }
+        
+        # Boole + Simpson 3/8 + Simpson 1/3, apenas para grade uniforme
+        try:
+            resultados['newton_cotes'] = area_newton_cotes(x, y)
+        except ValueError:
+            pass
+        
+        return {
+            'sucesso': True,
+            'resultados': resultados,
+            'numero_pontos': len(x),
+            'sistema_original': resumo_pontos(x, y)
+        }
+    
     try:
         # Sempre calcular trapézio (sempre aplicável)
         resultado_trap = area_trapezio(x, y)
@@ -280,7 +1031,7 @@ def resolver_integracao(x, y, metodo='trapezio'):
     
     try:
         # Calcular Simpson com híbrido (aplicável sempre)
-        resultado_simpson = area_simpson_com_trapezio(x, y)
+        resultado_simpson = area_simpson_hibrido(x, y)
         resultados['simpson'] = resultado_simpson
     except Exception as e:
         resultados['simpson'] = {
@@ -289,6 +1040,16 @@ def resolver_integracao(x, y, metodo='trapezio'):
             'erro': True
         }
     
+    try:
+        # Newton-Cotes de ordem máxima (Boole + Simpson 3/8 + Simpson 1/3)
+        resultados['newton_cotes'] = area_newton_cotes(x, y)
+    except Exception as e:
+        resultados['newton_cotes'] = {
+            'area': None,
+            'detalhes': f"Newton-Cotes não aplicado: {str(e)}",
+            'erro': True
+        }
+    
     return {
         'sucesso': True,
         'resultados': resultados,
@@ -0,0 +1,277 @@
+"""
+Módulo: Interpolação
+Spline cúbica (natural ou fixada) construída em O(n) pelo algoritmo de Thomas
+e polinômio interpolador de Newton (diferenças divididas), com avaliação em
+lote por busca binária + Horner
+"""
+
+from array import array
+from bisect import bisect_right
+
+# Número máximo de pontos avaliados em uma única requisição
+MAXIMO_PONTOS_INTERPOLACAO = 5000000
+
+# Acima deste número de nós o polinômio de Newton oscila demais (fenômeno de Runge)
+MAXIMO_NOS_NEWTON = 50
+
+METODOS_INTERPOLACAO = ('spline_natural', 'spline_fixada', 'newton')
+
+
+def algoritmo_thomas(inferior, diagonal, superior, termos):
+    """
+    Resolve um sistema tridiagonal em O(n) (eliminação de Gauss sem pivoteamento).
+    
+    Parâmetros:
+        inferior: subdiagonal (inferior[0] não é usado)
+        diagonal: diagonal principal
+        superior: superdiagonal (superior[n-1] não é usado)
+        termos: vetor independente
+    
+    Retorna:
+        array com a solução
+    """
+    n = len(diagonal)
+    c = array('d', bytes(8 * n))
+    d = array('d', bytes(8 * n))
+    
+    if diagonal[0] == 0:
+        raise ValueError("Pivô nulo no algoritmo de Thomas")
+    c[0] = superior[0] / diagonal[0]
+    d[0] = termos[0] / diagonal[0]
+    
+    for i in range(1, n):
+        denominador = diagonal[i] - inferior[i] * c[i - 1]
+        if denominador == 0:
+            raise ValueError("Pivô nulo no algoritmo de Thomas")
+        c[i] = superior[i] / denominador if i < n - 1 else 0.0
+        d[i] = (termos[i] - inferior[i] * d[i - 1]) / denominador
+    
+    solucao = d
+    for i in range(n - 2, -1, -1):
+        solucao[i] -= c[i] * solucao[i + 1]
+    
+    return solucao
+
+
+def validar_nos(x, y, minimo):
+    """Confere tamanhos e ordem estritamente crescente dos nós; devolve arrays float64"""
+    x = array('d', x)
+    y = array('d', y)
+    
+    if len(x) != len(y):
+        raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+    if len(x) < minimo:
+        raise ValueError(f"São necessários pelo menos {minimo} pontos")
+    for i in range(len(x) - 1):
+        if x[i + 1] <= x[i]:
+            raise ValueError(f"x deve ser estritamente crescente (x[{i}] = {x[i]}, x[{i+1}] = {x[i+1]})")
+    
+    return x, y
+
+
+def spline_cubica(x, y, contorno='natural', derivada_inicio=0.0, derivada_fim=0.0):
+    """
+    Constrói a spline cúbica interpolante.
+    
+    As segundas derivadas M nos nós saem do sistema tridiagonal
+        h[i-1]*M[i-1] + 2*(h[i-1] + h[i])*M[i] + h[i]*M[i+1] = 6*(d[i] - d[i-1])
+    com d[i] = (y[i+1] - y[i]) / h[i], resolvido pelo algoritmo de Thomas.
+    Em cada intervalo o polinômio é guardado na forma de Horner em t = x - x[i]:
+        S(t) = y[i] + t*(b[i] + t*(c[i] + t*e[i]))
+    
+    Parâmetros:
+        x, y: nós (x estritamente crescente)
+        contorno: 'natural' (S'' = 0 nas pontas) ou 'fixada' (S' dado nas pontas)
+        derivada_inicio, derivada_fim: S'(x[0]) e S'(x[n]) para a spline fixada
+    
+    Retorna:
+        dicionário com nós e coeficientes por intervalo
+    """
+    x, y = validar_nos(x, y, 2)
+    n = len(x) - 1
+    
+    h = array('d', (x[i + 1] - x[i] for i in range(n)))
+    inclinacoes = array('d', ((y[i + 1] - y[i]) / h[i] for i in range(n)))
+    
+    inferior = array('d', bytes(8 * (n + 1)))
+    diagonal = array('d', bytes(8 * (n + 1)))
+    superior = array('d', bytes(8 * (n + 1)))
+    termos = array('d', bytes(8 * (n + 1)))
+    
+    for i in range(1, n):
+        inferior[i] = h[i - 1]
+        diagonal[i] = 2 * (h[i - 1] + h[i])
+        superior[i] = h[i]
+        termos[i] = 6 * (inclinacoes[i] - inclinacoes[i - 1])
+    
+    if contorno == 'natural':
+        diagonal[0] = diagonal[n] = 1.0
+    elif contorno == 'fixada':
+        diagonal[0] = 2 * h[0]
+        superior[0] = h[0]
+        termos[0] = 6 * (inclinacoes[0] - derivada_inicio)
+        inferior[n] = h[n - 1]
+        diagonal[n] = 2 * h[n - 1]
+        termos[n] = 6 * (derivada_fim - inclinacoes[n - 1])
+    else:
+        raise ValueError(f"Contorno desconhecido: {contorno}")
+    
+    M = algoritmo_thomas(inferior, diagonal, superior, termos)
+    
+    b = array('d', (inclinacoes[i] - h[i] * (2 * M[i] + M[i + 1]) / 6 for i in range(n)))
+    c = array('d', (M[i] / 2 for i in range(n)))
+    e = array('d', ((M[i + 1] - M[i]) / (6 * h[i]) for i in range(n)))
+    
+    return {
+        'tipo': 'spline',
+        'contorno': contorno,
+        'x': x,
+        'y': y,
+        'b': b,
+        'c': c,
+        'e': e,
+        'segundas_derivadas': M
+    }
+
+
+def avaliar_spline(spline, pontos):
+    """
+    Avalia a spline em muitos pontos: busca binária do intervalo + Horner.
+    
+    Custo O(M log n) para M pontos. Fora de [x[0], x[n]] a spline é estendida
+    pelo polinômio do intervalo da ponta.
+    
+    Retorna:
+        lista com os valores
+    """
+    x, y = spline['x'], spline['y']
+    b, c, e = spline['b'], spline['c'], spline['e']
+    n = len(x) - 1
+    resultado = []
+    anexar = resultado.append
+    
+    for p in pontos:
+        i = bisect_right(x, p, 1, n) - 1
+        t = p - x[i]
+        anexar(y[i] + t * (b[i] + t * (c[i] + t * e[i])))
+    
+    return resultado
+
+
+def diferencas_divididas(x, y):
+    """
+    Coeficientes do polinômio de Newton pela tabela de diferenças divididas.
+    
+    A tabela é calculada no próprio vetor, coluna a coluna, em O(n²):
+        coef[k] = f[x0, x1, ..., xk]
+    
+    Retorna:
+        dicionário com os nós e os coeficientes
+    """
+    x, y = validar_nos(x, y, 1)
+    n = len(x)
+    if n > MAXIMO_NOS_NEWTON:
+        raise ValueError(f"Polinômio de Newton limitado a {MAXIMO_NOS_NEWTON} nós (use a spline)")
+    
+    coeficientes = array('d', y)
+    for ordem in range(1, n):
+        for i in range(n - 1, ordem - 1, -1):
+            coeficientes[i] = (coeficientes[i] - coeficientes[i - 1]) / (x[i] - x[i - ordem])
+    
+    return {
+        'tipo': 'newton',
+        'x': x,
+        'y': y,
+        'coeficientes': coeficientes
+    }
+
+
+def avaliar_newton(polinomio, pontos):
+    """
+    Avalia o polinômio de Newton em muitos pontos pelo esquema de Horner aninhado:
+        P(t) = c0 + (t - x0)*(c1 + (t - x1)*(c2 + ...))
+    
+    Retorna:
+        lista com os valores
+    """
+    x = polinomio['x']
+    coeficientes = polinomio['coeficientes']
+    n = len(coeficientes)
+    ultimo = coeficientes[n - 1]
+    pares = [(coeficientes[k], x[k]) for k in range(n - 2, -1, -1)]
+    resultado = []
+    anexar = resultado.append
+    
+    for p in pontos:
+        valor = ultimo
+        for ck, xk in pares:
+            valor = valor * (p - xk) + ck
+        anexar(valor)
+    
+    return resultado
+
+
+def formatar_newton(polinomio):
+    """Escreve o polinômio de Newton: P(x) = c0 + c1(x - x0) + c2(x - x0)(x - x1) + ..."""
+    x = polinomio['x']
+    termos = []
+    fatores = ''
+    for k, ck in enumerate(polinomio['coeficientes']):
+        termos.append(f"{ck:.6f}{fatores}")
+        fatores += f"(x - {x[k]:g})"
+    return "P(x) = " + " + ".join(termos)
+
+
+def resolver_interpolacao(x, y, metodo='spline_natural', pontos=None, grade=None,
+                          derivada_inicio=0.0, derivada_fim=0.0):
+    """
+    Resolve a interpolação dos pontos (x, y) e a avalia nos pontos pedidos.
+    
+    Parâmetros:
+        x, y: nós (x estritamente crescente)
+        metodo: 'spline_natural', 'spline_fixada' ou 'newton'
+        pontos: lista de valores onde avaliar
+        grade: dicionário {'inicio', 'passo', 'quantidade'} (alternativa a pontos)
+        derivada_inicio, derivada_fim: derivadas nas pontas (spline fixada)
+    
+    Retorna:
+        dicionário com os valores interpolados e a descrição do interpolador
+    """
+    if grade is not None:
+        inicio = float(grade['inicio'])
+        passo = float(grade['passo'])
+        quantidade = int(grade['quantidade'])
+        if quantidade > MAXIMO_PONTOS_INTERPOLACAO:
+            raise ValueError(f"Máximo de {MAXIMO_PONTOS_INTERPOLACAO} pontos por interpolação")
+        pontos = [inicio + i * passo for i in range(quantidade)]
+    elif pontos is None:
+        pontos = []
+    elif len(pontos) > MAXIMO_PONTOS_INTERPOLACAO:
+        raise ValueError(f"Máximo de {MAXIMO_PONTOS_INTERPOLACAO} pontos por interpolação")
+    
+    if metodo == 'newton':
+        polinomio = diferencas_divididas(x, y)
+        valores = avaliar_newton(polinomio, pontos)
+        descricao = {
+            'coeficientes': list(polinomio['coeficientes']),
+            'equacao': formatar_newton(polinomio),
+            'grau': len(polinomio['coeficientes']) - 1
+        }
+    elif metodo in ('spline_natural', 'spline_fixada'):
+        contorno = 'natural' if metodo == 'spline_natural' else 'fixada'
+        spline = spline_cubica(x, y, contorno, derivada_inicio, derivada_fim)
+        valores = avaliar_spline(spline, pontos)
+        descricao = {
+            'contorno': contorno,
+            'numero_intervalos': len(spline['b']),
+            'segundas_derivadas': list(spline['segundas_derivadas'])
+        }
+    else:
+        raise ValueError(f"Método desconhecido: {metodo}")
+    
+    return {
+        'metodo': metodo,
+        'interpolador': descricao,
+        'valores': valores,
+        'numero_pontos': len(valores)
+    }
@@ -0,0 +1,275 @@
+"""
+Módulo: Lei de Moore
+Ajuste de N = 10^(a + b*ano) aos dados históricos e previsão em lote
+para modelos ajustados pelos mínimos quadrados
+"""
+
+import base64
+import math
+import sys
+from array import array
+
+from minimos_quadrados import (
+    FAMILIAS_LOG, FAMILIAS_MODELOS, LN10, LN2, acumular_somas, ajustar_familias,
+    coeficiente_a, exp_lote, formatar_equacao, logaritmo_base10, logaritmo_natural,
+    novas_somas, potencia_base10
+)
+
+# Número máximo de pontos aceitos em uma única previsão
+MAXIMO_PONTOS_PREVISAO = 5000000
+
+# Na grade regular, 10^(a + b*x) é obtido por multiplicações sucessivas pela
+# razão 10^(b*passo); a cada BLOCO_REANCORAGEM pontos o valor é recalculado
+# diretamente para que o erro de arredondamento não se acumule
+BLOCO_REANCORAGEM = 256
+
+# Formatos de saída das previsões
+FORMATOS_PREVISAO = ('json', 'binario')
+
+
+def validar_formato(formato):
+    """Verifica o formato de saída das previsões (antes de qualquer cálculo)"""
+    if formato not in FORMATOS_PREVISAO:
+        raise ValueError(f"Formato desconhecido: {formato}")
+
+
+def ajustar_lei_moore(anos, transistores):
+    """
+    Ajusta a Lei de Moore log10(N) = a + b*ano por mínimos quadrados.
+    
+    Parâmetros:
+        anos: lista de anos
+        transistores: lista com o número de transistores (positivos)
+    
+    Retorna:
+        dicionário com coeficientes, equação e tempo de duplicação (anos)
+    """
+    for i, valor in enumerate(transistores):
+        if valor <= 0:
+            raise ValueError(f"N[{i}] = {valor} não é positivo")
+    
+    somas = acumular_somas(novas_somas(), anos, transistores)
+    coeficientes = ajustar_familias(somas)
+    
+    if 'exponencial_base10' not in coeficientes:
+        raise ValueError("Não foi possível ajustar a Lei de Moore (anos repetidos?)")
+    
+    a, b = coeficientes['exponencial_base10']
+    
+    return {
+        'familia': 'exponencial_base10',
+        'coeficientes': [a, b],
+        'equacao': formatar_equacao('exponencial_base10', (a, b)),
+        'tempo_duplicacao': tempo_duplicacao('exponencial_base10', [a, b])
+    }
+
+
+def tempo_duplicacao(familia, coeficientes):
+    """
+    Tempo para o valor previsto dobrar (constante apenas nos modelos exponenciais).
+    
+    Retorna:
+        tempo de duplicação, ou None se não for constante ou se b = 0
+    """
+    b = coeficientes[1]
+    if b == 0:
+        return None
+    if familia == 'exponencial_base10':
+        return logaritmo_base10(2.0) / b
+    if familia == 'exponencial':
+        return LN2 / b
+    return None
+
+
+def horner_lote(coeficientes, pontos):
+    """
+    Avalia o polinômio c0 + c1*x + ... + cn*x^n em cada ponto pelo método de Horner.
+    
+    Parâmetros:
+        coeficientes: [c0, c1, ..., cn] (grau crescente)
+        pontos: sequência de valores x
+    
+    Retorna:
+        lista com os valores do polinômio
+    """
+    grau = len(coeficientes) - 1
+    
+    if grau == 0:
+        return [coeficientes[0]] * len(pontos)
+    if grau == 1:
+        c0, c1 = coeficientes
+        return [c0 + c1 * x for x in pontos]
+    if grau == 2:
+        c0, c1, c2 = coeficientes
+        return [c0 + (c1 + c2 * x) * x for x in pontos]
+    
+    invertidos = coeficientes[::-1]
+    resultado = []
+    for x in pontos:
+        acumulado = invertidos[0]
+        for c in invertidos[1:]:
+            acumulado = acumulado * x + c
+        resultado.append(acumulado)
+    return resultado
+
+
+def potencia_base10_grade(a, b, inicio, passo, quantidade):
+    """
+    Calcula 10^(a + b*x) na grade regular x = inicio + i*passo.
+    
+    Cada valor é o anterior multiplicado pela razão constante 10^(b*passo);
+    a cada BLOCO_REANCORAGEM pontos o valor é recalculado diretamente.
+    
+    Retorna:
+        lista com os valores
+    """
+    razao = potencia_base10(b * passo)
+    resultado = []
+    anexar = resultado.append
+    
+    for bloco in range(0, quantidade, BLOCO_REANCORAGEM):
+        valor = potencia_base10(a + b * (inicio + bloco * passo))
+        for _ in range(min(BLOCO_REANCORAGEM, quantidade - bloco)):
+            anexar(valor)
+            valor *= razao
+    
+    return resultado
+
+
+def prever_lote(familia, coeficientes, pontos):
+    """
+    Avalia um modelo ajustado em muitos pontos de uma vez.
+    
+    Parâmetros:
+        familia: nome da família (chave de FAMILIAS_MODELOS)
+        coeficientes: lista de coeficientes [a, b] ou [a, b, c], com
+                      [ln(a), b] nas famílias de FAMILIAS_LOG
+        pontos: sequência de valores x
+    
+    Retorna:
+        lista com os valores previstos
+    """
+    if familia not in FAMILIAS_MODELOS:
+        raise ValueError(f"Família desconhecida: {familia}")
+    
+    esperado = FAMILIAS_MODELOS[familia]['parametros']
+    if len(coeficientes) != esperado:
+        raise ValueError(f"A família {familia} requer {esperado} coeficientes")
+    
+    a, b = coeficientes[0], coeficientes[1]
+    
+    if familia in ('linear', 'parabolica'):
+        return horner_lote(list(coeficientes), pontos)
+    
+    if familia == 'exponencial_base10':
+        return exp_lote(horner_lote([a * LN10, b * LN10], pontos))
+    
+    if familia == 'exponencial':
+        return exp_lote(horner_lote([a, b], pontos))
+    
+    if familia == 'reciproca':
+        return [a + b / x for x in pontos]
+    
+    # Famílias em ln(x): potência e logarítmica
+    ln_x = []
+    for x in pontos:
+        if x <= 0:
+            raise ValueError(f"A família {familia} requer x > 0 (x = {x})")
+        ln_x.append(logaritmo_natural(x))
+    
+    if familia == 'logaritmica':
+        return horner_lote([a, b], ln_x)
+    return exp_lote(horner_lote([a, b], ln_x))
+
+
+def codificar_float64(valores):
+    """Codifica uma sequência de floats como base64 de float64 little-endian"""
+    dados = array('d', valores)
+    if sys.byteorder == 'big':
+        dados.byteswap()
+    return base64.b64encode(dados.tobytes()).decode('ascii')
+
+
+def resolver_previsao(modelo, pontos=None, grade=None, formato='json'):
+    """
+    Resolve a previsão em lote de um modelo ajustado.
+    
+    Parâmetros:
+        modelo: dicionário com 'familia' e 'coeficientes' [a, b, ...]; nas
+                famílias de FAMILIAS_LOG pode trazer 'ln_a' no lugar de a
+                (como na saída da seleção de modelos)
+        pontos: lista de valores x (ou None se for usada uma grade)
+        grade: dicionário {'inicio', 'passo', 'quantidade'} para x regularmente espaçado
+        formato: 'json' (listas) ou 'binario' (base64 de float64 little-endian)
+    
+    Retorna:
+        dicionário com previsões, tempo de duplicação e equação; previsões fora
+        do intervalo de float vêm null no JSON (IEEE no binário) e são contadas
+        em 'previsoes_nao_finitas'
+    """
+    validar_formato(formato)
+    familia = modelo['familia']
+    
+    # Internamente as famílias em ln(y) usam ln(a); com 'ln_a' informado,
+    # o a de 'coeficientes' é ignorado (pode vir null)
+    if familia in FAMILIAS_LOG and modelo.get('ln_a') is not None:
+        internos = [float(modelo['ln_a'])] + [float(c) for c in modelo['coeficientes'][1:]]
+    else:
+        internos = [float(c) for c in modelo['coeficientes']]
+        if familia in FAMILIAS_LOG:
+            if not internos or internos[0] <= 0:
+                raise ValueError(f"A família {familia} requer a > 0 ou 'ln_a'")
+            internos[0] = logaritmo_natural(internos[0])
+    
+    coeficientes = list(internos)
+    if familia in FAMILIAS_LOG:
+        coeficientes[0] = coeficiente_a(familia, internos)
+    
+    if (pontos is None) == (grade is None):
+        raise ValueError("Informe 'pontos' ou 'grade' (apenas um deles)")
+    
+    if grade is not None:
+        inicio = float(grade['inicio'])
+        passo = float(grade['passo'])
+        quantidade = int(grade['quantidade'])
+        if quantidade < 1:
+            raise ValueError("A grade deve ter pelo menos 1 ponto")
+    else:
+        quantidade = len(pontos)
+    
+    if quantidade > MAXIMO_PONTOS_PREVISAO:
+        raise ValueError(f"Máximo de {MAXIMO_PONTOS_PREVISAO} pontos por previsão")
+    
+    if grade is not None and familia == 'exponencial_base10':
+        previsoes = potencia_base10_grade(coeficientes[0], coeficientes[1], inicio, passo, quantidade)
+    else:
+        if grade is not None:
+            pontos = [inicio + i * passo for i in range(quantidade)]
+        previsoes = prever_lote(familia, internos, pontos)
+    
+    # Infinity e NaN não são JSON válido: contados aqui e devolvidos como null
+    nao_finitas = 0
+    if not all(map(math.isfinite, previsoes)):
+        nao_finitas = sum(1 for valor in previsoes if not math.isfinite(valor))
+    
+    duplicacao = tempo_duplicacao(familia, coeficientes)
+    resultado = {
+        'familia': familia,
+        'coeficientes': coeficientes,
+        'equacao': formatar_equacao(familia, internos),
+        'tempo_duplicacao': duplicacao if duplicacao is None or math.isfinite(duplicacao) else None,
+        'numero_pontos': quantidade,
+        'previsoes_nao_finitas': nao_finitas,
+        'formato': formato
+    }
+    if familia in FAMILIAS_LOG:
+        resultado['ln_a'] = internos[0]
+    
+    if formato == 'binario':
+        resultado['previsoes'] = codificar_float64(previsoes)
+    elif nao_finitas:
+        resultado['previsoes'] = [valor if math.isfinite(valor) else None for valor in previsoes]
+    else:
+        resultado['previsoes'] = previsoes
+    
+    return resultado
@@ -0,0 +1,179 @@
+"""
+Módulo: Leitura de Dados em Blocos
+Lê colunas (x, y) enviadas como CSV ou como float64 little-endian bruto,
+de forma incremental, para que a memória usada não dependa do tamanho do envio
+"""
+
+import mmap
+import sys
+from array import array
+
+# Quantidade de bytes lidos do fluxo por vez
+TAMANHO_LEITURA = 1 << 20
+
+# Bytes de um registro binário (x, y) em float64
+BYTES_REGISTRO = 16
+
+TIPO_CSV = 'text/csv'
+TIPO_BINARIO = 'application/octet-stream'
+
+
+def ler_blocos_csv(fluxo, tamanho_leitura=TAMANHO_LEITURA):
+    """
+    Lê pares (x, y) de um fluxo CSV, bloco a bloco.
+    
+    Cada linha deve conter dois números separados por vírgula, ponto e vírgula
+    ou espaço. Uma linha de cabeçalho não numérica no início é ignorada.
+    
+    Parâmetros:
+        fluxo: objeto com read(tamanho) que devolve bytes
+        tamanho_leitura: bytes lidos por vez
+    
+    Gera:
+        tuplas (x, y) de arrays float64 com os pontos de cada bloco
+    """
+    resto = b''
+    numero_linha = 0
+    
+    while True:
+        dados = fluxo.read(tamanho_leitura)
+        fim = not dados
+        
+        if fim:
+            if not resto.strip():
+                return
+            linhas = [resto]
+            resto = b''
+        else:
+            dados = resto + dados
+            corte = dados.rfind(b'\n')
+            if corte < 0:
+                resto = dados
+                continue
+            linhas = dados[:corte].split(b'\n')
+            resto = dados[corte + 1:]
+        
+        x = array('d')
+        y = array('d')
+        
+        for linha in linhas:
+            numero_linha += 1
+            campos = linha.replace(b';', b',').replace(b',', b' ').split()
+            if not campos:
+                continue
+            if len(campos) != 2:
+                raise ValueError(f"Linha {numero_linha}: esperados 2 valores (x, y)")
+            try:
+                x.append(float(campos[0]))
+                y.append(float(campos[1]))
+            except ValueError:
+                if numero_linha == 1:
+                    continue
+                raise ValueError(f"Linha {numero_linha}: valor numérico inválido")
+        
+        if x:
+            yield x, y
+        
+        if fim:
+            return
+
+
+def ler_blocos_float64(fluxo, tamanho_leitura=TAMANHO_LEITURA):
+    """
+    Lê pares (x, y) de um fluxo binário de float64 little-endian, bloco a bloco.
+    
+    O fluxo contém registros x0 y0 x1 y1 ... (16 bytes por ponto).
+    
+    Parâmetros:
+        fluxo: objeto com read(tamanho) que devolve bytes
+        tamanho_leitura: bytes lidos por vez (arredondado para registros inteiros)
+    
+    Gera:
+        tuplas (x, y) de arrays float64 com os pontos de cada bloco
+    """
+    tamanho_leitura = max(BYTES_REGISTRO, tamanho_leitura - tamanho_leitura % BYTES_REGISTRO)
+    resto = b''
+    
+    while True:
+        dados = fluxo.read(tamanho_leitura)
+        if not dados:
+            break
+        
+        dados = resto + dados
+        completos = len(dados) - len(dados) % BYTES_REGISTRO
+        resto = dados[completos:]
+        if not completos:
+            continue
+        
+        valores = array('d')
+        valores.frombytes(dados[:completos])
+        if sys.byteorder == 'big':
+            valores.byteswap()
+        
+        yield valores[0::2], valores[1::2]
+    
+    if resto:
+        raise ValueError(f"Envio binário truncado: {len(resto)} bytes sobrando (esperados registros de 16 bytes)")
+
+
+def ler_blocos_mapeados(caminho, pontos_por_bloco=TAMANHO_LEITURA // BYTES_REGISTRO):
+    """
+    Lê pares (x, y) de um arquivo float64 little-endian (x0 y0 x1 y1 ...) mapeado em memória.
+    
+    Os blocos são vistas (memoryview) diretamente sobre o mapa, sem cópia; as
+    páginas de cada bloco são devolvidas ao sistema depois de consumidas, para
+    que a memória residente não cresça com o tamanho do arquivo.
+    
+    Parâmetros:
+        caminho: caminho do arquivo
+        pontos_por_bloco: número de pontos (x, y) por bloco
+    
+    Gera:
+        tuplas (x, y) de sequências float64 com os pontos de cada bloco
+    """
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(0, 2)
+        tamanho = arquivo.tell()
+        if tamanho % BYTES_REGISTRO:
+            raise ValueError(f"Arquivo truncado: {tamanho % BYTES_REGISTRO} bytes sobrando (esperados registros de 16 bytes)")
+        if tamanho == 0:
+            return
+        
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            liberar = hasattr(mapa, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+            bytes_bloco = pontos_por_bloco * BYTES_REGISTRO
+            
+            for inicio in range(0, tamanho, bytes_bloco):
+                fim = min(inicio + bytes_bloco, tamanho)
+                if sys.byteorder == 'big':
+                    valores = array('d', mapa[inicio:fim])
+                    valores.byteswap()
+                    yield valores[0::2], valores[1::2]
+                else:
+                    # As vistas são liberadas explicitamente: o mapa só pode ser
+                    # fechado quando nenhuma vista sobre ele estiver ativa
+                    with memoryview(mapa)[inicio:fim] as visao, visao.cast('d') as valores, \
+                            valores[0::2] as x, valores[1::2] as y:
+                        yield x, y
+                
+                if liberar:
+                    alinhado = inicio - inicio % mmap.PAGESIZE
+                    mapa.madvise(mmap.MADV_DONTNEED, alinhado, fim - alinhado)
+
+
+def ler_blocos(fluxo, tipo_conteudo, tamanho_leitura=TAMANHO_LEITURA):
+    """
+    Escolhe o leitor de blocos adequado ao tipo de conteúdo do envio.
+    
+    Parâmetros:
+        fluxo: objeto com read(tamanho) que devolve bytes
+        tipo_conteudo: 'text/csv' ou 'application/octet-stream'
+    
+    Retorna:
+        gerador de tuplas (x, y)
+    """
+    if tipo_conteudo == TIPO_CSV:
+        return ler_blocos_csv(fluxo, tamanho_leitura)
+    if tipo_conteudo == TIPO_BINARIO:
+        return ler_blocos_float64(fluxo, tamanho_leitura)
+    raise ValueError(f"Tipo de conteúdo não suportado: {tipo_conteudo}")
@@ -0,0 +1,325 @@
+"""
+Módulo: Processamento em Lote
+Executa uma lista de problemas de tipos variados (minas, Wheatstone,
+regressões, integração, ...) em uma única requisição, distribuindo blocos de
+itens por um pool de processos, com erro individual por item
+"""
+
+import atexit
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from metodos_diretos import resolver_problema_minas
+from metodos_iterativos import resolver_ponte_wheatstone
+from minimos_quadrados import resolver_regressoes
+from integracao_numerica import resolver_integracao, resolver_integral_funcao
+from interpolacao import resolver_interpolacao
+from edo import MAXIMO_PASSOS_RK45, resolver_edo
+from tarefas import executar_sistema, executar_sistema_iterativo
+from metricas import medidas_iterativo, medidas_minas, medidas_sistema, medidas_wheatstone, registrar_chamada
+
+# Configuração (pode ser alterada por variáveis de ambiente)
+NUMERO_PROCESSOS_LOTE = int(os.environ.get('LOTE_PROCESSOS', os.cpu_count() or 1))
+MAXIMO_ITENS_LOTE = int(os.environ.get('LOTE_MAXIMO_ITENS', 1000))
+
+# Lotes com até este número de itens são resolvidos no próprio processo
+LIMITE_SEQUENCIAL = 16
+
+# Itens por bloco enviado ao pool (divide o custo de comunicação entre processos)
+MAXIMO_ITENS_POR_BLOCO = 32
+
+POOL = {'executor': None}
+
+
+def lista_numeros(valor):
+    """Aceita números separados por vírgula ("1, 2, 3") ou uma lista JSON"""
+    if isinstance(valor, str):
+        return [float(val.strip()) for val in valor.split(',')]
+    return [float(val) for val in valor]
+
+
+def pares_xy(dados, minimo=2):
+    """Lê x_valores e y_valores e confere os tamanhos"""
+    x_dados = lista_numeros(dados['x_valores'])
+    y_dados = lista_numeros(dados['y_valores'])
+    
+    if len(x_dados) != len(y_dados):
+        raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+    
+    if len(x_dados) < minimo:
+        raise ValueError(f"São necessários pelo menos {minimo} pontos")
+    
+    return x_dados, y_dados
+
+
+def executar_minas(dados):
+    """Problema das minas (mesmos dados de /calcular_minas)"""
+    composicoes = [
+        [float(dados[f'mina{i}_areia']), float(dados[f'mina{i}_fino']), float(dados[f'mina{i}_grosso'])]
+        for i in (1, 2, 3)
+    ]
+    return resolver_problema_minas(
+        float(dados['d1']), float(dados['d2']), float(dados['d3']),
+        *composicoes,
+        dados.get('metodo', 'gauss')
+    )
+
+
+def executar_wheatstone(dados):
+    """Ponte de Wheatstone (mesmos dados de /calcular_wheatstone)"""
+    return resolver_ponte_wheatstone(
+        float(dados['E']), float(dados['R1']), float(dados['R2']),
+        float(dados['R3']), float(dados['R4']), float(dados['R5']),
+        float(dados.get('tolerancia', 0.0001)),
+        dados.get('valores_iniciais', None),
+        dados.get('metodo', 'gauss_seidel')
+    )
+
+
+def executar_regressoes(dados):
+    """Regressões (mesmos dados de /calcular_regressoes)"""
+    x_dados, y_dados = pares_xy(dados)
+    return resolver_regressoes(x_dados, y_dados, dados.get('ajuste', 'linearizado'))
+
+
+def executar_integracao(dados):
+    """Integração de pontos tabelados (mesmos dados de /calcular_integracao)"""
+    x_dados, y_dados = pares_xy(dados)
+    return resolver_integracao(x_dados, y_dados, dados.get('metodo', 'trapezio'))
+
+
+def executar_integral_funcao(dados):
+    """Integral de uma expressão (mesmos dados de /calcular_integral_funcao)"""
+    return resolver_integral_funcao(
+        dados['expressao'],
+        float(dados['a']),
+        float(dados['b']),
+        dados.get('metodo', 'gauss_kronrod'),
+        float(dados.get('tolerancia', 1e-10))
+    )
+
+
+def executar_interpolacao(dados):
+    """Interpolação (mesmos dados de /calcular_interpolacao)"""
+    x_dados, y_dados = pares_xy(dados, minimo=1)
+    pontos = dados.get('pontos')
+    return resolver_interpolacao(
+        x_dados, y_dados,
+        metodo=dados.get('metodo', 'spline_natural'),
+        pontos=lista_numeros(pontos) if pontos is not None else None,
+        grade=dados.get('grade'),
+        derivada_inicio=float(dados.get('derivada_inicio', 0.0)),
+        derivada_fim=float(dados.get('derivada_fim', 0.0))
+    )
+
+
+def executar_edo(dados):
+    """Sistema de EDOs (mesmos dados de /calcular_edo)"""
+    equacoes = dados['equacoes']
+    if isinstance(equacoes, str):
+        equacoes = [equacoes]
+    
+    condicoes = dados['condicoes_iniciais']
+    if condicoes and not isinstance(condicoes[0], (list, tuple)):
+        condicoes = [condicoes]
+    
+    return resolver_edo(
+        equacoes,
+        float(dados['t0']),
+        float(dados['tf']),
+        condicoes,
+        metodo=dados.get('metodo', 'rk45'),
+        nomes=dados.get('nomes'),
+        parametros=dados.get('parametros'),
+        passos=int(dados.get('passos', 1000)),
+        a_cada=int(dados.get('a_cada', 1)),
+        t_saida=dados.get('t_saida'),
+        atol=float(dados.get('atol', 1e-8)),
+        rtol=float(dados.get('rtol', 1e-6)),
+        max_passos=int(dados.get('max_passos', MAXIMO_PASSOS_RK45))
+    )
+
+
+TIPOS_LOTE = {
+    'minas': executar_minas,
+    'wheatstone': executar_wheatstone,
+    'sistema': executar_sistema,
+    'sistema_iterativo': executar_sistema_iterativo,
+    'regressoes': executar_regressoes,
+    'integracao': executar_integracao,
+    'integral_funcao': executar_integral_funcao,
+    'interpolacao': executar_interpolacao,
+    'edo': executar_edo
+}
+
+# Resolvedores cujo resultado traz o próprio indicador de sucesso
+TIPOS_COM_SUCESSO = ('sistema', 'integracao', 'integral_funcao')
+
+# Medidas de /metrics por tipo (o rótulo 'resolvedor' é o próprio tipo, como nas rotas)
+MEDIDAS_LOTE = {
+    'minas': medidas_minas,
+    'wheatstone': medidas_wheatstone,
+    'sistema': medidas_sistema,
+    'sistema_iterativo': medidas_iterativo
+}
+
+
+def executar_item(indice, item):
+    """
+    Resolve um item do lote sem deixar o erro escapar.
+    
+    Retorna:
+        {'indice', 'tipo', 'sucesso', 'resultado', 'segundos'} ou
+        {'indice', 'tipo', 'sucesso': False, 'erro', 'segundos'}
+    """
+    tipo = item.get('tipo') if isinstance(item, dict) else None
+    inicio = time.perf_counter()
+    try:
+        if tipo not in TIPOS_LOTE:
+            raise ValueError(f"Tipo desconhecido: {tipo} (use {', '.join(TIPOS_LOTE)})")
+        resultado = TIPOS_LOTE[tipo](item.get('dados', {}))
+        sucesso = resultado['sucesso'] if tipo in TIPOS_COM_SUCESSO else True
+        return {'indice': indice, 'tipo': tipo, 'sucesso': sucesso, 'resultado': resultado,
+                'segundos': time.perf_counter() - inicio}
+    except Exception as e:
+        return {'indice': indice, 'tipo': tipo, 'sucesso': False, 'erro': str(e) or type(e).__name__,
+                'segundos': time.perf_counter() - inicio}
+
+
+def registrar_item(resposta, item):
+    """
+    Registra um item resolvido nas métricas do processo da aplicação (os
+    itens resolvidos no pool não alcançam as métricas do próprio processo).
+    O tempo já é contado no cálculo do lote, então não entra na fase.
+    """
+    tipo = resposta['tipo']
+    if tipo not in TIPOS_LOTE:
+        return
+    dados = item.get('dados') if isinstance(item.get('dados'), dict) else {}
+    registrar_chamada(tipo, resposta.get('segundos'), MEDIDAS_LOTE.get(tipo),
+                      (dados.get('matriz'), dados.get('vetor_b', ())), resposta.get('resultado'),
+                      erro='erro' in resposta, fase=False)
+
+
+def executar_bloco(inicio, itens):
+    """Ponto de entrada executado no processo do pool: resolve itens consecutivos"""
+    return [executar_item(inicio + k, item) for k, item in enumerate(itens)]
+
+
+def obter_pool():
+    """Cria o pool na primeira chamada (processos iniciados por spawn, seguros com threads)"""
+    if POOL['executor'] is None:
+        POOL['executor'] = ProcessPoolExecutor(
+            max_workers=NUMERO_PROCESSOS_LOTE,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return POOL['executor']
+
+
+def encerrar_pool():
+    """Encerra o pool ao final do processo"""
+    if POOL['executor'] is not None:
+        POOL['executor'].shutdown(wait=False, cancel_futures=True)
+        POOL['executor'] = None
+
+
+atexit.register(encerrar_pool)
+
+
+def validar_lote(itens):
+    """Confere o formato e o tamanho do lote"""
+    if not isinstance(itens, list):
+        raise ValueError("O lote deve ser uma lista de itens {\"tipo\": ..., \"dados\": {...}}")
+    if len(itens) > MAXIMO_ITENS_LOTE:
+        raise ValueError(f"Máximo de {MAXIMO_ITENS_LOTE} itens por lote")
+
+
+def dividir_blocos(total):
+    """Intervalos [inicio, fim) de itens consecutivos, cerca de 4 blocos por processo"""
+    tamanho = -(-total // (NUMERO_PROCESSOS_LOTE * 4))
+    tamanho = max(1, min(tamanho, MAXIMO_ITENS_POR_BLOCO))
+    return [(i, min(i + tamanho, total)) for i in range(0, total, tamanho)]
+
+
+def resultados_conforme_concluem(itens, paralelo=None):
+    """
+    Gera os resultados dos itens à medida que ficam prontos (fora de ordem no modo paralelo).
+    
+    Parâmetros:
+        itens: lista de {'tipo': ..., 'dados': {...}}
+        paralelo: True/False para forçar o modo; None decide pelo tamanho do lote
+    
+    Gera:
+        um dicionário por item (ver executar_item), com o campo 'indice'
+    """
+    validar_lote(itens)
+    
+    if paralelo is None:
+        paralelo = len(itens) > LIMITE_SEQUENCIAL and NUMERO_PROCESSOS_LOTE > 1
+    
+    if not paralelo:
+        for indice, item in enumerate(itens):
+            resposta = executar_item(indice, item)
+            registrar_item(resposta, item)
+            yield resposta
+        return
+    
+    try:
+        pool = obter_pool()
+        pendentes = {pool.submit(executar_bloco, inicio, itens[inicio:fim]): (inicio, fim)
+                     for inicio, fim in dividir_blocos(len(itens))}
+    except BrokenProcessPool:
+        # Um processo do pool morreu: recria o pool e resolve o lote aqui mesmo
+        POOL['executor'] = None
+        for indice, item in enumerate(itens):
+            resposta = executar_item(indice, item)
+            registrar_item(resposta, item)
+            yield resposta
+        return
+    
+    try:
+        while pendentes:
+            concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                inicio, fim = pendentes.pop(futuro)
+                try:
+                    bloco = futuro.result()
+                except BrokenProcessPool:
+                    POOL['executor'] = None
+                    bloco = [{'indice': i, 'tipo': itens[i].get('tipo') if isinstance(itens[i], dict) else None,
+                              'sucesso': False, 'erro': 'Processo de cálculo interrompido'}
+                             for i in range(inicio, fim)]
+                for resposta in bloco:
+                    registrar_item(resposta, itens[resposta['indice']])
+                yield from bloco
+    finally:
+        # Cliente desconectou no meio do fluxo: descarta o que ainda não começou
+        for futuro in pendentes:
+            futuro.cancel()
+
+
+def resolver_lote(itens, paralelo=None):
+    """
+    Resolve todos os itens de um lote.
+    
+    Parâmetros:
+        itens: lista de {'tipo': ..., 'dados': {...}}, com os mesmos dados das rotas /calcular_*
+        paralelo: True/False para forçar o modo; None decide pelo tamanho do lote
+    
+    Retorna:
+        dicionário com os resultados na ordem dos itens e a contagem de erros
+    """
+    resultados = [None] * len(itens) if isinstance(itens, list) else None
+    for resposta in resultados_conforme_concluem(itens, paralelo):
+        resultados[resposta['indice']] = resposta
+    
+    erros = sum(1 for resposta in resultados if not resposta['sucesso'])
+    
+    return {
+        'itens': resultados,
+        'total': len(resultados),
+        'erros': erros
+    }
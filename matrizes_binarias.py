@@ -0,0 +1,117 @@
+"""
+Módulo: Matrizes em Formato Binário
+Leitura e escrita de matrizes float64 little-endian, brutas (com um pequeno
+cabeçalho de forma) ou no formato .npy, sem conversão elemento a elemento
+"""
+
+import struct
+import sys
+from array import array
+
+from integracao_2d import ASSINATURA_NPY, ler_cabecalho_npy
+from leitura_dados import TIPO_BINARIO
+
+TIPO_NPY = 'application/x-npy'
+
+# Cabeçalho do formato bruto: linhas e colunas em uint32 little-endian
+CABECALHO_BRUTO = struct.Struct('<II')
+
+TIPOS_MATRIZ = (TIPO_BINARIO, TIPO_NPY)
+
+
+def ler_matriz(corpo):
+    """
+    Lê uma matriz float64 enviada em formato binário.
+    
+    O formato é reconhecido pelo conteúdo: .npy (assinatura \\x93NUMPY) ou bruto,
+    com linhas e colunas em uint32 seguidos de linhas*colunas float64
+    little-endian em ordem de linhas.
+    
+    Parâmetros:
+        corpo: bytes recebidos
+    
+    Retorna:
+        (lista de array('d') com as linhas, número de colunas)
+    """
+    visao = memoryview(corpo)
+    
+    if bytes(visao[:6]) == ASSINATURA_NPY:
+        inicio, (linhas, colunas) = ler_cabecalho_npy(visao)
+    else:
+        if len(visao) < CABECALHO_BRUTO.size:
+            raise ValueError("Corpo binário sem o cabeçalho de forma (linhas, colunas em uint32)")
+        linhas, colunas = CABECALHO_BRUTO.unpack_from(visao)
+        inicio = CABECALHO_BRUTO.size
+    
+    esperado = 8 * linhas * colunas
+    if len(visao) - inicio != esperado:
+        raise ValueError(f"Esperados {esperado} bytes de dados para {linhas}x{colunas}, "
+                         f"recebidos {len(visao) - inicio}")
+    
+    valores = array('d')
+    valores.frombytes(visao[inicio:])
+    if sys.byteorder == 'big':
+        valores.byteswap()
+    
+    return [valores[i * colunas:(i + 1) * colunas] for i in range(linhas)], colunas
+
+
+def ler_sistema_aumentado(corpo):
+    """
+    Lê um sistema Ax = b enviado como a matriz aumentada [A | b] (n x n+1).
+    
+    Retorna:
+        (A como lista de array('d'), b como array('d'))
+    """
+    linhas, colunas = ler_matriz(corpo)
+    n = len(linhas)
+    if colunas != n + 1:
+        raise ValueError(f"Esperada a matriz aumentada [A | b] com {n}x{n + 1} elementos, "
+                         f"recebida {n}x{colunas}")
+    
+    b = array('d', (linha[n] for linha in linhas))
+    for linha in linhas:
+        del linha[n]
+    
+    return linhas, b
+
+
+def escrever_matriz(linhas, tipo=TIPO_BINARIO):
+    """
+    Codifica uma matriz (lista de sequências com o mesmo tamanho) ou um vetor
+    (sequência de números, gravado como uma coluna) em float64 little-endian.
+    
+    Parâmetros:
+        linhas: matriz ou vetor
+        tipo: TIPO_BINARIO (cabeçalho de forma + dados) ou TIPO_NPY
+    
+    Retorna:
+        bytes
+    """
+    if linhas and not isinstance(linhas[0], (list, tuple, array)):
+        linhas = [linhas]
+        forma = (len(linhas[0]), 1)
+    else:
+        forma = (len(linhas), len(linhas[0]) if linhas else 0)
+    
+    valores = array('d')
+    for linha in linhas:
+        if isinstance(linha, array):
+            valores.extend(linha)
+        else:
+            valores.extend(map(float, linha))
+    if sys.byteorder == 'big':
+        valores.byteswap()
+    
+    if tipo == TIPO_NPY:
+        descricao = f"{{'descr': '<f8', 'fortran_order': False, 'shape': ({forma[0]}, {forma[1]}), }}"
+        # Cabeçalho da versão 1.0 alinhado a 64 bytes, terminado em '\n'
+        tamanho = 64 * -(-(10 + len(descricao) + 1) // 64) - 10
+        cabecalho = ASSINATURA_NPY + b'\x01\x00' + struct.pack('<H', tamanho)
+        cabecalho += descricao.ljust(tamanho - 1).encode('latin1') + b'\n'
+    elif tipo == TIPO_BINARIO:
+        cabecalho = CABECALHO_BRUTO.pack(*forma)
+    else:
+        raise ValueError(f"Formato binário desconhecido: {tipo}")
+    
+    return cabecalho + valores.tobytes()
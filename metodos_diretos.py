@@ -7,6 +7,10 @@ Métodos:
     - Fatoração LU
 """
 
+from array import array
+from operator import mul
+
+
 def gauss_elimination(A, b):
     """
     Resolve sistema linear Ax = b usando Eliminação de Gauss com pivoteamento parcial.
@@ -265,6 +269,110 @@ def lu_factorization(A, b):
     return x, passos
 
 
+def fatorar_lu(linhas):
+    """
+    Fatoração LU compacta com pivoteamento parcial, sem registro de passos.
+    
+    Trabalha no próprio vetor de linhas: ao final, abaixo da diagonal ficam
+    os multiplicadores de L (diagonal 1 implícita) e da diagonal para cima
+    fica U. O laço interno percorre a cauda da linha do pivô com índices;
+    em listas ele é cerca de 2x mais rápido que em array('d'), que converte
+    cada elemento lido e escrito, por isso resolver_lu elimina sobre uma
+    cópia em listas.
+    
+    Parâmetros:
+        linhas: lista de linhas (listas ou arrays float64) da matriz (modificada)
+    
+    Retorna:
+        (permutacao, trocas) ou None se um pivô for zero (matriz singular)
+    """
+    n = len(linhas)
+    permutacao = list(range(n))
+    trocas = 0
+    
+    for k in range(n):
+        # Pivoteamento parcial
+        max_idx = max(range(k, n), key=lambda i: abs(linhas[i][k]))
+        if linhas[max_idx][k] == 0:
+            return None
+        
+        if max_idx != k:
+            linhas[k], linhas[max_idx] = linhas[max_idx], linhas[k]
+            permutacao[k], permutacao[max_idx] = permutacao[max_idx], permutacao[k]
+            trocas += 1
+        
+        linha_k = linhas[k]
+        pivo = linha_k[k]
+        cauda = linha_k[k + 1:]
+        
+        for i in range(k + 1, n):
+            linha_i = linhas[i]
+            fator = linha_i[k] / pivo
+            linha_i[k] = fator
+            if fator != 0.0:
+                j = k + 1
+                for valor in cauda:
+                    linha_i[j] -= fator * valor
+                    j += 1
+    
+    return permutacao, trocas
+
+
+def substituir_lu(lu, permutacao, b):
+    """
+    Resolve LUx = Pb com os fatores compactos de fatorar_lu.
+    
+    Retorna:
+        array float64 com a solução
+    """
+    n = len(lu)
+    
+    # Substituição direta (Ly = Pb)
+    y = array('d', bytes(8 * n))
+    for i in range(n):
+        y[i] = b[permutacao[i]] - sum(map(mul, lu[i][:i], y[:i]))
+    
+    # Substituição reversa (Ux = y)
+    x = y
+    for i in range(n - 1, -1, -1):
+        x[i] = (y[i] - sum(map(mul, lu[i][i + 1:], x[i + 1:]))) / lu[i][i]
+    
+    return x
+
+
+def resolver_lu(A, b):
+    """
+    Resolve Ax = b pela fatoração LU compacta, sem registro de passos.
+    
+    Parâmetros:
+        A: matriz (lista de listas ou de arrays float64; não é modificada)
+        b: vetor de termos independentes
+    
+    Retorna:
+        dicionário com solução (array float64), fatores compactos (lista de
+        array float64), permutação e número de trocas de linha, ou None se a
+        matriz for singular
+    """
+    n = len(b)
+    if len(A) != n or any(len(linha) != n for linha in A):
+        raise ValueError("A matriz deve ser quadrada NxN onde N é o tamanho do vetor b")
+    
+    # Cópia de trabalho em listas (mais rápida no laço interno); os fatores
+    # voltam como array('d'), o formato das matrizes binárias
+    trabalho = [list(linha) for linha in A]
+    fatoracao = fatorar_lu(trabalho)
+    if fatoracao is None:
+        return None
+    
+    permutacao, trocas = fatoracao
+    return {
+        'solucao': substituir_lu(trabalho, permutacao, b),
+        'lu': [array('d', linha) for linha in trabalho],
+        'permutacao': permutacao,
+        'trocas': trocas
+    }
+
+
 def formatar_sistema(A, b):
     """Formata sistema linear para exibição"""
     n = len(b)
@@ -337,7 +445,7 @@ def resolver_problema_minas(d1, d2, d3, comp_mina1, comp_mina2, comp_mina3, meto
     }
 
 
-def resolver_sistema_generico(A, b, metodo="gauss"):
+def resolver_sistema_generico(A, b, metodo="gauss", registrar_passos=True):
     """
     Resolve um sistema linear genérico Ax = b.
     
@@ -345,10 +453,28 @@ def resolver_sistema_generico(A, b, metodo="gauss"):
         A: matriz de coeficientes (lista de listas)
         b: vetor de termos independentes (lista)
         metodo: "gauss", "jordan" ou "lu"
+        registrar_passos: se False, não monta o texto dos passos nem do sistema
+            (custo O(n³) em texto para matrizes grandes) e resolve pela LU
+            compacta, que dá a mesma solução dos três métodos; nesse caso
+            'metodo' informa 'lu' e o pedido fica em 'metodo_solicitado'
     
     Retorna:
         dicionário com solução e passos
     """
+    if not registrar_passos:
+        if metodo not in ("gauss", "jordan", "lu"):
+            raise ValueError(f"Método desconhecido: {metodo}")
+        resolucao = resolver_lu(A, b)
+        return {
+            'solucao': list(resolucao['solucao']) if resolucao else None,
+            'passos': '' if resolucao else 'ERRO: Pivô zero encontrado!',
+            'sistema_original': '',
+            'metodo': 'lu',
+            'metodo_solicitado': metodo,
+            'sucesso': resolucao is not None,
+            'trocas': resolucao['trocas'] if resolucao else None
+        }
+    
     x, passos = resolver_sistema_linear(A, b, metodo)
     
     return {
@@ -356,5 +482,6 @@ def resolver_sistema_generico(A, b, metodo="gauss"):
         'passos': '\n'.join(passos),
         'sistema_original': formatar_sistema(A, b),
         'metodo': metodo,
-        'sucesso': x is not None
+        'sucesso': x is not None,
+        'trocas': sum(1 for passo in passos if 'Troca linha' in passo)
     }
@@ -3,9 +3,20 @@ Módulo: Métodos Iterativos para Sistemas Lineares
 Implementa os métodos de Jacobi e Gauss-Seidel para resolver sistemas Ax = b
 """
 
-def gauss_seidel(A, b, x0=None, tol=0.0001, max_iter=1000):
+import math
+
+from metodos_diretos import formatar_sistema
+
+# Limite de max_iter aceito nas rotas de fluxo (o cliente escolhe o valor)
+MAXIMO_ITERACOES_FLUXO = 100000
+
+
+def iteracoes_gauss_seidel(A, b, x0=None, tol=0.0001, max_iter=1000):
     """
-    Resolve sistema linear Ax = b usando o método de Gauss-Seidel.
+    Gerador do método de Gauss-Seidel: produz um retrato a cada iteração.
+    
+    Só o vetor atual e o da iteração anterior ficam em memória, qualquer que
+    seja o número de iterações.
     
     Parâmetros:
         A: matriz de coeficientes (lista de listas)
@@ -14,10 +25,47 @@ def gauss_seidel(A, b, x0=None, tol=0.0001, max_iter=1000):
         tol: tolerância para convergência
         max_iter: número máximo de iterações
     
-    Retorna:
-        x: vetor solução (lista)
-        num_iter: número de iterações realizadas
-        historico: lista de iterações com valores de x
+    Gera:
+        dicionário {'iteracao', 'solucao', 'erro', 'convergiu'} (solucao é uma cópia)
+    """
+    n = len(b)
+    
+    # Inicializar x0 se não fornecido
+    if x0 is None:
+        x = [0.0] * n
+    else:
+        x = x0[:]
+    
+    for k in range(max_iter):
+        x_old = x[:]
+        
+        for i in range(n):
+            soma = 0.0
+            
+            # Usar valores já atualizados (à esquerda do pivô)
+            for j in range(i):
+                soma += A[i][j] * x[j]
+            
+            # Usar valores da iteração anterior (à direita do pivô)
+            for j in range(i + 1, n):
+                soma += A[i][j] * x_old[j]
+            
+            x[i] = (b[i] - soma) / A[i][i]
+        
+        erro = erro_relativo_maximo(x, x_old)
+        
+        yield {'iteracao': k + 1, 'solucao': x[:], 'erro': erro, 'convergiu': erro < tol}
+        
+        # Verificar convergência
+        if erro < tol:
+            return
+
+
+def iteracoes_jacobi(A, b, x0=None, tol=0.0001, max_iter=1000):
+    """
+    Gerador do método de Jacobi: produz um retrato a cada iteração.
+    
+    Parâmetros e retratos iguais aos de iteracoes_gauss_seidel.
     """
     n = len(b)
     
@@ -27,6 +75,65 @@ def gauss_seidel(A, b, x0=None, tol=0.0001, max_iter=1000):
     else:
         x = x0[:]
     
+    for k in range(max_iter):
+        x_old = x[:]
+        
+        # Calcular novos valores usando APENAS valores da iteração anterior
+        for i in range(n):
+            soma = 0.0
+            
+            # Somatório completo excluindo o elemento diagonal
+            for j in range(n):
+                if j != i:
+                    soma += A[i][j] * x_old[j]
+            
+            x[i] = (b[i] - soma) / A[i][i]
+        
+        erro = erro_relativo_maximo(x, x_old)
+        
+        yield {'iteracao': k + 1, 'solucao': x[:], 'erro': erro, 'convergiu': erro < tol}
+        
+        # Verificar convergência
+        if erro < tol:
+            return
+
+
+def erro_relativo_maximo(x, x_old):
+    """
+    Maior |x[i] - x_old[i]| / |x[i]| entre as componentes não nulas
+    (infinito se alguma componente deixou de ser finita, ou seja, divergiu)
+    """
+    erro = 0.0
+    for i in range(len(x)):
+        if not math.isfinite(x[i]):
+            return math.inf
+        if x[i] != 0:
+            erro_rel = abs((x[i] - x_old[i]) / x[i])
+            if erro_rel > erro:
+                erro = erro_rel
+    return erro
+
+
+def gauss_seidel(A, b, x0=None, tol=0.0001, max_iter=1000):
+    """
+    Resolve sistema linear Ax = b usando o método de Gauss-Seidel.
+    
+    Parâmetros:
+        A: matriz de coeficientes (lista de listas)
+        b: vetor de termos independentes (lista)
+        x0: estimativa inicial (lista) - se None, usa vetor zero
+        tol: tolerância para convergência
+        max_iter: número máximo de iterações
+    
+    Retorna:
+        x: vetor solução (lista)
+        num_iter: número de iterações realizadas
+        historico: lista de iterações com valores de x
+        convergiu: True se a tolerância foi atingida antes de max_iter
+    """
+    n = len(b)
+    x = [0.0] * n if x0 is None else x0[:]
+    
     historico = []
     historico.append("=== MÉTODO DE GAUSS-SEIDEL ===")
     historico.append(f"Tolerância: {tol}")
@@ -53,50 +160,28 @@ def gauss_seidel(A, b, x0=None, tol=0.0001, max_iter=1000):
         historico.append(eq)
     historico.append("")
     
-    for k in range(max_iter):
-        x_old = x[:]
-        
-        historico.append(f"--- Iteração {k+1} ---")
+    for retrato in iteracoes_gauss_seidel(A, b, x0, tol, max_iter):
+        x = retrato['solucao']
         
+        historico.append(f"--- Iteração {retrato['iteracao']} ---")
         for i in range(n):
-            soma = 0.0
-            
-            # Usar valores já atualizados (à esquerda do pivô)
-            for j in range(i):
-                soma += A[i][j] * x[j]
-            
-            # Usar valores da iteração anterior (à direita do pivô)
-            for j in range(i + 1, n):
-                soma += A[i][j] * x_old[j]
-            
-            x[i] = (b[i] - soma) / A[i][i]
             historico.append(f"  x[{i+1}] = {x[i]:.8f}")
+        historico.append(f"  Erro relativo máximo: {retrato['erro']:.8f}")
         
-        # Calcular erro relativo máximo
-        erro = 0.0
-        for i in range(n):
-            if x[i] != 0:
-                erro_rel = abs((x[i] - x_old[i]) / x[i])
-                if erro_rel > erro:
-                    erro = erro_rel
-        
-        historico.append(f"  Erro relativo máximo: {erro:.8f}")
-        
-        # Verificar convergência
-        if erro < tol:
+        if retrato['convergiu']:
             historico.append("")
             historico.append("=== CONVERGÊNCIA ATINGIDA ===")
-            historico.append(f"Número de iterações: {k+1}")
+            historico.append(f"Número de iterações: {retrato['iteracao']}")
             historico.append("")
             historico.append("Solução final:")
             for i in range(n):
                 historico.append(f"  x[{i+1}] = {x[i]:.8f}")
             
-            return x, k + 1, historico
+            return x, retrato['iteracao'], historico, True
     
     historico.append("")
     historico.append(f"AVISO: Número máximo de iterações ({max_iter}) atingido!")
-    return x, max_iter, historico
+    return x, max_iter, historico, False
 
 
 def jacobi(A, b, x0=None, tol=0.0001, max_iter=1000):
@@ -114,60 +199,35 @@ def jacobi(A, b, x0=None, tol=0.0001, max_iter=1000):
         x: vetor solução (lista)
         num_iter: número de iterações realizadas
         historico: lista de iterações com valores de x
+        convergiu: True se a tolerância foi atingida antes de max_iter
     """
     n = len(b)
-    
-    # Inicializar x0 se não fornecido
-    if x0 is None:
-        x = [0.0] * n
-    else:
-        x = x0[:]
+    x = [0.0] * n if x0 is None else x0[:]
     
     historico = []
     historico.append("=== MÉTODO DE JACOBI ===")
     historico.append(f"Tolerância: {tol}")
     historico.append(f"Estimativa inicial: {[f'{val:.6f}' for val in x]}\n")
     
-    for k in range(max_iter):
-        x_old = x[:]
-        
-        historico.append(f"--- Iteração {k+1} ---")
+    for retrato in iteracoes_jacobi(A, b, x0, tol, max_iter):
+        x = retrato['solucao']
         
-        # Calcular novos valores usando APENAS valores da iteração anterior
+        historico.append(f"--- Iteração {retrato['iteracao']} ---")
         for i in range(n):
-            soma = 0.0
-            
-            # Somatório completo excluindo o elemento diagonal
-            for j in range(n):
-                if j != i:
-                    soma += A[i][j] * x_old[j]
-            
-            x[i] = (b[i] - soma) / A[i][i]
             historico.append(f"  x[{i+1}] = {x[i]:.8f}")
+        historico.append(f"  Erro relativo máximo: {retrato['erro']:.8f}\n")
         
-        # Calcular erro relativo máximo
-        erro = 0.0
-        for i in range(n):
-            if x[i] != 0:
-                erro_rel = abs((x[i] - x_old[i]) / x[i])
-                if erro_rel > erro:
-                    erro = erro_rel
-        
-        historico.append(f"  Erro relativo máximo: {erro:.8f}\n")
-        
-        # Verificar convergência
-        if erro < tol:
+        if retrato['convergiu']:
             historico.append(f"=== CONVERGÊNCIA ATINGIDA ===")
-            historico.append(f"Número de iterações: {k+1}")
+            historico.append(f"Número de iterações: {retrato['iteracao']}")
             historico.append(f"\nSolução final:")
             for i in range(n):
                 historico.append(f"  x[{i+1}] = {x[i]:.8f}")
             
-            return x, k + 1, historico
+            return x, retrato['iteracao'], historico, True
     
     historico.append(f"\nAVISO: Número máximo de iterações ({max_iter}) atingido!")
-    return x, max_iter, historico
-
+    return x, max_iter, historico, False
 
 
 def formatar_sistema_matricial(A, b):
@@ -199,6 +259,34 @@ def formatar_sistema_matricial(A, b):
     return "\n".join(linhas)
 
 
+def montar_ponte_wheatstone(E, R1, R2, R3, R4, R5):
+    """Sistema das 3 malhas da Ponte de Wheatstone (Leis de Kirchhoff)"""
+    A = [
+        [R1 + R2 + R5, -R2, -R5],           # Malha 1
+        [-R2, R2 + R3 + R4, -R4],           # Malha 2  
+        [-R5, -R4, R4 + R5]                 # Malha 3
+    ]
+    
+    b = [E, 0, 0]
+    
+    return A, b
+
+
+def correntes_ponte_wheatstone(x):
+    """Correntes de malha e correntes nos ramos a partir da solução (i1, i2, i3)"""
+    i1, i2, i3 = x
+    return {
+        'i1': i1,
+        'i2': i2,
+        'i3': i3,
+        'corrente_R1': i1,
+        'corrente_R2': i1 - i2,
+        'corrente_R3': i2,
+        'corrente_R4': i2 - i3,
+        'corrente_R5': i3
+    }
+
+
 def resolver_ponte_wheatstone(E, R1, R2, R3, R4, R5, tol=0.0001, valores_iniciais=None, metodo='gauss_seidel'):
     """
     Resolve o problema da Ponte de Wheatstone usando as Leis de Kirchhoff.
@@ -210,14 +298,7 @@ def resolver_ponte_wheatstone(E, R1, R2, R3, R4, R5, tol=0.0001, valores_iniciai
     Sistema de equações baseado nas malhas:
     """
     
-    # Montagem do sistema baseado nas 3 malhas principais
-    A = [
-        [R1 + R2 + R5, -R2, -R5],           # Malha 1
-        [-R2, R2 + R3 + R4, -R4],           # Malha 2  
-        [-R5, -R4, R4 + R5]                 # Malha 3
-    ]
-    
-    b = [E, 0, 0]
+    A, b = montar_ponte_wheatstone(E, R1, R2, R3, R4, R5)
     
     # Usar zeros se valores iniciais não forem fornecidos
     if valores_iniciais is None:
@@ -225,19 +306,13 @@ def resolver_ponte_wheatstone(E, R1, R2, R3, R4, R5, tol=0.0001, valores_iniciai
     
     # Escolher método
     if metodo == 'jacobi':
-        x, num_iter, historico = jacobi(A, b, x0=valores_iniciais, tol=tol)
+        x, num_iter, historico, convergiu = jacobi(A, b, x0=valores_iniciais, tol=tol)
         nome_metodo = 'JACOBI'
     else:
-        x, num_iter, historico = gauss_seidel(A, b, x0=valores_iniciais, tol=tol)
+        x, num_iter, historico, convergiu = gauss_seidel(A, b, x0=valores_iniciais, tol=tol)
         nome_metodo = 'GAUSS-SEIDEL'
     
-    # Calcular correntes nos ramos
-    i1, i2, i3 = x
-    corrente_R1 = i1
-    corrente_R2 = i1 - i2
-    corrente_R3 = i2
-    corrente_R4 = i2 - i3
-    corrente_R5 = i3
+    correntes = correntes_ponte_wheatstone(x)
     
     sistema_formatado = f"""Sistema Linear (Leis de Kirchhoff):
 
@@ -250,17 +325,11 @@ Forma Matricial:
 [ {-R2:5.1f}  {R2+R3+R4:5.1f}  {-R4:5.1f} ] [ i2 ] = [ {0:5.1f} ]
 [ {-R5:5.1f}  {-R4:5.1f}  {R4+R5:5.1f} ] [ i3 ]   [ {0:5.1f} ]
 """
-    
+
     return {
-        'i1': x[0],
-        'i2': x[1], 
-        'i3': x[2],
-        'corrente_R1': corrente_R1,
-        'corrente_R2': corrente_R2,
-        'corrente_R3': corrente_R3,
-        'corrente_R4': corrente_R4,
-        'corrente_R5': corrente_R5,
+        **correntes,
         'num_iteracoes': num_iter,
+        'convergiu': convergiu,
         'historico': '\n'.join(historico),
         'sistema': sistema_formatado,
         'metodo': nome_metodo,
@@ -270,4 +339,122 @@ Resistências: R1 = {R1} Ω, R2 = {R2} Ω, R3 = {R3} Ω, R4 = {R4} Ω, R5 = {R5}
 Tolerância: {tol}
 Método: {nome_metodo}
 """
-    }
\ No newline at end of file
+    }
+
+def resolver_sistema_iterativo(A, b, metodo='gauss_seidel', tol=0.0001, valores_iniciais=None):
+    """
+    Resolve um sistema linear genérico Ax = b por Jacobi ou Gauss-Seidel.
+    
+    Parâmetros:
+        A: matriz de coeficientes (lista de listas)
+        b: vetor de termos independentes (lista)
+        metodo: 'jacobi' ou 'gauss_seidel'
+        tol: tolerância para convergência
+        valores_iniciais: estimativa inicial (lista) - se None, usa vetor zero
+    
+    Retorna:
+        dicionário com solução, número de iterações e histórico
+    """
+    if metodo == 'jacobi':
+        x, num_iter, historico, convergiu = jacobi(A, b, x0=valores_iniciais, tol=tol)
+        nome_metodo = 'JACOBI'
+    else:  # gauss_seidel
+        x, num_iter, historico, convergiu = gauss_seidel(A, b, x0=valores_iniciais, tol=tol)
+        nome_metodo = 'GAUSS-SEIDEL'
+    
+    return {
+        'solucao': x,
+        'num_iteracoes': num_iter,
+        'convergiu': convergiu,
+        'historico': '\n'.join(historico),
+        'sistema_original': formatar_sistema(A, b),
+        'metodo': nome_metodo
+    }
+
+
+def residuo_maximo(A, b, x):
+    """Norma infinito do resíduo, max |b[i] - (Ax)[i]|"""
+    return max((abs(b[i] - sum(a * v for a, v in zip(A[i], x))) for i in range(len(b))), default=0.0)
+
+
+def fluxo_sistema_iterativo(A, b, metodo='gauss_seidel', tol=0.0001, valores_iniciais=None,
+                            a_cada=1, max_iter=1000):
+    """
+    Resolve Ax = b por Jacobi ou Gauss-Seidel produzindo o progresso das iterações.
+    
+    Apenas uma a cada `a_cada` iterações é emitida (a última sempre é), com o
+    resíduo calculado só para as emitidas. A memória usada não depende do
+    número de iterações.
+    
+    Parâmetros:
+        A, b, metodo, tol, valores_iniciais: como em resolver_sistema_iterativo
+        a_cada: emitir uma iteração a cada a_cada
+        max_iter: número máximo de iterações (de 1 a MAXIMO_ITERACOES_FLUXO)
+    
+    Gera:
+        ('iteracao', {'iteracao', 'solucao', 'erro', 'residuo'}) durante o cálculo e,
+        por fim, ('resultado', {'solucao', 'num_iteracoes', 'convergiu', 'residuo', 'metodo'})
+    """
+    n = len(b)
+    if len(A) != n or any(len(linha) != n for linha in A):
+        raise ValueError("A matriz deve ser quadrada NxN onde N é o tamanho do vetor b")
+    if any(A[i][i] == 0 for i in range(n)):
+        raise ValueError("A diagonal principal não pode ter zeros")
+    a_cada = int(a_cada)
+    if a_cada < 1:
+        raise ValueError("a_cada deve ser pelo menos 1")
+    max_iter = int(max_iter)
+    if max_iter < 1 or max_iter > MAXIMO_ITERACOES_FLUXO:
+        raise ValueError(f"max_iteracoes deve estar entre 1 e {MAXIMO_ITERACOES_FLUXO}")
+    
+    if metodo == 'jacobi':
+        iteracoes = iteracoes_jacobi(A, b, valores_iniciais, tol, max_iter)
+        nome_metodo = 'JACOBI'
+    else:  # gauss_seidel
+        iteracoes = iteracoes_gauss_seidel(A, b, valores_iniciais, tol, max_iter)
+        nome_metodo = 'GAUSS-SEIDEL'
+    
+    retrato = None
+    emitido = False
+    for retrato in iteracoes:
+        if not all(map(math.isfinite, retrato['solucao'])):
+            raise ValueError(f"O método divergiu na iteração {retrato['iteracao']}")
+        emitido = retrato['convergiu'] or retrato['iteracao'] % a_cada == 0
+        if emitido:
+            retrato['residuo'] = residuo_maximo(A, b, retrato['solucao'])
+            yield 'iteracao', retrato
+    
+    if retrato is None:
+        x = [0.0] * n if valores_iniciais is None else list(valores_iniciais)
+        retrato = {'iteracao': 0, 'solucao': x, 'erro': None, 'convergiu': False}
+    
+    # A última iteração sempre é emitida, mesmo fora da decimação
+    if not emitido:
+        retrato['residuo'] = residuo_maximo(A, b, retrato['solucao'])
+        if retrato['iteracao'] > 0:
+            yield 'iteracao', retrato
+    
+    yield 'resultado', {
+        'solucao': retrato['solucao'],
+        'num_iteracoes': retrato['iteracao'],
+        'convergiu': retrato['convergiu'],
+        'residuo': retrato['residuo'],
+        'metodo': nome_metodo
+    }
+
+
+def fluxo_ponte_wheatstone(E, R1, R2, R3, R4, R5, tol=0.0001, valores_iniciais=None,
+                           metodo='gauss_seidel', a_cada=1, max_iter=1000):
+    """
+    Versão em fluxo de resolver_ponte_wheatstone: mesmos eventos de
+    fluxo_sistema_iterativo, com as correntes nos ramos no resultado final.
+    """
+    A, b = montar_ponte_wheatstone(E, R1, R2, R3, R4, R5)
+    
+    if valores_iniciais is None:
+        valores_iniciais = [0.0, 0.0, 0.0]
+    
+    for evento, dados in fluxo_sistema_iterativo(A, b, metodo, tol, valores_iniciais, a_cada, max_iter):
+        if evento == 'resultado':
+            dados.update(correntes_ponte_wheatstone(dados['solucao']))
+        yield evento, dados
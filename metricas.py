@@ -0,0 +1,310 @@
+"""
+Módulo: Métricas
+Histogramas e contadores no formato de texto do Prometheus, com uma camada
+leve de instrumentação em volta das funções resolver_*. Desligada (padrão),
+a instrumentação devolve as próprias funções, sem custo algum
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from cache_resultados import estatisticas_cache
+
+# Configuração (pode ser alterada por variáveis de ambiente)
+METRICAS_ATIVAS = os.environ.get('METRICAS', '0') != '0'
+
+LIMITES_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LIMITES_TAMANHO = (2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+LIMITES_ITERACOES = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+FASES = ('leitura', 'calculo', 'formatacao')
+
+# nome -> {'tipo', 'ajuda', 'limites', 'series': {rótulos: valores}}
+REGISTRO = {}
+TRAVA_METRICAS = threading.Lock()
+
+# Tempo de cada fase da requisição corrente (por thread)
+FASES_REQUISICAO = threading.local()
+
+
+def registrar_metrica(nome, tipo, ajuda, limites=None):
+    """Declara uma métrica ('counter' ou 'histogram')"""
+    REGISTRO[nome] = {'tipo': tipo, 'ajuda': ajuda, 'limites': limites, 'series': {}}
+
+
+registrar_metrica('calculo_requisicao_segundos', 'histogram',
+                  'Latência das requisições por rota', LIMITES_SEGUNDOS)
+registrar_metrica('calculo_requisicoes_total', 'counter',
+                  'Requisições por rota e status HTTP')
+registrar_metrica('calculo_fase_segundos', 'histogram',
+                  'Tempo de leitura do JSON, cálculo e formatação da resposta por rota', LIMITES_SEGUNDOS)
+registrar_metrica('calculo_resolvedor_segundos', 'histogram',
+                  'Duração de cada chamada de resolvedor', LIMITES_SEGUNDOS)
+registrar_metrica('calculo_resolvedor_erros_total', 'counter',
+                  'Chamadas de resolvedor que terminaram em exceção')
+registrar_metrica('calculo_tamanho_sistema', 'histogram',
+                  'Ordem n dos sistemas resolvidos', LIMITES_TAMANHO)
+registrar_metrica('calculo_iteracoes', 'histogram',
+                  'Iterações até a parada dos métodos iterativos', LIMITES_ITERACOES)
+registrar_metrica('calculo_nao_convergidos_total', 'counter',
+                  'Execuções de métodos iterativos que pararam sem convergir')
+registrar_metrica('calculo_trocas_pivo_total', 'counter',
+                  'Trocas de linha feitas pelo pivoteamento parcial')
+
+
+def rotulos_ordenados(rotulos):
+    """Chave de uma série: pares (rótulo, valor) em ordem"""
+    return tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+
+def incrementar(nome, valor=1, **rotulos):
+    """Soma valor a um contador"""
+    series = REGISTRO[nome]['series']
+    chave = rotulos_ordenados(rotulos)
+    with TRAVA_METRICAS:
+        series[chave] = series.get(chave, 0) + valor
+
+
+def observar(nome, valor, **rotulos):
+    """Registra uma observação em um histograma"""
+    metrica = REGISTRO[nome]
+    limites = metrica['limites']
+    chave = rotulos_ordenados(rotulos)
+    with TRAVA_METRICAS:
+        serie = metrica['series'].get(chave)
+        if serie is None:
+            # Contagem por faixa (não acumulada), depois soma e total
+            serie = metrica['series'][chave] = [0] * (len(limites) + 1) + [0.0, 0]
+        serie[bisect_left(limites, valor)] += 1
+        serie[-2] += valor
+        serie[-1] += 1
+
+
+def iniciar_fases():
+    """Zera o tempo das fases no início de uma requisição"""
+    FASES_REQUISICAO.tempos = dict.fromkeys(FASES, 0.0)
+
+
+def acumular_fase(fase, segundos):
+    """Soma tempo a uma fase da requisição corrente (ignorado fora de requisições)"""
+    tempos = getattr(FASES_REQUISICAO, 'tempos', None)
+    if tempos is not None:
+        tempos[fase] += segundos
+
+
+def encerrar_fases():
+    """Devolve e descarta o tempo das fases da requisição corrente"""
+    tempos = getattr(FASES_REQUISICAO, 'tempos', None)
+    FASES_REQUISICAO.tempos = None
+    return tempos or {}
+
+
+def contar_trocas(passos):
+    """Trocas de linha registradas no texto dos passos dos métodos diretos"""
+    return passos.count('Troca linha')
+
+
+def medidas_sistema(argumentos, resultado):
+    """resolver_sistema_generico(A, b, ...)"""
+    return {'n': len(argumentos[1]), 'trocas': resultado['trocas']}
+
+
+def medidas_lu(argumentos, resultado):
+    """resolver_lu(A, b)"""
+    return {'n': len(argumentos[1]), 'trocas': resultado['trocas'] if resultado else 0}
+
+
+def medidas_minas(argumentos, resultado):
+    """resolver_problema_minas(...)"""
+    return {'n': 3, 'trocas': contar_trocas(resultado['passos'])}
+
+
+def medidas_iterativo(argumentos, resultado):
+    """resolver_sistema_iterativo(A, b, ...)"""
+    return {'n': len(argumentos[1]), 'iteracoes': resultado['num_iteracoes'],
+            'convergiu': resultado['convergiu']}
+
+
+def medidas_wheatstone(argumentos, resultado):
+    """resolver_ponte_wheatstone(...)"""
+    return {'n': 3, 'iteracoes': resultado['num_iteracoes'], 'convergiu': resultado['convergiu']}
+
+
+def registrar_chamada(resolvedor, duracao, medidas=None, argumentos=(), resultado=None,
+                      erro=False, fase=True):
+    """
+    Registra uma chamada de resolvedor já executada: duração, exceção e, com
+    `medidas`, tamanho do sistema, iterações, convergência e trocas de pivô.
+    
+    Usada por instrumentar() e pelos itens de lote e tarefas, que rodam em
+    processos do pool e têm as medidas registradas no processo da aplicação
+    quando o resultado volta.
+    
+    Parâmetros:
+        resolvedor: nome usado no rótulo 'resolvedor'
+        duracao: segundos da chamada (None se desconhecida)
+        medidas: função (argumentos posicionais, resultado) -> dicionário
+        argumentos, resultado: entrada e saída da chamada
+        erro: True se a chamada terminou em exceção
+        fase: soma a duração ao tempo de cálculo da requisição corrente
+    """
+    if not METRICAS_ATIVAS:
+        return
+    
+    if duracao is not None:
+        observar('calculo_resolvedor_segundos', duracao, resolvedor=resolvedor)
+        if fase:
+            acumular_fase('calculo', duracao)
+    if erro:
+        incrementar('calculo_resolvedor_erros_total', resolvedor=resolvedor)
+        return
+    
+    if medidas is not None:
+        try:
+            valores = medidas(argumentos, resultado)
+        except (KeyError, TypeError):
+            valores = {}
+        if valores.get('n') is not None:
+            observar('calculo_tamanho_sistema', valores['n'], resolvedor=resolvedor)
+        if valores.get('iteracoes') is not None:
+            observar('calculo_iteracoes', valores['iteracoes'], resolvedor=resolvedor)
+        if valores.get('convergiu') is False:
+            incrementar('calculo_nao_convergidos_total', resolvedor=resolvedor)
+        if valores.get('trocas'):
+            incrementar('calculo_trocas_pivo_total', valores['trocas'], resolvedor=resolvedor)
+
+
+def instrumentar(resolvedor, medidas=None):
+    """
+    Decorador que mede uma função resolver_*.
+    
+    Registra a duração (também como tempo de cálculo da requisição corrente),
+    as exceções e, quando `medidas(argumentos, resultado)` é dada, o tamanho do
+    sistema, as iterações, a convergência e as trocas de pivô.
+    Com as métricas desligadas devolve a própria função.
+    
+    Parâmetros:
+        resolvedor: nome usado no rótulo 'resolvedor'
+        medidas: função (argumentos posicionais, resultado) -> dicionário com
+            as chaves opcionais 'n', 'iteracoes', 'convergiu' e 'trocas'
+    """
+    def decorador(funcao):
+        if not METRICAS_ATIVAS:
+            return funcao
+        
+        @wraps(funcao)
+        def funcao_instrumentada(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                resultado = funcao(*args, **kwargs)
+            except BaseException:
+                registrar_chamada(resolvedor, time.perf_counter() - inicio, erro=True)
+                raise
+            registrar_chamada(resolvedor, time.perf_counter() - inicio, medidas, args, resultado)
+            return resultado
+        
+        return funcao_instrumentada
+    
+    return decorador
+
+
+def medir_fluxo(gerador, rota, inicial=0.0):
+    """
+    Mede o tempo de cálculo de uma resposta em fluxo.
+    
+    O after_request roda antes de o gerador ser consumido; aqui o tempo gasto
+    dentro do gerador (sem a espera pelo envio de cada parte) é somado e
+    registrado como a fase 'calculo' da rota quando o fluxo termina.
+    Com as métricas desligadas devolve o próprio gerador.
+    
+    Parâmetros:
+        gerador: iterável com as partes da resposta
+        rota: regra da rota (rótulo 'rota')
+        inicial: segundos de cálculo já gastos antes da resposta começar
+    """
+    if not METRICAS_ATIVAS:
+        return gerador
+    
+    def gerador_medido():
+        calculo = inicial
+        iterador = iter(gerador)
+        try:
+            while True:
+                inicio = time.perf_counter()
+                try:
+                    parte = next(iterador)
+                except StopIteration:
+                    return
+                finally:
+                    calculo += time.perf_counter() - inicio
+                yield parte
+        finally:
+            observar('calculo_fase_segundos', calculo, rota=rota, fase='calculo')
+    
+    return gerador_medido()
+
+
+def escapar_rotulo(valor):
+    """Escapa barra invertida, aspas e quebra de linha no valor de um rótulo"""
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formatar_rotulos(chave, extra=None):
+    """{a="1",b="2"} a partir dos pares de uma série"""
+    pares = list(chave) + ([extra] if extra else [])
+    if not pares:
+        return ''
+    texto = ','.join(f'{nome}="{escapar_rotulo(valor)}"' for nome, valor in pares)
+    return '{' + texto + '}'
+
+
+def formatar_valor(valor):
+    """Número no formato do Prometheus"""
+    if isinstance(valor, float):
+        if valor == float('inf'):
+            return '+Inf'
+        return repr(valor)
+    return str(valor)
+
+
+def formatar_prometheus():
+    """
+    Todas as métricas no formato de texto do Prometheus (versão 0.0.4),
+    incluindo os contadores do cache de resultados.
+    
+    Retorna:
+        texto
+    """
+    linhas = []
+    with TRAVA_METRICAS:
+        for nome, metrica in REGISTRO.items():
+            linhas.append(f"# HELP {nome} {metrica['ajuda']}")
+            linhas.append(f"# TYPE {nome} {metrica['tipo']}")
+            for chave, valor in sorted(metrica['series'].items()):
+                if metrica['tipo'] == 'counter':
+                    linhas.append(f"{nome}{formatar_rotulos(chave)} {formatar_valor(valor)}")
+                    continue
+                acumulado = 0
+                for limite, contagem in zip(metrica['limites'] + (float('inf'),), valor):
+                    acumulado += contagem
+                    rotulos = formatar_rotulos(chave, ('le', formatar_valor(float(limite))))
+                    linhas.append(f"{nome}_bucket{rotulos} {acumulado}")
+                linhas.append(f"{nome}_sum{formatar_rotulos(chave)} {formatar_valor(valor[-2])}")
+                linhas.append(f"{nome}_count{formatar_rotulos(chave)} {valor[-1]}")
+    
+    cache = estatisticas_cache()
+    for contador in ('acertos', 'faltas', 'agrupadas', 'expiradas', 'removidas'):
+        nome = f"calculo_cache_{contador}_total"
+        linhas.append(f"# HELP {nome} Cache de resultados: {contador}")
+        linhas.append(f"# TYPE {nome} counter")
+        linhas.append(f"{nome} {cache[contador]}")
+    for medida in ('entradas', 'bytes'):
+        nome = f"calculo_cache_{medida}"
+        linhas.append(f"# HELP {nome} Cache de resultados: {medida} ocupados")
+        linhas.append(f"# TYPE {nome} gauge")
+        linhas.append(f"{nome} {cache[medida]}")
+    
+    return '\n'.join(linhas) + '\n'
@@ -1,8 +1,17 @@
 """
 Módulo: Interpolação e Mínimos Quadrados
 Implementa regressões por mínimos quadrados (linear, parabólica, exponencial)
+e a seleção de modelos entre várias famílias de curvas
 """
 
+import atexit
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 def regressao_linear(x, y):
     """
     Ajusta uma reta y = a + bx aos pontos (x, y) usando mínimos quadrados.
@@ -137,7 +146,8 @@ def regressao_exponencial(x, y):
         y: lista de valores y (devem ser positivos)
     
     Retorna:
-        a, b: coeficientes da exponencial
+        ln_a, b: coeficientes da exponencial, com ln(a) no lugar de a (e^(ln a)
+                 sai do intervalo de float em dados como os anos da Lei de Moore)
         erro_quadratico: soma dos quadrados dos resíduos (na escala original)
         detalhes: string com cálculos detalhados
     """
@@ -184,66 +194,317 @@ def regressao_exponencial(x, y):
     ln_a = det_lna / det
     b = det_b / det
     
-    # Calcular a = e^(ln_a)
-    a = exp_manual(ln_a)
+    # a = e^(ln_a) só é mostrado quando cabe em float
+    a = coeficiente_a('exponencial', (ln_a, b))
     
     detalhes.append("Coeficientes calculados:")
     detalhes.append(f"  ln(a) = {ln_a:.6f}")
-    detalhes.append(f"  a = e^({ln_a:.6f}) = {a:.6f}")
+    if a is not None:
+        detalhes.append(f"  a = e^({ln_a:.6f}) = {a:.6g}")
     detalhes.append(f"  b = {b:.6f}\n")
-    detalhes.append(f"Equação: y = {a:.6f}*e^({b:.6f}x)\n")
+    detalhes.append(f"Equação: {formatar_equacao('exponencial', (ln_a, b))}\n")
     
-    # Calcular erro quadrático na escala original
-    erro_quad = sum((y[i] - a * exp_manual(b * x[i]))**2 for i in range(n))
+    # Calcular erro quadrático na escala original, com a previsão e^(ln a + bx)
+    erro_quad = 0.0
+    for i in range(n):
+        r = y[i] - exp_manual(ln_a + b * x[i])
+        erro_quad += r * r
     detalhes.append(f"Erro quadrático total: {erro_quad:.6f}")
     
-    return a, b, erro_quad, '\n'.join(detalhes)
+    return ln_a, b, erro_quad, '\n'.join(detalhes)
+
+
+def levenberg_marquardt(u, y, ln_a, b, tol=1e-10, max_iter=100, amortecimento=1e-3):
+    """
+    Ajusta y = a*e^(b*u) minimizando Σ(y - a*e^(b*u))² pelo método de Levenberg-Marquardt.
+    
+    Serve para a exponencial (u = x) e para a potência y = a*x^b (u = ln(x)).
+    Em cada iteração uma única passagem pelos dados calcula os resíduos, a
+    soma dos quadrados e as somas de JᵀJ e Jᵀr (J = [e^(bu), a*u*e^(bu)]).
+    Se o passo for rejeitado, o amortecimento aumenta e o sistema 2x2 é
+    resolvido de novo com as somas já calculadas, sem nova passagem.
+    
+    Parâmetros:
+        u: lista de valores da variável independente (já transformada)
+        y: lista de valores y
+        ln_a, b: estimativa inicial de ln(a) e b (ex.: regressão linearizada)
+        tol: tolerância relativa no passo e na variação do erro
+        max_iter: número máximo de iterações
+        amortecimento: valor inicial de lambda
+    
+    Retorna:
+        ln_a, b: coeficientes ajustados, com ln(a) no lugar de a
+        erro_quadratico: soma dos quadrados dos resíduos
+        num_iter: número de iterações (passagens pelos dados)
+        historico: lista com erro e lambda de cada iteração
+    """
+    def passagem(a, b):
+        # Resíduos, erro e equações normais do passo de Gauss-Newton em uma passagem
+        exps = exp_lote([b * ui for ui in u])
+        erro = jtj_aa = jtj_ab = jtj_bb = jtr_a = jtr_b = 0.0
+        for ui, yi, ei in zip(u, y, exps):
+            r = yi - a * ei
+            ja = ei
+            jb = a * ui * ei
+            erro += r * r
+            jtj_aa += ja * ja
+            jtj_ab += ja * jb
+            jtj_bb += jb * jb
+            jtr_a += ja * r
+            jtr_b += jb * r
+        return erro, (jtj_aa, jtj_ab, jtj_bb, jtr_a, jtr_b)
+    
+    # Centralizar u melhora o condicionamento (ex.: anos ~ 1980 na Lei de Moore):
+    # a*e^(b*u) = a_c*e^(b*(u - ū)) com a_c = e^(ln a + b*ū), já na escala de y
+    media_u = sum(u) / len(u)
+    u = [ui - media_u for ui in u]
+    a = exp_manual(ln_a + b * media_u)
+    
+    historico = [f"u centralizado em ū = {media_u:.6f} (a abaixo é o coeficiente de e^(b*(u - ū)))"]
+    erro, normais = passagem(a, b)
+    lam = amortecimento
+    num_iter = 1
+    historico.append(f"Iteração 0: a = {a:.8f}, b = {b:.8f}, erro = {erro:.8f}")
+    
+    while num_iter < max_iter:
+        jtj_aa, jtj_ab, jtj_bb, jtr_a, jtr_b = normais
+        
+        # Resolver (JᵀJ + λ·diag(JᵀJ))·δ = Jᵀr pela Regra de Cramer
+        m_aa = jtj_aa * (1 + lam)
+        m_bb = jtj_bb * (1 + lam)
+        det = m_aa * m_bb - jtj_ab * jtj_ab
+        if det == 0:
+            historico.append("Sistema do passo singular: interrompendo")
+            break
+        
+        delta_a = (jtr_a * m_bb - jtj_ab * jtr_b) / det
+        delta_b = (m_aa * jtr_b - jtj_ab * jtr_a) / det
+        
+        a_novo = a + delta_a
+        b_novo = b + delta_b
+        erro_novo, normais_novas = passagem(a_novo, b_novo)
+        num_iter += 1
+        
+        if erro_novo < erro:
+            variacao = (erro - erro_novo) / erro if erro > 0 else 0.0
+            a, b, erro, normais = a_novo, b_novo, erro_novo, normais_novas
+            lam /= 10
+            historico.append(f"Iteração {num_iter - 1}: a = {a:.8f}, b = {b:.8f}, "
+                             f"erro = {erro:.8f}, λ = {lam:.1e}")
+            
+            passo = max(abs(delta_a) / (abs(a) + tol), abs(delta_b) / (abs(b) + tol))
+            if passo < tol or variacao < tol:
+                break
+        else:
+            lam *= 10
+            historico.append(f"Iteração {num_iter - 1}: passo rejeitado, λ = {lam:.1e}")
+            if lam > 1e16:
+                break
+    
+    # Voltar ao u original em escala log: ln a = ln a_c - b*ū. Com y > 0 um
+    # a_c <= 0 só aparece se a estimativa inicial já era pior que y = 0
+    if a <= 0:
+        raise ValueError("O ajuste não linear convergiu para a <= 0; use o ajuste linearizado")
+    ln_a = logaritmo_natural(a) - b * media_u
+    
+    return ln_a, b, erro, num_iter, historico
+
+
+def regressao_exponencial_nao_linear(x, y):
+    """
+    Ajusta y = a*e^(bx) minimizando o erro na escala original de y.
+    
+    Parte dos coeficientes da regressão linearizada (ln(y) = ln(a) + bx), que
+    já estão próximos do ótimo, e os refina por Levenberg-Marquardt.
+    
+    Retorna:
+        ln_a, b, erro_quadratico, detalhes, num_iter (mesmo formato de
+        regressao_exponencial mais o número de iterações)
+    """
+    ln_a0, b0, erro0, det_lin = regressao_exponencial(x, y)
+    if ln_a0 is None:
+        return None, None, None, det_lin, 0
+    
+    ln_a, b, erro, num_iter, historico = levenberg_marquardt(list(x), y, ln_a0, b0)
+    
+    detalhes = [det_lin, "", "=== REFINAMENTO NÃO LINEAR (LEVENBERG-MARQUARDT) ===\n"]
+    detalhes.append(f"Estimativa inicial (linearizada): ln(a) = {ln_a0:.6f}, b = {b0:.6f}, erro = {erro0:.6f}\n")
+    detalhes.extend(historico)
+    detalhes.append("")
+    detalhes.append(f"Equação: {formatar_equacao('exponencial', (ln_a, b))}\n")
+    detalhes.append(f"Erro quadrático total: {erro:.6f}")
+    
+    return ln_a, b, erro, '\n'.join(detalhes), num_iter
+
+
+def regressao_potencia_nao_linear(x, y):
+    """
+    Ajusta y = a*x^b minimizando o erro na escala original de y.
+    
+    A estimativa inicial vem da reta ln(y) = ln(a) + b*ln(x); o refinamento
+    usa Levenberg-Marquardt sobre u = ln(x), calculado uma única vez.
+    
+    Retorna:
+        ln_a, b, erro_quadratico, detalhes, num_iter
+    """
+    for i in range(len(x)):
+        if x[i] <= 0 or y[i] <= 0:
+            return None, None, None, f"ERRO: o ponto {i} não tem x e y positivos", 0
+    
+    somas = acumular_somas(novas_somas(), x, y)
+    reta = reta_por_somas(somas['n'], somas['lnx'], somas['lnx2'], somas['lny'], somas['lnx_lny'])
+    if reta is None:
+        return None, None, None, "ERRO: sistema normal singular", 0
+    
+    ln_a0, b0 = reta
+    ln_x = [logaritmo_natural(xi) for xi in x]
+    ln_a, b, erro, num_iter, historico = levenberg_marquardt(ln_x, y, ln_a0, b0)
+    
+    detalhes = ["=== REGRESSÃO DE POTÊNCIA (LEVENBERG-MARQUARDT): y = a*x^b ===\n"]
+    detalhes.append(f"Estimativa inicial (linearizada): ln(a) = {ln_a0:.6f}, b = {b0:.6f}\n")
+    detalhes.extend(historico)
+    detalhes.append("")
+    detalhes.append(f"Equação: {formatar_equacao('potencia', (ln_a, b))}\n")
+    detalhes.append(f"Erro quadrático total: {erro:.6f}")
+    
+    return ln_a, b, erro, '\n'.join(detalhes), num_iter
 
 
 def logaritmo_natural(x, termos=50):
     """
     Calcula ln(x) usando série de Taylor: ln(x) = 2*Σ(1/(2k+1) * ((x-1)/(x+1))^(2k+1))
     Válido para x > 0
+    
+    Antes da série, x é reduzido para m em [√2/2, √2) com x = m * 2^e,
+    de modo que ln(x) = ln(m) + e*ln(2) e a série converge em poucos termos
+    mesmo para valores grandes (ex.: número de transistores).
     """
     if x <= 0:
         return float('nan')
     
-    # Para convergência mais rápida, usar ln(x) = ln(x/e^k) + k onde escolhemos k apropriado
-    # Ou usar a série ln((1+z)/(1-z)) = 2(z + z³/3 + z⁵/5 + ...)
-    # onde z = (x-1)/(x+1)
+    # Redução de faixa: x = m * 2^e
+    m, e = math.frexp(x)
+    if m < RAIZ_METADE:
+        m *= 2.0
+        e -= 1
     
-    z = (x - 1) / (x + 1)
+    # Série ln((1+z)/(1-z)) = 2(z + z³/3 + z⁵/5 + ...)
+    # onde z = (m-1)/(m+1), com |z| < 0.172
+    z = (m - 1) / (m + 1)
+    z2 = z * z
     soma = 0.0
     z_potencia = z
     
     for k in range(termos):
-        soma += z_potencia / (2*k + 1)
-        z_potencia *= z * z
+        termo = z_potencia / (2*k + 1)
+        soma += termo
+        z_potencia *= z2
+        
+        # Parar se termo muito pequeno
+        if abs(termo) < 1e-17:
+            break
     
-    return 2 * soma
+    return 2 * soma + e * LN2
 
 
 def exp_manual(x, termos=50):
     """
     Calcula e^x usando série de Taylor: e^x = Σ(x^k / k!)
+    
+    O argumento é reduzido para x = k*ln(2) + r com |r| <= ln(2)/2,
+    e^x = 2^k * e^r, evitando a perda de precisão da série para |x| grande.
     """
+    if x != x:
+        return x
+    if x > 709.78:
+        return float('inf')
+    if x < -745.13:
+        return 0.0
+    
+    k = int(round(x / LN2))
+    r = x - k * LN2
+    
     soma = 1.0
     termo = 1.0
     
-    for k in range(1, termos):
-        termo *= x / k
+    for i in range(1, termos):
+        termo *= r / i
         soma += termo
         
         # Parar se termo muito pequeno
-        if abs(termo) < 1e-15:
+        if abs(termo) < 1e-17:
             break
     
-    return soma
+    return math.ldexp(soma, k)
+
+
+def logaritmo_base10(x):
+    """Calcula log10(x) = ln(x)/ln(10)"""
+    return logaritmo_natural(x) / LN10
+
+
+def potencia_base10(x):
+    """Calcula 10^x = e^(x*ln(10))"""
+    return exp_manual(x * LN10)
+
+
+def exp_lote(valores):
+    """
+    Calcula e^v para uma sequência de valores, de forma rápida.
+    
+    Usa a redução v = (64k + j)*ln(2)/64 + r, com |r| <= ln(2)/128, de modo que
+    e^v = 2^k * 2^(j/64) * e^r. A tabela 2^(j/64) é calculada uma única vez na
+    importação e e^r precisa de apenas 6 termos da série (avaliados por Horner).
+    
+    Retorna:
+        lista com e^v para cada valor
+    """
+    tabela = TABELA_POTENCIAS_2
+    passo = LN2 / 64
+    inverso_passo = 64 / LN2
+    ldexp = math.ldexp
+    resultado = []
+    anexar = resultado.append
+    
+    for v in valores:
+        if not -745.13 <= v <= 709.78:
+            anexar(exp_manual(v))
+            continue
+        m = int(round(v * inverso_passo))
+        r = v - m * passo
+        p = 1.0 + r * (1.0 + r * (0.5 + r * (1/6 + r * (1/24 + r * (1/120 + r * (1/720))))))
+        anexar(ldexp(tabela[m & 63] * p, m >> 6))
+    
+    return resultado
 
 
-def resolver_regressoes(x_dados, y_dados):
+def ln2_por_serie():
+    """Calcula ln(2) pela série com z = 1/3 (usada na redução de faixa)"""
+    z = 1.0 / 3.0
+    soma = 0.0
+    z_potencia = z
+    for k in range(40):
+        soma += z_potencia / (2*k + 1)
+        z_potencia *= z * z
+    return 2 * soma
+
+
+RAIZ_METADE = 0.7071067811865476
+LN2 = ln2_por_serie()
+LN10 = logaritmo_natural(10.0)
+TABELA_POTENCIAS_2 = [exp_manual(j * LN2 / 64) for j in range(64)]
+
+
+def resolver_regressoes(x_dados, y_dados, ajuste='linearizado'):
     """
     Aplica as três regressões (linear, parabólica, exponencial) aos dados fornecidos.
+    
+    Com ajuste='nao_linear', a exponencial é refinada por Levenberg-Marquardt
+    a partir do ajuste linearizado, minimizando o erro na escala original, e
+    a potência y = a*x^b é ajustada do mesmo modo ao lado dela.
+    
+    Na exponencial e na potência, 'a' vem None quando e^(ln a) não cabe em
+    float; o coeficiente sempre sai em 'ln_a'.
     """
     # Regressão linear
     a_lin, b_lin, erro_lin, det_lin = regressao_linear(x_dados, y_dados)
@@ -252,9 +513,15 @@ def resolver_regressoes(x_dados, y_dados):
     a_par, b_par, c_par, erro_par, det_par = regressao_parabolica(x_dados, y_dados)
     
     # Regressão exponencial
-    a_exp, b_exp, erro_exp, det_exp = regressao_exponencial(x_dados, y_dados)
+    iter_exp = None
+    if ajuste == 'nao_linear':
+        ln_a_exp, b_exp, erro_exp, det_exp, iter_exp = regressao_exponencial_nao_linear(x_dados, y_dados)
+    elif ajuste == 'linearizado':
+        ln_a_exp, b_exp, erro_exp, det_exp = regressao_exponencial(x_dados, y_dados)
+    else:
+        raise ValueError(f"Ajuste desconhecido: {ajuste}")
     
-    return {
+    resultado = {
         'linear': {
             'a': a_lin,
             'b': b_lin,
@@ -271,10 +538,759 @@ def resolver_regressoes(x_dados, y_dados):
             'detalhes': det_par
         },
         'exponencial': {
-            'a': a_exp,
+            'a': coeficiente_a('exponencial', (ln_a_exp, b_exp)),
+            'ln_a': ln_a_exp,
             'b': b_exp,
             'erro': erro_exp,
-            'equacao': f'y = {a_exp:.6f}*e^({b_exp:.6f}x)',
-            'detalhes': det_exp
-        } if a_exp is not None else None
+            'equacao': formatar_equacao('exponencial', (ln_a_exp, b_exp)),
+            'detalhes': det_exp,
+            'ajuste': ajuste,
+            'iteracoes': iter_exp
+        } if ln_a_exp is not None else None
     }
+    
+    # Potência y = a*x^b por Levenberg-Marquardt (requer x > 0 e y > 0)
+    if ajuste == 'nao_linear':
+        ln_a_pot, b_pot, erro_pot, det_pot, iter_pot = regressao_potencia_nao_linear(x_dados, y_dados)
+        resultado['potencia'] = {
+            'a': coeficiente_a('potencia', (ln_a_pot, b_pot)),
+            'ln_a': ln_a_pot,
+            'b': b_pot,
+            'erro': erro_pot,
+            'equacao': formatar_equacao('potencia', (ln_a_pot, b_pot)),
+            'detalhes': det_pot,
+            'ajuste': ajuste,
+            'iteracoes': iter_pot
+        } if ln_a_pot is not None else None
+    
+    return resultado
+
+
+# ==================== SELEÇÃO DE MODELOS ====================
+#
+# Todas as famílias abaixo se reduzem a uma regressão linear v = A + B*u
+# sobre variáveis transformadas (u, v). As transformações ln(x), 1/x e ln(y)
+# são calculadas uma única vez por ponto e os somatórios de cada par (u, v)
+# ficam em um único dicionário de somas, compartilhado entre as famílias.
+
+# Acima deste número de pontos as duas passagens da seleção de modelos são
+# divididas em blocos avaliados em paralelo no pool de processos compartilhado
+# (cada passagem custa cerca de 5 µs por ponto, e enviar os blocos, ~0,04 µs)
+LIMITE_PARALELO = 200000
+NUMERO_BLOCOS_PARALELOS = min(4, os.cpu_count() or 1)
+
+POOL = {'executor': None}
+
+FAMILIAS_MODELOS = {
+    'linear': {'nome': 'Linear', 'forma': 'y = a + bx', 'parametros': 2},
+    'parabolica': {'nome': 'Parabólica', 'forma': 'y = a + bx + cx²', 'parametros': 3},
+    'exponencial': {'nome': 'Exponencial', 'forma': 'y = a*e^(bx)', 'parametros': 2},
+    'exponencial_base10': {'nome': 'Exponencial base 10 (Lei de Moore)', 'forma': 'y = 10^(a + bx)', 'parametros': 2},
+    'potencia': {'nome': 'Potência', 'forma': 'y = a*x^b', 'parametros': 2},
+    'logaritmica': {'nome': 'Logarítmica', 'forma': 'y = a + b*ln(x)', 'parametros': 2},
+    'reciproca': {'nome': 'Recíproca', 'forma': 'y = a + b/x', 'parametros': 2},
+}
+
+# Famílias ajustadas em ln(y): o coeficiente a é guardado como ln(a), pois
+# e^(ln a) sai do intervalo de float em dados como os anos da Lei de Moore
+# (ln a ≈ -700). As previsões são feitas como e^(ln a + b*x).
+FAMILIAS_LOG = ('exponencial', 'potencia')
+
+CHAVES_SOMAS = [
+    'x', 'x2', 'x3', 'x4', 'y', 'y2', 'xy', 'x2y',
+    'lnx', 'lnx2', 'lny', 'lny2', 'x_lny', 'lnx_lny', 'lnx_y',
+    'invx', 'invx2', 'invx_y',
+]
+
+
+def novas_somas():
+    """Cria um acumulador vazio de somatórios transformados"""
+    somas = {chave: 0.0 for chave in CHAVES_SOMAS}
+    somas['n'] = 0
+    somas['x_positivo'] = True
+    somas['x_nao_nulo'] = True
+    somas['y_positivo'] = True
+    return somas
+
+
+def acumular_somas(somas, x, y):
+    """
+    Acrescenta os pontos (x, y) ao acumulador de somatórios em uma única passagem.
+    
+    As transformações ln(x), 1/x e ln(y) são calculadas uma vez por ponto e
+    reaproveitadas por todas as famílias. Assim que um ponto invalida uma
+    transformação (ex.: x <= 0 para ln(x)), ela deixa de ser calculada.
+    
+    Parâmetros:
+        somas: dicionário criado por novas_somas() (modificado no lugar)
+        x: sequência de valores x
+        y: sequência de valores y
+    
+    Retorna:
+        o próprio dicionário de somas
+    """
+    s_x = s_x2 = s_x3 = s_x4 = s_y = s_y2 = s_xy = s_x2y = 0.0
+    s_lnx = s_lnx2 = s_lny = s_lny2 = s_x_lny = s_lnx_lny = s_lnx_y = 0.0
+    s_invx = s_invx2 = s_invx_y = 0.0
+    x_positivo = somas['x_positivo']
+    x_nao_nulo = somas['x_nao_nulo']
+    y_positivo = somas['y_positivo']
+    n = 0
+    
+    for xi, yi in zip(x, y):
+        n += 1
+        xi2 = xi * xi
+        s_x += xi
+        s_x2 += xi2
+        s_x3 += xi2 * xi
+        s_x4 += xi2 * xi2
+        s_y += yi
+        s_y2 += yi * yi
+        s_xy += xi * yi
+        s_x2y += xi2 * yi
+        
+        if y_positivo:
+            if yi > 0:
+                lny = logaritmo_natural(yi)
+                s_lny += lny
+                s_lny2 += lny * lny
+                s_x_lny += xi * lny
+            else:
+                y_positivo = False
+        
+        if x_positivo:
+            if xi > 0:
+                lnx = logaritmo_natural(xi)
+                s_lnx += lnx
+                s_lnx2 += lnx * lnx
+                s_lnx_y += lnx * yi
+                if y_positivo:
+                    s_lnx_lny += lnx * lny
+            else:
+                x_positivo = False
+        
+        if x_nao_nulo:
+            if xi != 0:
+                invx = 1.0 / xi
+                s_invx += invx
+                s_invx2 += invx * invx
+                s_invx_y += invx * yi
+            else:
+                x_nao_nulo = False
+    
+    parciais = {
+        'x': s_x, 'x2': s_x2, 'x3': s_x3, 'x4': s_x4,
+        'y': s_y, 'y2': s_y2, 'xy': s_xy, 'x2y': s_x2y,
+        'lnx': s_lnx, 'lnx2': s_lnx2, 'lny': s_lny, 'lny2': s_lny2,
+        'x_lny': s_x_lny, 'lnx_lny': s_lnx_lny, 'lnx_y': s_lnx_y,
+        'invx': s_invx, 'invx2': s_invx2, 'invx_y': s_invx_y,
+    }
+    for chave in CHAVES_SOMAS:
+        somas[chave] += parciais[chave]
+    somas['n'] += n
+    somas['x_positivo'] = x_positivo
+    somas['x_nao_nulo'] = x_nao_nulo
+    somas['y_positivo'] = y_positivo
+    
+    return somas
+
+
+def somas_do_bloco(x, y):
+    """Somatórios de um bloco de dados (executado em um processo do pool)"""
+    return acumular_somas(novas_somas(), x, y)
+
+
+def erros_do_bloco(coeficientes, x, y):
+    """Erros quadráticos de um bloco de dados (executado em um processo do pool)"""
+    return erros_quadraticos_familias(coeficientes, x, y)
+
+
+def obter_pool():
+    """Cria o pool na primeira chamada (processos iniciados por spawn, seguros com threads)"""
+    if POOL['executor'] is None:
+        POOL['executor'] = ProcessPoolExecutor(
+            max_workers=NUMERO_BLOCOS_PARALELOS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return POOL['executor']
+
+
+def encerrar_pool():
+    """Encerra o pool ao final do processo"""
+    if POOL['executor'] is not None:
+        POOL['executor'].shutdown(wait=False, cancel_futures=True)
+        POOL['executor'] = None
+
+
+atexit.register(encerrar_pool)
+
+
+def combinar_somas(somas1, somas2):
+    """Combina dois acumuladores de somatórios (ex.: de blocos diferentes dos dados)"""
+    combinado = novas_somas()
+    for chave in CHAVES_SOMAS:
+        combinado[chave] = somas1[chave] + somas2[chave]
+    combinado['n'] = somas1['n'] + somas2['n']
+    combinado['x_positivo'] = somas1['x_positivo'] and somas2['x_positivo']
+    combinado['x_nao_nulo'] = somas1['x_nao_nulo'] and somas2['x_nao_nulo']
+    combinado['y_positivo'] = somas1['y_positivo'] and somas2['y_positivo']
+    return combinado
+
+
+def reta_por_somas(n, soma_u, soma_u2, soma_v, soma_uv):
+    """
+    Resolve o sistema normal 2x2 de v = A + B*u pela Regra de Cramer.
+    
+    Retorna:
+        (A, B) ou None se o sistema for singular
+    """
+    det = n * soma_u2 - soma_u * soma_u
+    if det == 0:
+        return None
+    
+    A = (soma_v * soma_u2 - soma_u * soma_uv) / det
+    B = (n * soma_uv - soma_u * soma_v) / det
+    return A, B
+
+
+def ajustar_familias(somas):
+    """
+    Calcula os coeficientes de todas as famílias aplicáveis a partir das somas.
+    
+    Parâmetros:
+        somas: acumulador de somatórios transformados
+    
+    Retorna:
+        dicionário {familia: tupla de coeficientes}; nas famílias de
+        FAMILIAS_LOG a tupla é (ln(a), b)
+    """
+    n = somas['n']
+    coeficientes = {}
+    
+    reta = reta_por_somas(n, somas['x'], somas['x2'], somas['y'], somas['xy'])
+    if reta is not None:
+        coeficientes['linear'] = reta
+    
+    if n >= 3:
+        from metodos_diretos import gauss_elimination
+        
+        A = [
+            [n, somas['x'], somas['x2']],
+            [somas['x'], somas['x2'], somas['x3']],
+            [somas['x2'], somas['x3'], somas['x4']]
+        ]
+        b_vec = [somas['y'], somas['xy'], somas['x2y']]
+        try:
+            solucao, _ = gauss_elimination(A, b_vec)
+        except ZeroDivisionError:
+            # Menos de 3 valores distintos de x: sistema normal singular
+            solucao = None
+        if solucao is not None:
+            coeficientes['parabolica'] = tuple(solucao)
+    
+    if somas['y_positivo']:
+        reta = reta_por_somas(n, somas['x'], somas['x2'], somas['lny'], somas['x_lny'])
+        if reta is not None:
+            ln_a, b = reta
+            coeficientes['exponencial'] = (ln_a, b)
+            # Mesma reta em log10: log10(y) = ln(y)/ln(10)
+            coeficientes['exponencial_base10'] = (ln_a / LN10, b / LN10)
+    
+    if somas['x_positivo'] and somas['y_positivo']:
+        reta = reta_por_somas(n, somas['lnx'], somas['lnx2'], somas['lny'], somas['lnx_lny'])
+        if reta is not None:
+            coeficientes['potencia'] = reta
+    
+    if somas['x_positivo']:
+        reta = reta_por_somas(n, somas['lnx'], somas['lnx2'], somas['y'], somas['lnx_y'])
+        if reta is not None:
+            coeficientes['logaritmica'] = reta
+    
+    if somas['x_nao_nulo']:
+        reta = reta_por_somas(n, somas['invx'], somas['invx2'], somas['y'], somas['invx_y'])
+        if reta is not None:
+            coeficientes['reciproca'] = reta
+    
+    return coeficientes
+
+
+def erros_quadraticos_familias(coeficientes, x, y):
+    """
+    Calcula, em uma única passagem, a soma dos quadrados dos resíduos
+    (na escala original de y) de todas as famílias ajustadas.
+    
+    Retorna:
+        dicionário {familia: erro quadrático}
+    """
+    c_lin = coeficientes.get('linear')
+    c_par = coeficientes.get('parabolica')
+    c_exp = coeficientes.get('exponencial')
+    c_e10 = coeficientes.get('exponencial_base10')
+    c_pot = coeficientes.get('potencia')
+    c_log = coeficientes.get('logaritmica')
+    c_rec = coeficientes.get('reciproca')
+    
+    e_lin = e_par = e_exp = e_e10 = e_pot = e_log = e_rec = 0.0
+    
+    for xi, yi in zip(x, y):
+        if c_lin is not None:
+            r = yi - (c_lin[0] + c_lin[1] * xi)
+            e_lin += r * r
+        if c_par is not None:
+            r = yi - (c_par[0] + (c_par[1] + c_par[2] * xi) * xi)
+            e_par += r * r
+        if c_exp is not None:
+            r = yi - exp_manual(c_exp[0] + c_exp[1] * xi)
+            e_exp += r * r
+        if c_e10 is not None:
+            r = yi - exp_manual(LN10 * (c_e10[0] + c_e10[1] * xi))
+            e_e10 += r * r
+        if c_pot is not None or c_log is not None:
+            lnx = logaritmo_natural(xi)
+            if c_pot is not None:
+                r = yi - exp_manual(c_pot[0] + c_pot[1] * lnx)
+                e_pot += r * r
+            if c_log is not None:
+                r = yi - (c_log[0] + c_log[1] * lnx)
+                e_log += r * r
+        if c_rec is not None:
+            r = yi - (c_rec[0] + c_rec[1] / xi)
+            e_rec += r * r
+    
+    erros = {
+        'linear': e_lin, 'parabolica': e_par, 'exponencial': e_exp,
+        'exponencial_base10': e_e10, 'potencia': e_pot,
+        'logaritmica': e_log, 'reciproca': e_rec,
+    }
+    return {familia: erros[familia] for familia in coeficientes}
+
+
+def criterio_aic(n, erro_quad, k):
+    """
+    Critério de Informação de Akaike para resíduos gaussianos:
+    AIC = n*ln(SSE/n) + 2k. Retorna None quando o ajuste é exato (SSE = 0).
+    """
+    if erro_quad <= 0:
+        return None
+    return n * logaritmo_natural(erro_quad / n) + 2 * k
+
+
+def coeficiente_a(familia, coef):
+    """
+    Coeficiente a na forma pública da família. Nas famílias de FAMILIAS_LOG
+    é e^(ln a), ou None quando esse valor não é representável em float.
+    """
+    if familia not in FAMILIAS_LOG:
+        return coef[0]
+    a = exp_manual(coef[0])
+    if a == float('inf') or a < sys.float_info.min:
+        return None
+    return a
+
+
+def formatar_equacao(familia, coef):
+    """
+    Equação legível de um modelo ajustado (coeficientes como em
+    ajustar_familias, isto é, com ln(a) nas famílias de FAMILIAS_LOG)
+    """
+    if familia == 'linear':
+        return f'y = {coef[0]:.6f} + {coef[1]:.6f}x'
+    if familia == 'parabolica':
+        return f'y = {coef[0]:.6f} + {coef[1]:.6f}x + {coef[2]:.6f}x²'
+    if familia == 'exponencial':
+        a = coeficiente_a(familia, coef)
+        if a is None:
+            return f'y = e^({coef[0]:.6f} + {coef[1]:.6f}x)'
+        return f'y = {a:.6g}*e^({coef[1]:.6f}x)'
+    if familia == 'exponencial_base10':
+        return f'y = 10^({coef[0]:.6f} + {coef[1]:.6f}x)'
+    if familia == 'potencia':
+        a = coeficiente_a(familia, coef)
+        if a is None:
+            return f'y = e^({coef[0]:.6f})*x^{coef[1]:.6f}'
+        return f'y = {a:.6g}*x^{coef[1]:.6f}'
+    if familia == 'logaritmica':
+        return f'y = {coef[0]:.6f} + {coef[1]:.6f}*ln(x)'
+    if familia == 'reciproca':
+        return f'y = {coef[0]:.6f} + {coef[1]:.6f}/x'
+    raise ValueError(f"Família desconhecida: {familia}")
+
+
+def passagens_selecao(x_dados, y_dados):
+    """
+    As duas passagens da seleção de modelos: somatórios transformados e, com
+    os coeficientes ajustados, os erros quadráticos de todas as famílias.
+    Acima de LIMITE_PARALELO pontos, cada passagem é dividida em blocos
+    avaliados no pool compartilhado; se o pool quebrar, os dados são
+    percorridos no próprio processo.
+    
+    Retorna:
+        (coeficientes, erros, paralelo)
+    """
+    n = len(x_dados)
+    if n >= LIMITE_PARALELO and NUMERO_BLOCOS_PARALELOS > 1:
+        tamanho = -(-n // NUMERO_BLOCOS_PARALELOS)
+        blocos = [(x_dados[i:i + tamanho], y_dados[i:i + tamanho]) for i in range(0, n, tamanho)]
+        try:
+            pool = obter_pool()
+            somas = novas_somas()
+            for parcial in pool.map(somas_do_bloco, *zip(*blocos)):
+                somas = combinar_somas(somas, parcial)
+            
+            coeficientes = selecao_sem_duplicatas(ajustar_familias(somas))
+            
+            erros = {familia: 0.0 for familia in coeficientes}
+            tarefas = [pool.submit(erros_do_bloco, coeficientes, bx, by) for bx, by in blocos]
+            for tarefa in tarefas:
+                for familia, erro in tarefa.result().items():
+                    if familia in erros:
+                        erros[familia] += erro
+            return coeficientes, erros, True
+        except BrokenProcessPool:
+            POOL['executor'] = None
+    
+    somas = acumular_somas(novas_somas(), x_dados, y_dados)
+    coeficientes = selecao_sem_duplicatas(ajustar_familias(somas))
+    return coeficientes, erros_quadraticos_familias(coeficientes, x_dados, y_dados), False
+
+
+def selecao_sem_duplicatas(coeficientes):
+    """
+    A exponencial base 10 é a mesma reta de ln(y) da exponencial, só escrita
+    em log10: na seleção ela não é uma família à parte (empataria no ranking)
+    e aparece como parametrização da exponencial.
+    """
+    return {familia: coef for familia, coef in coeficientes.items() if familia != 'exponencial_base10'}
+
+
+def resolver_selecao_modelos(x_dados, y_dados):
+    """
+    Ajusta todas as famílias de curvas aos dados e as classifica por AIC.
+    
+    Os dados são percorridos duas vezes: uma para os somatórios transformados
+    (compartilhados entre as famílias) e outra para os erros quadráticos na
+    escala original, em blocos paralelos para conjuntos grandes (ver
+    passagens_selecao). Famílias cujo erro não é finito (previsões fora do
+    intervalo de float) ficam fora do ranking, com o motivo em 'excluido'.
+    A exponencial traz em 'base10' os coeficientes da forma y = 10^(a + bx).
+    
+    Parâmetros:
+        x_dados: lista de valores x
+        y_dados: lista de valores y
+    
+    Retorna:
+        dicionário com os modelos ajustados, o ranking e o melhor modelo
+    """
+    n = len(x_dados)
+    coeficientes, erros, paralelo = passagens_selecao(x_dados, y_dados)
+    
+    modelos = {}
+    for familia, coef in coeficientes.items():
+        k = FAMILIAS_MODELOS[familia]['parametros']
+        erro = erros[familia]
+        modelo = {
+            'nome': FAMILIAS_MODELOS[familia]['nome'],
+            'forma': FAMILIAS_MODELOS[familia]['forma'],
+            'a': None,
+            'b': None,
+            'erro': None,
+            'aic': None,
+            'parametros': k,
+            'equacao': None
+        }
+        if not all(math.isfinite(c) for c in coef):
+            modelo['excluido'] = "Coeficientes não finitos: somatórios fora do intervalo de float"
+        elif not math.isfinite(erro):
+            modelo['excluido'] = "Erro quadrático não finito: previsões fora do intervalo de float"
+        
+        if all(math.isfinite(c) for c in coef):
+            modelo['a'] = coeficiente_a(familia, coef)
+            modelo['b'] = coef[1]
+            modelo['equacao'] = formatar_equacao(familia, coef)
+            if familia in FAMILIAS_LOG:
+                modelo['ln_a'] = coef[0]
+            if len(coef) > 2:
+                modelo['c'] = coef[2]
+            if familia == 'exponencial':
+                base10 = (coef[0] / LN10, coef[1] / LN10)
+                modelo['base10'] = {
+                    'forma': FAMILIAS_MODELOS['exponencial_base10']['forma'],
+                    'a': base10[0],
+                    'b': base10[1],
+                    'equacao': formatar_equacao('exponencial_base10', base10)
+                }
+        if 'excluido' not in modelo:
+            modelo['erro'] = erro
+            modelo['aic'] = criterio_aic(n, erro, k)
+        modelos[familia] = modelo
+    
+    # Ajuste exato (AIC = None) vem primeiro; empates decididos pelo erro
+    comparaveis = [f for f in modelos if 'excluido' not in modelos[f]]
+    ranking = sorted(
+        comparaveis,
+        key=lambda f: (modelos[f]['aic'] is not None,
+                       modelos[f]['aic'] if modelos[f]['aic'] is not None else 0.0,
+                       modelos[f]['erro'])
+    )
+    
+    return {
+        'modelos': modelos,
+        'ranking': ranking,
+        'melhor': ranking[0] if ranking else None,
+        'numero_pontos': n,
+        'paralelo': paralelo
+    }
+
+
+# ==================== REGRESSÕES EM BLOCOS ====================
+# Para dados recebidos em blocos, cada bloco é reduzido a momentos centrados
+# na própria média (Σu², Σuv, ... com u = x - x̄, v = y - ȳ, w = ln y - mean),
+# calculados em duas passagens sobre o bloco. Os blocos são combinados
+# deslocando os momentos para a média conjunta (fórmulas de Chan/Pébay), o
+# que evita o cancelamento de Σy² - aΣy - bΣxy quando y é grande e pouco
+# disperso.
+
+# Expoentes (p, q, r) de Σ u^p v^q w^r para cada momento guardado. O conjunto
+# é fechado para baixo, como exige a combinação: cada momento depende só
+# de momentos de ordem menor do mesmo bloco.
+EXPOENTES_MOMENTOS = {
+    'u2': (2, 0, 0), 'u3': (3, 0, 0), 'u4': (4, 0, 0),
+    'uv': (1, 1, 0), 'u2v': (2, 1, 0), 'v2': (0, 2, 0),
+    'uw': (1, 0, 1), 'w2': (0, 0, 2),
+}
+
+# Momentos que dependem de ln(y), descartados assim que aparece y <= 0
+MOMENTOS_LOG = ('uw', 'w2')
+
+
+def novos_momentos():
+    """Cria um acumulador vazio de momentos centrados"""
+    momentos = {chave: 0.0 for chave in EXPOENTES_MOMENTOS}
+    momentos.update(n=0, media_x=0.0, media_y=0.0, media_lny=0.0, y_positivo=True)
+    return momentos
+
+
+def momentos_do_bloco(x, y):
+    """
+    Momentos centrados de um bloco de pontos, em duas passagens: a primeira
+    calcula as médias e a segunda soma os produtos dos desvios.
+    
+    Parâmetros:
+        x: sequência de valores x
+        y: sequência de valores y
+    
+    Retorna:
+        dicionário no formato de novos_momentos()
+    """
+    momentos = novos_momentos()
+    n = len(x)
+    if n == 0:
+        return momentos
+    
+    y_positivo = all(yi > 0 for yi in y)
+    lny = [logaritmo_natural(yi) for yi in y] if y_positivo else None
+    
+    media_x = sum(x) / n
+    media_y = sum(y) / n
+    media_lny = sum(lny) / n if y_positivo else 0.0
+    
+    s_u2 = s_u3 = s_u4 = s_uv = s_u2v = s_v2 = 0.0
+    for xi, yi in zip(x, y):
+        u = xi - media_x
+        v = yi - media_y
+        u2 = u * u
+        s_u2 += u2
+        s_u3 += u2 * u
+        s_u4 += u2 * u2
+        s_uv += u * v
+        s_u2v += u2 * v
+        s_v2 += v * v
+    
+    s_uw = s_w2 = 0.0
+    if y_positivo:
+        for xi, wi in zip(x, lny):
+            u = xi - media_x
+            w = wi - media_lny
+            s_uw += u * w
+            s_w2 += w * w
+    
+    momentos.update(
+        n=n, media_x=media_x, media_y=media_y, media_lny=media_lny, y_positivo=y_positivo,
+        u2=s_u2, u3=s_u3, u4=s_u4, uv=s_uv, u2v=s_u2v, v2=s_v2, uw=s_uw, w2=s_w2
+    )
+    return momentos
+
+
+def combinar_momentos(momentos1, momentos2):
+    """
+    Combina os momentos centrados de dois blocos de dados.
+    
+    Os momentos de cada bloco são deslocados da média do bloco para a média
+    conjunta: Σ(u+d)^p(v+e)^q(w+f)^r é expandido pelo binômio, com os
+    momentos de primeira ordem nulos (centrados) e o de ordem zero igual a n.
+    
+    Retorna:
+        novo dicionário de momentos
+    """
+    n1, n2 = momentos1['n'], momentos2['n']
+    if n1 == 0:
+        return dict(momentos2)
+    if n2 == 0:
+        return dict(momentos1)
+    
+    n = n1 + n2
+    y_positivo = momentos1['y_positivo'] and momentos2['y_positivo']
+    combinado = novos_momentos()
+    combinado['n'] = n
+    combinado['y_positivo'] = y_positivo
+    for chave in ('media_x', 'media_y', 'media_lny'):
+        combinado[chave] = momentos1[chave] + (momentos2[chave] - momentos1[chave]) * n2 / n
+    if not y_positivo:
+        combinado['media_lny'] = 0.0
+    
+    for momentos in (momentos1, momentos2):
+        deslocamento = (momentos['media_x'] - combinado['media_x'],
+                        momentos['media_y'] - combinado['media_y'],
+                        momentos['media_lny'] - combinado['media_lny'])
+        por_expoentes = {expoentes: momentos[chave] for chave, expoentes in EXPOENTES_MOMENTOS.items()}
+        por_expoentes.update({(0, 0, 0): momentos['n'], (1, 0, 0): 0.0, (0, 1, 0): 0.0, (0, 0, 1): 0.0})
+        
+        for chave, (p, q, r) in EXPOENTES_MOMENTOS.items():
+            if chave in MOMENTOS_LOG and not y_positivo:
+                continue
+            total = 0.0
+            for i in range(p + 1):
+                for j in range(q + 1):
+                    for k in range(r + 1):
+                        total += (math.comb(p, i) * math.comb(q, j) * math.comb(r, k)
+                                  * por_expoentes[(i, j, k)]
+                                  * deslocamento[0] ** (p - i)
+                                  * deslocamento[1] ** (q - j)
+                                  * deslocamento[2] ** (r - k))
+            combinado[chave] += total
+    
+    return combinado
+
+
+def resolver_regressoes_momentos(momentos):
+    """
+    Ajusta as regressões linear, parabólica e exponencial a partir dos
+    momentos centrados, sem revisitar os dados.
+    
+    O resultado tem o mesmo formato de resolver_regressoes(). Na exponencial
+    o erro na escala original exigiria uma segunda passagem com b já
+    conhecido, então 'erro' fica None e é informado o erro na escala
+    transformada ('erro_linearizado').
+    
+    Parâmetros:
+        momentos: acumulador de momentos centrados
+    
+    Retorna:
+        dicionário {'linear', 'parabolica', 'exponencial', 'numero_pontos'}
+    """
+    n = momentos['n']
+    if n < 2:
+        raise ValueError("São necessários pelo menos 2 pontos")
+    
+    media_x = momentos['media_x']
+    media_y = momentos['media_y']
+    s_u2 = momentos['u2']
+    if s_u2 <= 0:
+        raise ValueError("Todos os valores de x são iguais")
+    
+    cabecalho = [f"Número de pontos: {n} (recebidos em blocos)\n",
+                 "Momentos centrados (u = x - x̄, v = y - ȳ):",
+                 f"  x̄ = {media_x:.6f}",
+                 f"  ȳ = {media_y:.6f}",
+                 f"  Σu² = {s_u2:.6f}",
+                 f"  Σuv = {momentos['uv']:.6f}",
+                 f"  Σv² = {momentos['v2']:.6f}"]
+    
+    # Linear: b = Σuv/Σu², SSE = Σv² - bΣuv
+    b_lin = momentos['uv'] / s_u2
+    a_lin = media_y - b_lin * media_x
+    erro_lin = max(momentos['v2'] - b_lin * momentos['uv'], 0.0)
+    equacao_lin = formatar_equacao('linear', (a_lin, b_lin))
+    
+    # Parabólica em u: v = βu + γ(u² - Σu²/n), sistema 2x2 nos momentos
+    s_q2 = momentos['u4'] - s_u2 * s_u2 / n
+    det = s_u2 * s_q2 - momentos['u3'] * momentos['u3']
+    if n < 3 or det <= 0:
+        raise ValueError("São necessários pelo menos 3 valores distintos de x")
+    beta = (momentos['uv'] * s_q2 - momentos['u3'] * momentos['u2v']) / det
+    gama = (s_u2 * momentos['u2v'] - momentos['u3'] * momentos['uv']) / det
+    erro_par = max(momentos['v2'] - beta * momentos['uv'] - gama * momentos['u2v'], 0.0)
+    a_par = media_y - gama * s_u2 / n - beta * media_x + gama * media_x * media_x
+    b_par = beta - 2 * gama * media_x
+    c_par = gama
+    equacao_par = formatar_equacao('parabolica', (a_par, b_par, c_par))
+    
+    # Exponencial linearizada: ln(y) = ln(a) + bx
+    exponencial = None
+    if momentos['y_positivo']:
+        b_exp = momentos['uw'] / s_u2
+        ln_a = momentos['media_lny'] - b_exp * media_x
+        erro_linearizado = max(momentos['w2'] - b_exp * momentos['uw'], 0.0)
+        a_exp = coeficiente_a('exponencial', (ln_a, b_exp))
+        equacao_exp = formatar_equacao('exponencial', (ln_a, b_exp))
+        exponencial = {
+            'a': a_exp,
+            'ln_a': ln_a,
+            'b': b_exp,
+            'erro': None,
+            'erro_linearizado': erro_linearizado,
+            'equacao': equacao_exp,
+            'detalhes': '\n'.join(
+                ["=== REGRESSÃO EXPONENCIAL: y = a*e^(bx) ===\n", cabecalho[0],
+                 "Momentos centrados (u = x - x̄, w = ln(y) - média de ln(y)):",
+                 f"  x̄ = {media_x:.6f}",
+                 f"  média de ln(y) = {momentos['media_lny']:.6f}",
+                 f"  Σu² = {s_u2:.6f}",
+                 f"  Σu·ln(y) = {momentos['uw']:.6f}\n",
+                 f"Equação: {equacao_exp}\n",
+                 f"Erro quadrático em ln(y): {erro_linearizado:.6f}"]
+            ),
+            'ajuste': 'linearizado',
+            'iteracoes': None
+        }
+    
+    return {
+        'linear': {
+            'a': a_lin,
+            'b': b_lin,
+            'erro': erro_lin,
+            'equacao': equacao_lin,
+            'detalhes': '\n'.join(
+                ["=== REGRESSÃO LINEAR: y = a + bx ===\n"] + cabecalho +
+                ["", f"Equação: {equacao_lin}\n", f"Erro quadrático total: {erro_lin:.6f}"]
+            )
+        },
+        'parabolica': {
+            'a': a_par,
+            'b': b_par,
+            'c': c_par,
+            'erro': erro_par,
+            'equacao': equacao_par,
+            'detalhes': '\n'.join(
+                ["=== REGRESSÃO PARABÓLICA: y = a + bx + cx² ===\n"] + cabecalho +
+                [f"  Σu³ = {momentos['u3']:.6f}",
+                 f"  Σu⁴ = {momentos['u4']:.6f}",
+                 f"  Σu²v = {momentos['u2v']:.6f}\n",
+                 f"Equação: {equacao_par}\n",
+                 f"Erro quadrático total: {erro_par:.6f}"]
+            )
+        },
+        'exponencial': exponencial,
+        'numero_pontos': n
+    }
+
+
+def resolver_regressoes_blocos(blocos):
+    """
+    Ajusta as regressões a dados recebidos em blocos (x, y), guardando apenas
+    os momentos centrados. A memória usada não depende do número de pontos.
+    """
+    momentos = novos_momentos()
+    for x, y in blocos:
+        momentos = combinar_momentos(momentos, momentos_do_bloco(x, y))
+    return resolver_regressoes_momentos(momentos)
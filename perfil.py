@@ -0,0 +1,188 @@
+"""
+Módulo: Perfil de Requisições
+Executa requisições sob o cProfile quando pedido (cabeçalho X-Perfil ou
+?perfil=) e devolve as funções de maior tempo acumulado ou grava um arquivo
+.prof. Envolve a aplicação WSGI inteira, então o tempo do Flask e da
+serialização aparece junto com o dos métodos numéricos
+"""
+
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+import uuid
+from urllib.parse import parse_qs
+
+# Configuração (pode ser alterada por variáveis de ambiente)
+PERFIL_ATIVO = os.environ.get('PERFIL', '0') != '0'
+# Fração das requisições comuns (sem pedido) perfiladas e gravadas em arquivo
+AMOSTRAGEM = float(os.environ.get('PERFIL_AMOSTRAGEM', 0.0))
+# Pedidos de perfil precisam do cabeçalho X-Perfil-Chave igual a ela; sem
+# chave configurada, só a amostragem (decidida pelo servidor) funciona
+CHAVE_PERFIL = os.environ.get('PERFIL_CHAVE', '')
+DIRETORIO_PERFIS = os.environ.get('PERFIL_DIRETORIO', os.path.join(tempfile.gettempdir(), 'perfis_calculo'))
+LINHAS_RESUMO = int(os.environ.get('PERFIL_LINHAS', 25))
+# Limites dos arquivos .prof em DIRETORIO_PERFIS: os mais antigos são apagados
+MAXIMO_ARQUIVOS = int(os.environ.get('PERFIL_MAXIMO_ARQUIVOS', 100))
+MAXIMO_BYTES = int(os.environ.get('PERFIL_MAXIMO_BYTES', 100 * 1024 * 1024))
+
+MODOS_PERFIL = ('resumo', 'arquivo')
+
+# Uma requisição perfilada por vez: limita o custo e evita perfis sobrepostos
+TRAVA_PERFIL = threading.Lock()
+
+
+def modo_pedido(environ):
+    """
+    Modo de perfil pedido pela requisição: 'resumo', 'arquivo' ou None.
+    
+    ?perfil=1 ou X-Perfil: 1 pedem o resumo; o valor 'arquivo' pede o .prof.
+    O pedido só vale com X-Perfil-Chave igual a CHAVE_PERFIL (ignorado se não
+    houver chave configurada). Sem pedido, a requisição é sorteada com
+    probabilidade AMOSTRAGEM (modo 'arquivo').
+    """
+    valor = environ.get('HTTP_X_PERFIL')
+    if valor is None:
+        valor = parse_qs(environ.get('QUERY_STRING', '')).get('perfil', [None])[0]
+    
+    if valor is None or valor in ('0', 'false', ''):
+        if AMOSTRAGEM > 0 and random.random() < AMOSTRAGEM:
+            return 'arquivo'
+        return None
+    
+    chave = environ.get('HTTP_X_PERFIL_CHAVE', '')
+    if not CHAVE_PERFIL or not hmac.compare_digest(chave.encode('utf-8'), CHAVE_PERFIL.encode('utf-8')):
+        return None
+    
+    return valor if valor in MODOS_PERFIL else 'resumo'
+
+
+def resumir_perfil(perfilador, linhas=LINHAS_RESUMO):
+    """
+    Funções de maior tempo acumulado.
+    
+    Retorna:
+        dicionário com o tempo total e a lista das funções (chamadas, tempo
+        próprio e tempo acumulado, em segundos)
+    """
+    estatisticas = pstats.Stats(perfilador)
+    estatisticas.sort_stats('cumulative')
+    
+    funcoes = []
+    for chave in estatisticas.fcn_list[:linhas]:
+        arquivo, linha, nome = chave
+        _, chamadas, proprio, acumulado, _ = estatisticas.stats[chave]
+        local = f"{os.path.basename(arquivo)}:{linha}" if linha else arquivo
+        funcoes.append({
+            'funcao': f"{local}({nome})",
+            'chamadas': chamadas,
+            'tempo_proprio': round(proprio, 6),
+            'tempo_acumulado': round(acumulado, 6)
+        })
+    
+    return {
+        'tempo_total': round(estatisticas.total_tt, 6),
+        'ordenado_por': 'tempo_acumulado',
+        'funcoes': funcoes
+    }
+
+
+def limitar_perfis():
+    """
+    Apaga os .prof mais antigos de DIRETORIO_PERFIS até restarem no máximo
+    MAXIMO_ARQUIVOS arquivos e MAXIMO_BYTES bytes
+    """
+    arquivos = []
+    with os.scandir(DIRETORIO_PERFIS) as entradas:
+        for entrada in entradas:
+            if entrada.name.endswith('.prof') and entrada.is_file():
+                informacao = entrada.stat()
+                arquivos.append((informacao.st_mtime, informacao.st_size, entrada.path))
+    
+    arquivos.sort()
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    while arquivos and (len(arquivos) > MAXIMO_ARQUIVOS or total > MAXIMO_BYTES):
+        _, tamanho, caminho = arquivos.pop(0)
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+
+
+def gravar_perfil(perfilador, caminho_requisicao):
+    """Grava o perfil em DIRETORIO_PERFIS e devolve o caminho do arquivo"""
+    os.makedirs(DIRETORIO_PERFIS, exist_ok=True)
+    rota = caminho_requisicao.strip('/').replace('/', '_') or 'raiz'
+    nome = f"{time.strftime('%Y%m%d-%H%M%S')}-{rota}-{uuid.uuid4().hex[:8]}.prof"
+    caminho = os.path.join(DIRETORIO_PERFIS, nome)
+    perfilador.dump_stats(caminho)
+    limitar_perfis()
+    return caminho
+
+
+def perfil_wsgi(aplicacao):
+    """
+    Envolve uma aplicação WSGI com o perfil sob demanda.
+    
+    A resposta da requisição perfilada é lida inteira antes de ser enviada
+    (inclusive fluxos). No modo 'resumo' com resposta JSON (objeto), o resumo
+    entra no campo 'perfil'; nos demais casos o perfil é gravado em arquivo,
+    indicado no cabeçalho X-Perfil-Arquivo.
+    """
+    def aplicacao_perfilada(environ, start_response):
+        modo = modo_pedido(environ)
+        if modo is None or not TRAVA_PERFIL.acquire(blocking=False):
+            return aplicacao(environ, start_response)
+        
+        try:
+            capturado = {}
+            partes = []
+            
+            def capturar_inicio(status, cabecalhos, exc_info=None):
+                capturado['status'] = status
+                capturado['cabecalhos'] = cabecalhos
+                return partes.append
+            
+            perfilador = cProfile.Profile()
+            perfilador.enable()
+            try:
+                resposta = aplicacao(environ, capturar_inicio)
+                try:
+                    partes.extend(resposta)
+                finally:
+                    if hasattr(resposta, 'close'):
+                        resposta.close()
+            finally:
+                perfilador.disable()
+        finally:
+            TRAVA_PERFIL.release()
+        
+        corpo = b''.join(partes)
+        cabecalhos = [(nome, valor) for nome, valor in capturado['cabecalhos']
+                      if nome.lower() != 'content-length']
+        tipo = next((valor for nome, valor in cabecalhos if nome.lower() == 'content-type'), '')
+        
+        documento = None
+        if modo == 'resumo' and tipo.startswith('application/json'):
+            try:
+                documento = json.loads(corpo)
+            except ValueError:
+                documento = None
+        
+        if isinstance(documento, dict):
+            documento['perfil'] = resumir_perfil(perfilador)
+            corpo = json.dumps(documento).encode('utf-8')
+        else:
+            cabecalhos.append(('X-Perfil-Arquivo', gravar_perfil(perfilador, environ.get('PATH_INFO', ''))))
+        
+        cabecalhos.append(('Content-Length', str(len(corpo))))
+        start_response(capturado['status'], cabecalhos)
+        return [corpo]
+    
+    return aplicacao_perfilada
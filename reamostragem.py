@@ -0,0 +1,413 @@
+"""
+Módulo: Reamostragem para Incerteza das Regressões
+Bootstrap dos coeficientes e validação cruzada k-fold das famílias de
+mínimos quadrados, com intervalos de previsão para a Lei de Moore
+"""
+
+import atexit
+import math
+import multiprocessing
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from minimos_quadrados import (
+    CHAVES_SOMAS, FAMILIAS_LOG, FAMILIAS_MODELOS, ajustar_familias, logaritmo_natural, novas_somas
+)
+from lei_moore import prever_lote
+
+# Acima deste custo (réplicas x pontos) as réplicas são distribuídas em um pool de processos
+LIMITE_PARALELO = 2000000
+NUMERO_PROCESSOS = min(4, os.cpu_count() or 1)
+
+POOL = {'executor': None}
+
+# Número máximo de réplicas de bootstrap por requisição
+MAXIMO_REPLICAS = 20000
+
+FAMILIAS_PADRAO = ['linear', 'exponencial', 'exponencial_base10']
+
+# Famílias ajustadas em log(y): os resíduos das previsões são multiplicativos
+FAMILIAS_MULTIPLICATIVAS = FAMILIAS_LOG + ('exponencial_base10',)
+
+
+def colunas_transformadas(x, y):
+    """
+    Calcula uma única vez as colunas ln(x), ln(y) e 1/x usadas pelas somas.
+    
+    Retorna:
+        dicionário de arrays float64 (None para transformações inválidas)
+    """
+    x = array('d', x)
+    y = array('d', y)
+    x_positivo = all(v > 0 for v in x)
+    y_positivo = all(v > 0 for v in y)
+    x_nao_nulo = all(v != 0 for v in x)
+    
+    return {
+        'x': x,
+        'y': y,
+        'lnx': array('d', (logaritmo_natural(v) for v in x)) if x_positivo else None,
+        'lny': array('d', (logaritmo_natural(v) for v in y)) if y_positivo else None,
+        'invx': array('d', (1.0 / v for v in x)) if x_nao_nulo else None,
+        'n': len(x)
+    }
+
+
+def somas_por_indices(colunas, indices):
+    """
+    Somatórios transformados dos pontos selecionados por um array de índices.
+    
+    Os dados não são copiados: cada índice é lido diretamente das colunas,
+    e índices repetidos (bootstrap) contam mais de uma vez.
+    
+    Retorna:
+        dicionário no formato de novas_somas()
+    """
+    x, y = colunas['x'], colunas['y']
+    lnx, lny, invx = colunas['lnx'], colunas['lny'], colunas['invx']
+    somas = novas_somas()
+    parciais = dict.fromkeys(CHAVES_SOMAS, 0.0)
+    
+    s_x = s_x2 = s_x3 = s_x4 = s_y = s_y2 = s_xy = s_x2y = 0.0
+    for i in indices:
+        xi = x[i]
+        yi = y[i]
+        xi2 = xi * xi
+        s_x += xi
+        s_x2 += xi2
+        s_x3 += xi2 * xi
+        s_x4 += xi2 * xi2
+        s_y += yi
+        s_y2 += yi * yi
+        s_xy += xi * yi
+        s_x2y += xi2 * yi
+    parciais.update(x=s_x, x2=s_x2, x3=s_x3, x4=s_x4, y=s_y, y2=s_y2, xy=s_xy, x2y=s_x2y)
+    
+    if lny is not None:
+        s_lny = s_lny2 = s_x_lny = 0.0
+        for i in indices:
+            v = lny[i]
+            s_lny += v
+            s_lny2 += v * v
+            s_x_lny += x[i] * v
+        parciais.update(lny=s_lny, lny2=s_lny2, x_lny=s_x_lny)
+    
+    if lnx is not None:
+        s_lnx = s_lnx2 = s_lnx_y = s_lnx_lny = 0.0
+        for i in indices:
+            u = lnx[i]
+            s_lnx += u
+            s_lnx2 += u * u
+            s_lnx_y += u * y[i]
+            if lny is not None:
+                s_lnx_lny += u * lny[i]
+        parciais.update(lnx=s_lnx, lnx2=s_lnx2, lnx_y=s_lnx_y, lnx_lny=s_lnx_lny)
+    
+    if invx is not None:
+        s_invx = s_invx2 = s_invx_y = 0.0
+        for i in indices:
+            u = invx[i]
+            s_invx += u
+            s_invx2 += u * u
+            s_invx_y += u * y[i]
+        parciais.update(invx=s_invx, invx2=s_invx2, invx_y=s_invx_y)
+    
+    somas.update(parciais)
+    somas['n'] = len(indices)
+    somas['x_positivo'] = lnx is not None
+    somas['y_positivo'] = lny is not None
+    somas['x_nao_nulo'] = invx is not None
+    return somas
+
+
+def semente_replica(semente, replica):
+    """Semente de uma réplica: depende só da semente base e do número da réplica"""
+    return semente * 1000003 + replica
+
+
+def replicas_bootstrap(colunas, familias, inicio, fim, semente):
+    """
+    Executa as réplicas de bootstrap [inicio, fim).
+    
+    Cada réplica sorteia um array de n índices com reposição, usando seu
+    próprio gerador, de modo que o resultado não depende de qual processo a executou.
+    
+    Retorna:
+        lista (uma entrada por réplica) de dicionários {familia: coeficientes}
+    """
+    n = colunas['n']
+    resultados = []
+    
+    for replica in range(inicio, fim):
+        gerador = random.Random(semente_replica(semente, replica))
+        indices = array('l', gerador.choices(range(n), k=n))
+        coeficientes = ajustar_familias(somas_por_indices(colunas, indices))
+        resultados.append({f: coeficientes[f] for f in familias if f in coeficientes})
+    
+    return resultados
+
+
+def replicas_no_trabalhador(x, y, familias, inicio, fim, semente):
+    """Executa um lote de réplicas no processo do pool (os dados vão com o lote)"""
+    return replicas_bootstrap(colunas_transformadas(x, y), familias, inicio, fim, semente)
+
+
+def obter_pool():
+    """Cria o pool na primeira chamada (processos iniciados por spawn, seguros com threads)"""
+    if POOL['executor'] is None:
+        POOL['executor'] = ProcessPoolExecutor(
+            max_workers=NUMERO_PROCESSOS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return POOL['executor']
+
+
+def encerrar_pool():
+    """Encerra o pool ao final do processo"""
+    if POOL['executor'] is not None:
+        POOL['executor'].shutdown(wait=False, cancel_futures=True)
+        POOL['executor'] = None
+
+
+atexit.register(encerrar_pool)
+
+
+def replicas_em_paralelo(colunas, familias, replicas, semente):
+    """
+    Distribui as réplicas em lotes pelo pool compartilhado. Como cada réplica
+    tem semente própria, o resultado é o mesmo da execução sequencial; se o
+    pool quebrar, as réplicas são refeitas no próprio processo.
+    """
+    tamanho = -(-replicas // (NUMERO_PROCESSOS * 4))
+    lotes = [(i, min(i + tamanho, replicas)) for i in range(0, replicas, tamanho)]
+    
+    try:
+        pool = obter_pool()
+        tarefas = [pool.submit(replicas_no_trabalhador, colunas['x'], colunas['y'], familias, inicio, fim, semente)
+                   for inicio, fim in lotes]
+        amostras = []
+        for tarefa in tarefas:
+            amostras.extend(tarefa.result())
+        return amostras
+    except BrokenProcessPool:
+        POOL['executor'] = None
+        return replicas_bootstrap(colunas, familias, 0, replicas, semente)
+
+
+def residuos_previsao(colunas, familia, coeficientes):
+    """
+    Resíduos do ajuste com todos os pontos, na escala em que a família é
+    ajustada (y ou ln y), inflados por sqrt(n / (n - p)) para compensar o
+    ajuste ter sido feito nos mesmos pontos.
+    
+    Retorna:
+        lista de resíduos (pontos com previsão fora do float ficam de fora)
+    """
+    previstos = prever_lote(familia, list(coeficientes), colunas['x'])
+    multiplicativa = familia in FAMILIAS_MULTIPLICATIVAS
+    residuos = []
+    for observado, previsto in zip(colunas['y'], previstos):
+        if multiplicativa:
+            if observado > 0 and previsto > 0 and math.isfinite(previsto):
+                residuos.append(math.log(observado) - math.log(previsto))
+        elif math.isfinite(previsto):
+            residuos.append(observado - previsto)
+    
+    n = colunas['n']
+    parametros = FAMILIAS_MODELOS[familia]['parametros']
+    escala = math.sqrt(n / (n - parametros)) if n > parametros else 1.0
+    return [r * escala for r in residuos]
+
+
+def quantil(ordenados, p):
+    """Quantil p (0 a 1) de uma lista ordenada, com interpolação linear"""
+    posicao = p * (len(ordenados) - 1)
+    i = int(posicao)
+    if i + 1 >= len(ordenados):
+        return ordenados[-1]
+    fracao = posicao - i
+    return ordenados[i] + fracao * (ordenados[i + 1] - ordenados[i])
+
+
+def resumir_amostra(valores, niveis):
+    """Média, desvio padrão e quantis de uma amostra"""
+    ordenados = sorted(valores)
+    m = len(ordenados)
+    media = sum(ordenados) / m
+    variancia = sum((v - media) * (v - media) for v in ordenados) / (m - 1) if m > 1 else 0.0
+    desvio = variancia ** 0.5
+    
+    # Valores perto do limite do float podem estourar a média ou a variância
+    return {
+        'media': media if math.isfinite(media) else None,
+        'desvio_padrao': desvio if math.isfinite(desvio) else None,
+        'quantis': {str(p): quantil(ordenados, p) for p in niveis}
+    }
+
+
+def validacao_cruzada(colunas, familias, k, semente):
+    """
+    Validação cruzada k-fold de cada família.
+    
+    As somas de cada partição são calculadas uma vez; as somas de treino de
+    cada rodada são o total menos a partição de teste, sem refazer a passagem.
+    
+    Retorna:
+        dicionário {familia: erro médio quadrático de teste}
+    """
+    n = colunas['n']
+    gerador = random.Random(semente_replica(semente, -1))
+    ordem = list(range(n))
+    gerador.shuffle(ordem)
+    particoes = [array('l', ordem[p::k]) for p in range(k)]
+    
+    somas_particoes = [somas_por_indices(colunas, indices) for indices in particoes]
+    total = novas_somas()
+    for somas in somas_particoes:
+        for chave in CHAVES_SOMAS:
+            total[chave] += somas[chave]
+        total['n'] += somas['n']
+    for chave in ('x_positivo', 'y_positivo', 'x_nao_nulo'):
+        total[chave] = somas_particoes[0][chave]
+    
+    erros = {familia: 0.0 for familia in familias}
+    contagens = {familia: 0 for familia in familias}
+    
+    for indices, somas_teste in zip(particoes, somas_particoes):
+        treino = dict(total)
+        for chave in CHAVES_SOMAS:
+            treino[chave] = total[chave] - somas_teste[chave]
+        treino['n'] = total['n'] - somas_teste['n']
+        
+        coeficientes = ajustar_familias(treino)
+        x_teste = [colunas['x'][i] for i in indices]
+        
+        for familia in familias:
+            if familia not in coeficientes:
+                continue
+            previstos = prever_lote(familia, list(coeficientes[familia]), x_teste)
+            for i, previsto in zip(indices, previstos):
+                residuo = colunas['y'][i] - previsto
+                erros[familia] += residuo * residuo
+            contagens[familia] += len(indices)
+    
+    return {
+        familia: (erros[familia] / contagens[familia]
+                  if contagens[familia] and math.isfinite(erros[familia]) else None)
+        for familia in familias
+    }
+
+
+def resolver_incerteza(x_dados, y_dados, familias=None, replicas=1000, k=5, semente=0,
+                       nivel_confianca=0.95, pontos_previsao=None):
+    """
+    Estima a incerteza das regressões por bootstrap e validação cruzada.
+    
+    Parâmetros:
+        x_dados, y_dados: listas de valores
+        familias: famílias a avaliar (padrão: linear, exponencial e exponencial base 10)
+        replicas: número de réplicas de bootstrap (até MAXIMO_REPLICAS)
+        k: número de partições da validação cruzada
+        semente: semente base (mesma semente -> mesmo resultado)
+        nivel_confianca: nível dos intervalos (ex.: 0.95 -> quantis 2.5% e 97.5%)
+        pontos_previsao: valores x para intervalos de previsão (ex.: anos, Lei de Moore).
+            Cada réplica prevê com seus coeficientes e soma (ou, nas famílias em
+            log(y), multiplica por e^) um resíduo sorteado do ajuste completo,
+            de modo que o intervalo cobre uma nova observação e não só a média.
+    
+    O pool de processos compartilhado é usado quando réplicas x pontos passa
+    de LIMITE_PARALELO.
+    
+    Retorna:
+        dicionário com quantis dos coeficientes, erro de validação cruzada e previsões
+    """
+    familias = familias or FAMILIAS_PADRAO
+    for familia in familias:
+        if familia not in FAMILIAS_MODELOS:
+            raise ValueError(f"Família desconhecida: {familia}")
+    
+    n = len(x_dados)
+    if n != len(y_dados):
+        raise ValueError("Os vetores x e y devem ter o mesmo tamanho")
+    if n < 3:
+        raise ValueError("São necessários pelo menos 3 pontos")
+    if not 2 <= replicas <= MAXIMO_REPLICAS:
+        raise ValueError(f"O número de réplicas deve estar entre 2 e {MAXIMO_REPLICAS}")
+    if not 2 <= k <= n:
+        raise ValueError(f"k deve estar entre 2 e o número de pontos ({n})")
+    
+    alfa = (1 - nivel_confianca) / 2
+    niveis = [round(alfa, 6), 0.5, round(1 - alfa, 6)]
+    
+    colunas = colunas_transformadas(x_dados, y_dados)
+    
+    paralelo = replicas * n >= LIMITE_PARALELO and NUMERO_PROCESSOS > 1
+    if paralelo:
+        amostras = replicas_em_paralelo(colunas, familias, replicas, semente)
+    else:
+        amostras = replicas_bootstrap(colunas, familias, 0, replicas, semente)
+    
+    erros_cv = validacao_cruzada(colunas, familias, k, semente)
+    ajuste_completo = ajustar_familias(somas_por_indices(colunas, array('l', range(n)))) if pontos_previsao else {}
+    
+    resultado_familias = {}
+    for familia in familias:
+        # Réplicas degeneradas (somas fora do intervalo de float) são descartadas
+        coeficientes = [amostra[familia] for amostra in amostras
+                        if familia in amostra and all(math.isfinite(c) for c in amostra[familia])]
+        if not coeficientes:
+            resultado_familias[familia] = None
+            continue
+        
+        # Nas famílias em ln(y) o bootstrap resume ln(a), não a
+        nomes = (['ln_a', 'b'] if familia in FAMILIAS_LOG else ['a', 'b', 'c'])[:len(coeficientes[0])]
+        resumo = {
+            'nome': FAMILIAS_MODELOS[familia]['nome'],
+            'replicas_validas': len(coeficientes),
+            'coeficientes': {
+                nome: resumir_amostra([c[j] for c in coeficientes], niveis)
+                for j, nome in enumerate(nomes)
+            },
+            'erro_validacao_cruzada': erros_cv[familia]
+        }
+        
+        if pontos_previsao:
+            residuos = (residuos_previsao(colunas, familia, ajuste_completo[familia])
+                        if familia in ajuste_completo else [])
+            multiplicativa = familia in FAMILIAS_MULTIPLICATIVAS
+            # Sorteio dos resíduos em sequência própria, independente do pool
+            gerador = random.Random(semente_replica(semente, -2))
+            por_ponto = [[] for _ in pontos_previsao]
+            for c in coeficientes:
+                for lista, valor in zip(por_ponto, prever_lote(familia, list(c), pontos_previsao)):
+                    if residuos:
+                        residuo = residuos[gerador.randrange(len(residuos))]
+                        if multiplicativa:
+                            valor = valor * math.exp(min(residuo, 700.0))
+                        else:
+                            valor = valor + residuo
+                    if math.isfinite(valor):
+                        lista.append(valor)
+            # Previsões fora do intervalo de float ficam fora do resumo e são
+            # contadas em 'replicas_descartadas'
+            resumo['previsoes'] = [
+                {'x': ponto, 'replicas_descartadas': len(coeficientes) - len(valores),
+                 **(resumir_amostra(valores, niveis) if valores else
+                    {'media': None, 'desvio_padrao': None, 'quantis': None})}
+                for ponto, valores in zip(pontos_previsao, por_ponto)
+            ]
+        
+        resultado_familias[familia] = resumo
+    
+    return {
+        'familias': resultado_familias,
+        'replicas': replicas,
+        'k': k,
+        'semente': semente,
+        'nivel_confianca': nivel_confianca,
+        'numero_pontos': n,
+        'paralelo': paralelo
+    }
@@ -0,0 +1,315 @@
+"""
+Módulo: Tarefas Assíncronas
+Execução de sistemas lineares grandes em um pool de processos limitado: a
+submissão devolve um identificador, e o resultado é consultado depois (ou
+acompanhado por eventos). Problemas pequenos são resolvidos na hora
+
+O registro das tarefas (TAREFAS) e o pool ficam na memória do processo: a
+aplicação deve rodar com um único worker (ex.: gunicorn --workers 1 --threads 4),
+senão a consulta de uma tarefa pode chegar a outro processo e receber 404
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from metodos_diretos import resolver_sistema_generico
+from metodos_iterativos import resolver_sistema_iterativo
+from metricas import medidas_iterativo, medidas_sistema, registrar_chamada
+
+# Configuração (pode ser alterada por variáveis de ambiente)
+NUMERO_PROCESSOS_TAREFAS = int(os.environ.get('TAREFAS_PROCESSOS', min(2, os.cpu_count() or 1)))
+MAXIMO_FILA = int(os.environ.get('TAREFAS_MAXIMO_FILA', 16))
+VALIDADE_RESULTADO = float(os.environ.get('TAREFAS_VALIDADE', 600))
+
+# Sistemas com até esta ordem são resolvidos na própria requisição
+LIMITE_SINCRONO = int(os.environ.get('TAREFAS_LIMITE_SINCRONO', 40))
+
+ESTADOS_FINAIS = ('concluida', 'erro', 'cancelada')
+
+# id -> registro da tarefa
+TAREFAS = {}
+# Reentrante: cancel() executa os callbacks de conclusão na própria thread
+TRAVA_TAREFAS = threading.RLock()
+POOL = {'executor': None}
+
+
+def executar_sistema(dados):
+    """Resolve um sistema linear por método direto (gauss, jordan ou lu)"""
+    A = dados['matriz']
+    b = dados['vetor_b']
+    n = len(b)
+    if len(A) != n or any(len(linha) != n for linha in A):
+        raise ValueError("A matriz deve ser quadrada NxN onde N é o tamanho do vetor b")
+    return resolver_sistema_generico(A, b, dados.get('metodo', 'gauss'), bool(dados.get('passos', True)))
+
+
+def executar_sistema_iterativo(dados):
+    """Resolve um sistema linear por Jacobi ou Gauss-Seidel"""
+    return resolver_sistema_iterativo(
+        dados['matriz'],
+        dados['vetor_b'],
+        dados.get('metodo', 'gauss_seidel'),
+        float(dados.get('tolerancia', 0.0001)),
+        dados.get('valores_iniciais', None)
+    )
+
+
+TIPOS_TAREFA = {
+    'sistema': executar_sistema,
+    'sistema_iterativo': executar_sistema_iterativo
+}
+
+# Medidas de /metrics por tipo (o rótulo 'resolvedor' é o próprio tipo, como nas rotas)
+MEDIDAS_TAREFA = {
+    'sistema': medidas_sistema,
+    'sistema_iterativo': medidas_iterativo
+}
+
+
+def executar_tarefa(tipo, dados):
+    """Ponto de entrada executado no processo do pool: devolve (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = TIPOS_TAREFA[tipo](dados)
+    return resultado, time.perf_counter() - inicio
+
+
+def argumentos_medidas(dados):
+    """Argumentos (A, b) passados às medidas de /metrics"""
+    return dados.get('matriz'), dados.get('vetor_b', ())
+
+
+def obter_pool():
+    """Cria o pool na primeira tarefa (processos iniciados por spawn, seguros com threads)"""
+    if POOL['executor'] is None:
+        POOL['executor'] = ProcessPoolExecutor(
+            max_workers=NUMERO_PROCESSOS_TAREFAS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return POOL['executor']
+
+
+def encerrar_pool():
+    """Encerra o pool ao final do processo, descartando tarefas que não começaram"""
+    if POOL['executor'] is not None:
+        POOL['executor'].shutdown(wait=False, cancel_futures=True)
+        POOL['executor'] = None
+
+
+atexit.register(encerrar_pool)
+
+
+def pequena(dados):
+    """Indica se o problema é pequeno o bastante para o caminho síncrono"""
+    return len(dados.get('vetor_b', ())) <= LIMITE_SINCRONO
+
+
+def concluir_registro(registro, futuro):
+    """
+    Guarda no registro o resultado de um futuro terminado e registra a
+    execução nas métricas do processo da aplicação (chamada com a trava).
+    Só a primeira chamada tem efeito: quem chegar antes, o callback do futuro
+    ou uma consulta, conclui o registro.
+    """
+    if registro['estado'] in ESTADOS_FINAIS:
+        return
+    tipo = registro['tipo']
+    registro['concluida_em'] = time.time()
+    if futuro.cancelled():
+        registro['estado'] = 'cancelada'
+        return
+    erro = futuro.exception()
+    if erro is not None:
+        registro['estado'] = 'erro'
+        registro['erro'] = str(erro) or type(erro).__name__
+        registrar_chamada(tipo, None, erro=True, fase=False)
+    else:
+        resultado, segundos = futuro.result()
+        registro['estado'] = 'concluida'
+        registro['resultado'] = resultado
+        registrar_chamada(tipo, segundos, MEDIDAS_TAREFA[tipo], registro['argumentos'], resultado, fase=False)
+
+
+def estado_tarefa(registro):
+    """
+    Estado atual de uma tarefa a partir do seu futuro (chamada com a trava).
+    Um futuro já terminado conclui o registro aqui mesmo, sem esperar pelo
+    callback, para que a tarefa nunca apareça como 'na_fila' depois de pronta.
+    """
+    if registro['estado'] in ESTADOS_FINAIS:
+        return registro['estado']
+    futuro = registro['futuro']
+    if futuro.done():
+        concluir_registro(registro, futuro)
+        return registro['estado']
+    if futuro.running():
+        return 'executando'
+    return 'na_fila'
+
+
+def ao_concluir(identificador):
+    """Callback do futuro: conclui o registro da tarefa (se ainda existir)"""
+    def registrar(futuro):
+        with TRAVA_TAREFAS:
+            registro = TAREFAS.get(identificador)
+            if registro is not None:
+                concluir_registro(registro, futuro)
+    return registrar
+
+
+def limpar_expiradas():
+    """Remove as tarefas finalizadas há mais de VALIDADE_RESULTADO segundos (chamada com a trava)"""
+    limite = time.time() - VALIDADE_RESULTADO
+    expiradas = [identificador for identificador, registro in TAREFAS.items()
+                 if registro['estado'] in ESTADOS_FINAIS and registro['concluida_em'] < limite]
+    for identificador in expiradas:
+        del TAREFAS[identificador]
+
+
+def resumo_tarefa(registro):
+    """Representação pública de uma tarefa (sem o futuro)"""
+    estado = estado_tarefa(registro)
+    resumo = {
+        'id': registro['id'],
+        'tipo': registro['tipo'],
+        'estado': estado,
+        'criada_em': registro['criada_em'],
+        'concluida_em': registro['concluida_em']
+    }
+    if estado == 'concluida':
+        resumo['resultado'] = registro['resultado']
+    elif estado == 'erro':
+        resumo['erro'] = registro['erro']
+    return resumo
+
+
+def submeter_tarefa(tipo, dados):
+    """
+    Submete uma tarefa.
+    
+    Problemas pequenos são resolvidos imediatamente; os demais vão para o pool.
+    
+    Parâmetros:
+        tipo: 'sistema' ou 'sistema_iterativo'
+        dados: mesmo JSON aceito pelas rotas /calcular_sistema e /calcular_sistema_iterativo
+    
+    Retorna:
+        resumo da tarefa, ou None se a fila estiver cheia
+    """
+    if tipo not in TIPOS_TAREFA:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo} (use {', '.join(TIPOS_TAREFA)})")
+    
+    agora = time.time()
+    registro = {
+        'id': uuid.uuid4().hex,
+        'tipo': tipo,
+        'estado': 'na_fila',
+        'criada_em': agora,
+        'concluida_em': None,
+        'resultado': None,
+        'erro': None,
+        'futuro': None,
+        'argumentos': argumentos_medidas(dados)
+    }
+    
+    if pequena(dados):
+        try:
+            registro['resultado'], segundos = executar_tarefa(tipo, dados)
+            registro['estado'] = 'concluida'
+            registrar_chamada(tipo, segundos, MEDIDAS_TAREFA[tipo], registro['argumentos'],
+                              registro['resultado'])
+        except Exception as e:
+            registro['erro'] = str(e)
+            registro['estado'] = 'erro'
+            registrar_chamada(tipo, None, erro=True)
+        registro['concluida_em'] = time.time()
+        with TRAVA_TAREFAS:
+            limpar_expiradas()
+            TAREFAS[registro['id']] = registro
+        return resumo_tarefa(registro)
+    
+    with TRAVA_TAREFAS:
+        limpar_expiradas()
+        pendentes = sum(1 for r in TAREFAS.values() if r['estado'] not in ESTADOS_FINAIS)
+        if pendentes >= MAXIMO_FILA:
+            return None
+        
+        try:
+            futuro = obter_pool().submit(executar_tarefa, tipo, dados)
+        except BrokenProcessPool:
+            # Um processo do pool morreu: recria o pool e tenta de novo
+            POOL['executor'] = None
+            futuro = obter_pool().submit(executar_tarefa, tipo, dados)
+        
+        registro['futuro'] = futuro
+        TAREFAS[registro['id']] = registro
+    
+    futuro.add_done_callback(ao_concluir(registro['id']))
+    
+    with TRAVA_TAREFAS:
+        return resumo_tarefa(registro)
+
+
+def consultar_tarefa(identificador, esperar=0.0):
+    """
+    Consulta uma tarefa, opcionalmente esperando até `esperar` segundos pela conclusão.
+    
+    Retorna:
+        resumo da tarefa, ou None se o identificador não existir (ou tiver expirado)
+    """
+    with TRAVA_TAREFAS:
+        limpar_expiradas()
+        registro = TAREFAS.get(identificador)
+        if registro is None:
+            return None
+        futuro = registro['futuro']
+    
+    if esperar > 0 and futuro is not None and registro['estado'] not in ESTADOS_FINAIS:
+        wait([futuro], timeout=esperar)
+    
+    with TRAVA_TAREFAS:
+        return resumo_tarefa(registro)
+
+
+def cancelar_tarefa(identificador):
+    """
+    Cancela uma tarefa.
+    
+    Só tarefas ainda na fila podem ser canceladas: um processo do pool não é
+    interrompido no meio do cálculo, então uma tarefa em execução continua e
+    o resumo devolvido mantém o estado 'executando'.
+    
+    Retorna:
+        resumo da tarefa, ou None se o identificador não existir
+    """
+    with TRAVA_TAREFAS:
+        registro = TAREFAS.get(identificador)
+        if registro is None:
+            return None
+        if registro['estado'] not in ESTADOS_FINAIS and registro['futuro'].cancel():
+            registro['estado'] = 'cancelada'
+            registro['resultado'] = None
+            registro['concluida_em'] = time.time()
+        return resumo_tarefa(registro)
+
+
+def estatisticas_tarefas():
+    """Ocupação da fila de tarefas"""
+    with TRAVA_TAREFAS:
+        limpar_expiradas()
+        contagem = {}
+        for registro in TAREFAS.values():
+            estado = estado_tarefa(registro)
+            contagem[estado] = contagem.get(estado, 0) + 1
+        return {
+            'por_estado': contagem,
+            'maximo_fila': MAXIMO_FILA,
+            'processos': NUMERO_PROCESSOS_TAREFAS,
+            'limite_sincrono': LIMITE_SINCRONO,
+            'validade_segundos': VALIDADE_RESULTADO
+        }